@@ -1,11 +1,30 @@
-from .argument_parser import HiveArgumentParser as ArgumentParser
-from .config import read as read_config
-from .datetime import parse_datetime, utc_now
-from .resource import read_resource
-from .service_name import SERVICE_NAME
-from .typing import dynamic_cast
-from .uuid import blake2b_digest_uuid, parse_uuid
-from .xdg import user_cache_dir, user_config_dir
+from typing import TYPE_CHECKING
+
+from .lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .argument_parser import HiveArgumentParser as ArgumentParser
+    from .config import read as read_config
+    from .datetime import parse_datetime, utc_now
+    from .resource import read_resource
+    from .service_name import SERVICE_NAME
+    from .typing import dynamic_cast
+    from .uuid import blake2b_digest_uuid, parse_uuid
+    from .xdg import user_cache_dir, user_config_dir
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "ArgumentParser": ".argument_parser:HiveArgumentParser",
+    "SERVICE_NAME": ".service_name:SERVICE_NAME",
+    "blake2b_digest_uuid": ".uuid:blake2b_digest_uuid",
+    "dynamic_cast": ".typing:dynamic_cast",
+    "parse_datetime": ".datetime:parse_datetime",
+    "parse_uuid": ".uuid:parse_uuid",
+    "read_config": ".config:read",
+    "read_resource": ".resource:read_resource",
+    "user_cache_dir": ".xdg:user_cache_dir",
+    "user_config_dir": ".xdg:user_config_dir",
+    "utc_now": ".datetime:utc_now",
+})
 
 __all__ = [
     "ArgumentParser",
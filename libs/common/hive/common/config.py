@@ -1,14 +1,48 @@
 import json
+import logging
 import os
-import yaml
 
-from collections.abc import Iterable
-from typing import Any
+from collections.abc import Callable, Iterable
+from copy import deepcopy
+from dataclasses import dataclass
+from datetime import timedelta
+from threading import Event, Lock, Thread
+from typing import Any, Optional
 
+from .units import SECOND
 from .xdg import user_config_dir
 
+logger = logging.getLogger(__name__)
+
+# Device, inode, modification time and size: enough to notice a file
+# being edited in place or replaced, as rotated secrets usually are.
+FileSignature = tuple[int, int, int, int]
+
+
+def _signature(filename: str) -> Optional[FileSignature]:
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+
+
+@dataclass(frozen=True)
+class _CacheEntry:
+    search_path: tuple[str, ...]
+    filename: str
+    signature: FileSignature
+    result: dict[str, Any]
+
 
 class Reader:
+    """Read configuration files from a search path.
+
+    Results are cached until the file they came from changes, so
+    repeated reads cost one `stat` call.  A new file appearing
+    earlier in the search path than the cached one isn't noticed
+    until :meth:`invalidate` is called.
+    """
     def __init__(self, subdirs: Iterable[str] = ("hive",)):
         self.search_path: list[str] = []
         if (dirname := os.environ.get("CREDENTIALS_DIRECTORY")):
@@ -26,6 +60,8 @@ class Reader:
             ".json",
             ".env",
         ]
+        self._cache: dict[tuple[str, str], _CacheEntry] = {}
+        self._cache_lock = Lock()
 
     def get_filename_for(self, key: str) -> str:
         for dirname in self.search_path:
@@ -37,7 +73,85 @@ class Reader:
         raise KeyError(key)
 
     def read(self, key: str, type: str = "yaml") -> dict[str, Any]:
+        """Return the configuration stored under `key`.  The result
+        is the caller's to modify.
+
+        :raises KeyError: If there's no file for `key`.
+        """
+        cache_key = (key, type)
+        search_path = tuple(self.search_path)
+        with self._cache_lock:
+            entry = self._cache.get(cache_key)
+        if (entry is not None
+                and entry.search_path == search_path
+                and entry.signature == _signature(entry.filename)):
+            return deepcopy(entry.result)
+
         filename = self.get_filename_for(key)
+        signature = _signature(filename)
+        result = self._read(filename, type)
+        if signature is not None:
+            with self._cache_lock:
+                self._cache[cache_key] = _CacheEntry(
+                    search_path,
+                    filename,
+                    signature,
+                    result,
+                )
+        return deepcopy(result)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Forget cached results for `key`, or for every key.
+        """
+        with self._cache_lock:
+            if key is None:
+                self._cache.clear()
+                return
+            for cache_key in list(self._cache):
+                if cache_key[0] == key:
+                    del self._cache[cache_key]
+
+    def watch(
+            self,
+            key: str,
+            callback: Callable[[dict[str, Any]], None],
+            *,
+            interval: timedelta = 5 * SECOND,
+            type: str = "yaml",
+    ) -> Callable[[], None]:
+        """Check for changes to `key`'s file every `interval`, in a
+        daemon thread, and call `callback` with the new configuration
+        whenever it changes, for example because credentials were
+        rotated.  Returns a function that stops watching.
+        """
+        stopped = Event()
+
+        def locate() -> Optional[tuple[str, Optional[FileSignature]]]:
+            try:
+                filename = self.get_filename_for(key)
+            except KeyError:
+                return None
+            return filename, _signature(filename)
+
+        last_seen = locate()
+
+        def run() -> None:
+            nonlocal last_seen
+            while not stopped.wait(interval.total_seconds()):
+                if (seen := locate()) == last_seen:
+                    continue
+                last_seen = seen
+                if seen is None:
+                    continue
+                try:
+                    callback(self.read(key, type))
+                except Exception:
+                    logger.exception("%s: Config watch failed", key)
+
+        Thread(target=run, name=f"ConfigWatch-{key}", daemon=True).start()
+        return stopped.set
+
+    def _read(self, filename: str, type: str) -> dict[str, Any]:
         ext = os.path.splitext(filename)[1].lstrip(".")
         if ext in {"env", "json"}:
             type = ext
@@ -67,6 +181,8 @@ class Reader:
             return json.load(fp)
 
     def _read_yaml(self, filename: str) -> Any:
+        import yaml
+
         with open(filename) as fp:
             return yaml.safe_load(fp)
 
@@ -74,3 +190,5 @@ class Reader:
 DEFAULT_READER = Reader()
 
 read = DEFAULT_READER.read
+invalidate = DEFAULT_READER.invalidate
+watch = DEFAULT_READER.watch
@@ -1,13 +1,33 @@
-from collections.abc import Iterator
+import asyncio
+
+from collections.abc import AsyncIterator, Callable, Iterator
 from contextlib import suppress
+from dataclasses import dataclass, field, fields
+from datetime import timedelta
 from pathlib import Path
 from tempfile import TemporaryFile
+from threading import BoundedSemaphore, Lock, RLock
+from time import perf_counter
 from typing import Any, Optional
 
-from hishel import CacheClient, FileStorage
-from httpx import Client, Request, Response, URL  # noqa: F401
+from httpx import (  # noqa: F401
+    AsyncBaseTransport,
+    AsyncByteStream,
+    AsyncClient,
+    AsyncHTTPTransport,
+    BaseTransport,
+    Client,
+    HTTPTransport,
+    Limits,
+    Request,
+    Response,
+    SyncByteStream,
+    Timeout,
+    URL,
+)
 
 from .config import read as read_config
+from .units import SECOND
 from .xdg import user_cache_dir
 from .__version__ import __version__
 
@@ -37,9 +57,6 @@ def _default_cache_path() -> Optional[Path]:
     return None
 
 
-DEFAULT_CACHE_PATH = _default_cache_path()
-
-
 def _default_user_agent(name: str = "HiveBot") -> str:
     config_key = name.lower()
     try:
@@ -51,31 +68,378 @@ def _default_user_agent(name: str = "HiveBot") -> str:
     return template.format(version=__version__)
 
 
-DEFAULT_USER_AGENT = _default_user_agent()
+@dataclass
+class ClientStats:
+    """Counters shared by every client a :class:`ClientFactory` makes.
+    """
+    requests: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    bytes_received: int = 0
+    response_seconds: float = 0.0
+    max_response_seconds: float = 0.0
+    _lock: Lock = field(default_factory=Lock, repr=False)
 
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                f.name: getattr(self, f.name)
+                for f in fields(self)
+                if not f.name.startswith("_")
+            }
 
-DEFAULT_CLIENT: Client = CacheClient(
-    http2=True,
-    storage=FileStorage(base_path=DEFAULT_CACHE_PATH),
-)
-DEFAULT_CLIENT.headers["User-Agent"] = DEFAULT_USER_AGENT
-
-
-globals().update(
-    (attr, getattr(DEFAULT_CLIENT, attr))
-    for attr in (
-            "delete",
-            "get",
-            "head",
-            "options",
-            "patch",
-            "post",
-            "put",
-            "request",
-            "stream",
-    )
+    def _record_response(self, response: Response, seconds: float) -> None:
+        """Record a response, `seconds` after its request was sent.
+        Responses from clients without caches count as cache misses.
+        """
+        with self._lock:
+            self.requests += 1
+            if response.extensions.get("from_cache"):
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+            self.response_seconds += seconds
+            self.max_response_seconds = max(
+                self.max_response_seconds,
+                seconds,
+            )
+
+    def _record_error(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += 1
+
+    def _record_bytes(self, count: int) -> None:
+        with self._lock:
+            self.bytes_received += count
+
+
+@dataclass
+class ClientFactory:
+    """Makes :class:`httpx.Client` and :class:`httpx.AsyncClient`
+    instances with the same settings, cache storage and stats.
+
+    Connections are pooled per client, up to `max_connections`, of
+    which at most `max_connections_per_host` are to any one host and
+    at most `max_keepalive_connections` are kept open while idle, for
+    `keepalive_expiry`.  Requests wait for a connection to become
+    available rather than exceed those limits.  Responses served from
+    the cache don't need a connection.
+    """
+    cache: bool = True
+    cache_path: Optional[Path] = None  # default: DEFAULT_CACHE_PATH
+    http2: bool = True
+    max_connections: int = 100
+    max_connections_per_host: Optional[int] = 6
+    max_keepalive_connections: int = 20
+    keepalive_expiry: timedelta = 5 * SECOND
+    timeout: timedelta = 5 * SECOND
+    user_agent: Optional[str] = None  # default: DEFAULT_USER_AGENT
+    stats: ClientStats = field(default_factory=ClientStats)
+
+    @property
+    def limits(self) -> Limits:
+        return Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry.total_seconds(),
+        )
+
+    def client(self, **kwargs: Any) -> Client:
+        """Return a new client.  Keyword arguments are passed to
+        :class:`httpx.Client`.
+        """
+        transport: BaseTransport = HTTPTransport(
+            http2=self.http2,
+            limits=self.limits,
+        )
+        if self.max_connections_per_host:
+            transport = _HostLimitedTransport(
+                transport,
+                self.max_connections_per_host,
+            )
+        if self.cache:
+            from hishel import CacheTransport, FileStorage
+
+            transport = CacheTransport(
+                transport=transport,
+                storage=FileStorage(base_path=self._cache_path),
+            )
+        return Client(
+            transport=_InstrumentedTransport(transport, self.stats),
+            **self._client_kwargs(kwargs)
+        )
+
+    def async_client(self, **kwargs: Any) -> AsyncClient:
+        """Return a new asyncio client, with the same cache storage
+        as :meth:`client`'s.  Keyword arguments are passed to
+        :class:`httpx.AsyncClient`.
+        """
+        transport: AsyncBaseTransport = AsyncHTTPTransport(
+            http2=self.http2,
+            limits=self.limits,
+        )
+        if self.max_connections_per_host:
+            transport = _AsyncHostLimitedTransport(
+                transport,
+                self.max_connections_per_host,
+            )
+        if self.cache:
+            from hishel import AsyncCacheTransport, AsyncFileStorage
+
+            transport = AsyncCacheTransport(
+                transport=transport,
+                storage=AsyncFileStorage(base_path=self._cache_path),
+            )
+        return AsyncClient(
+            transport=_AsyncInstrumentedTransport(transport, self.stats),
+            **self._client_kwargs(kwargs)
+        )
+
+    @property
+    def _cache_path(self) -> Optional[Path]:
+        if self.cache_path:
+            return self.cache_path
+        path: Optional[Path] = __getattr__("DEFAULT_CACHE_PATH")
+        return path
+
+    def _client_kwargs(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        kwargs.setdefault("timeout", Timeout(self.timeout.total_seconds()))
+        headers = kwargs.setdefault("headers", {})
+        if not any(name.lower() == "user-agent" for name in headers):
+            headers["User-Agent"] = (
+                self.user_agent or __getattr__("DEFAULT_USER_AGENT"))
+        return kwargs
+
+
+class _Stream(SyncByteStream):
+    """Wraps a response's stream, to see its data and when it closes.
+    """
+    def __init__(
+            self,
+            stream: SyncByteStream,
+            *,
+            on_data: Optional[Callable[[int], None]] = None,
+            on_close: Optional[Callable[[], None]] = None,
+    ):
+        self._stream = stream
+        self._on_data = on_data
+        self._on_close = on_close
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._stream:
+            if self._on_data:
+                self._on_data(len(chunk))
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if (on_close := self._on_close):
+                self._on_close = None
+                on_close()
+
+
+class _AsyncStream(AsyncByteStream):
+    """Wraps a response's stream, to see its data and when it closes.
+    """
+    def __init__(
+            self,
+            stream: AsyncByteStream,
+            *,
+            on_data: Optional[Callable[[int], None]] = None,
+            on_close: Optional[Callable[[], None]] = None,
+    ):
+        self._stream = stream
+        self._on_data = on_data
+        self._on_close = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            if self._on_data:
+                self._on_data(len(chunk))
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if (on_close := self._on_close):
+                self._on_close = None
+                on_close()
+
+
+class _InstrumentedTransport(BaseTransport):
+    def __init__(self, transport: BaseTransport, stats: ClientStats):
+        self._transport = transport
+        self._stats = stats
+
+    def handle_request(self, request: Request) -> Response:
+        start = perf_counter()
+        try:
+            response = self._transport.handle_request(request)
+        except Exception:
+            self._stats._record_error()
+            raise
+        self._stats._record_response(response, perf_counter() - start)
+        assert isinstance(response.stream, SyncByteStream)
+        response.stream = _Stream(
+            response.stream,
+            on_data=self._stats._record_bytes,
+        )
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _AsyncInstrumentedTransport(AsyncBaseTransport):
+    def __init__(self, transport: AsyncBaseTransport, stats: ClientStats):
+        self._transport = transport
+        self._stats = stats
+
+    async def handle_async_request(self, request: Request) -> Response:
+        start = perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            self._stats._record_error()
+            raise
+        self._stats._record_response(response, perf_counter() - start)
+        assert isinstance(response.stream, AsyncByteStream)
+        response.stream = _AsyncStream(
+            response.stream,
+            on_data=self._stats._record_bytes,
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class _HostLimitedTransport(BaseTransport):
+    """Limits the number of requests to each host in progress at
+    once, from sending the request until the response is closed.
+    """
+    def __init__(self, transport: BaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: dict[str, BoundedSemaphore] = {}
+        self._lock = Lock()
+
+    def handle_request(self, request: Request) -> Response:
+        with self._lock:
+            if (semaphore := self._semaphores.get(request.url.host)) is None:
+                semaphore = BoundedSemaphore(self._max_per_host)
+                self._semaphores[request.url.host] = semaphore
+        semaphore.acquire()
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+        assert isinstance(response.stream, SyncByteStream)
+        response.stream = _Stream(response.stream, on_close=semaphore.release)
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _AsyncHostLimitedTransport(AsyncBaseTransport):
+    """Limits the number of requests to each host in progress at
+    once, from sending the request until the response is closed.
+    """
+    def __init__(self, transport: AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: dict[str, asyncio.BoundedSemaphore] = {}
+
+    async def handle_async_request(self, request: Request) -> Response:
+        if (semaphore := self._semaphores.get(request.url.host)) is None:
+            semaphore = asyncio.BoundedSemaphore(self._max_per_host)
+            self._semaphores[request.url.host] = semaphore
+        await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+        assert isinstance(response.stream, AsyncByteStream)
+        response.stream = _AsyncStream(
+            response.stream,
+            on_close=semaphore.release,
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _default_client_factory() -> ClientFactory:
+    return ClientFactory()
+
+
+def _default_client() -> Client:
+    factory: ClientFactory = __getattr__("DEFAULT_CLIENT_FACTORY")
+    return factory.client()
+
+
+def _default_async_client() -> AsyncClient:
+    factory: ClientFactory = __getattr__("DEFAULT_CLIENT_FACTORY")
+    return factory.async_client()
+
+
+# The defaults are created on first use, rather than on import, so
+# processes that never make HTTP requests don't pay for creating the
+# cache directory, reading the user agent's config, or importing
+# hishel and the HTTP/2 stack.
+DEFAULT_CACHE_PATH: Optional[Path]
+DEFAULT_USER_AGENT: str
+DEFAULT_CLIENT_FACTORY: ClientFactory
+DEFAULT_CLIENT: Client
+DEFAULT_ASYNC_CLIENT: AsyncClient
+
+_DEFAULTS: dict[str, Callable[[], Any]] = {
+    "DEFAULT_CACHE_PATH": _default_cache_path,
+    "DEFAULT_USER_AGENT": _default_user_agent,
+    "DEFAULT_CLIENT_FACTORY": _default_client_factory,
+    "DEFAULT_CLIENT": _default_client,
+    "DEFAULT_ASYNC_CLIENT": _default_async_client,
+}
+
+_DEFAULT_CLIENT_METHODS = (
+    "delete",
+    "get",
+    "head",
+    "options",
+    "patch",
+    "post",
+    "put",
+    "request",
+    "stream",
 )
 
+_defaults_lock = RLock()
+
+
+def __getattr__(name: str) -> Any:
+    with _defaults_lock:
+        if name in globals():
+            return globals()[name]
+        if (factory := _DEFAULTS.get(name)) is not None:
+            value = factory()
+        elif name in _DEFAULT_CLIENT_METHODS:
+            value = getattr(__getattr__("DEFAULT_CLIENT"), name)
+        else:
+            raise AttributeError(
+                f"module {__name__!r} has no attribute {name!r}",
+            )
+        globals()[name] = value
+        return value
+
 
 def response_as_json(r: Response) -> dict[str, Any]:
     return {
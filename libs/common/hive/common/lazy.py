@@ -0,0 +1,53 @@
+"""Lazily-loaded module attributes, per PEP 562.
+
+Packages list what they export, and where from, instead of importing
+it all up front, so importing a package costs only as much as the
+parts that are actually used::
+
+    __getattr__, __dir__ = lazy_exports(__name__, {
+        "Channel": ".channel:Channel",
+        "metrics": ".metrics",
+        "UnroutableError": "pika.exceptions:UnroutableError",
+        "blocking_connection":
+            ".message_bus:DEFAULT_MESSAGE_BUS.blocking_connection",
+    })
+
+Declare the same names in an ``if TYPE_CHECKING:`` block for type
+checkers and IDEs.
+"""
+from collections.abc import Callable, Mapping
+from functools import reduce
+from importlib import import_module
+from sys import modules
+from typing import Any
+
+
+def lazy_exports(
+        package: str,
+        exports: Mapping[str, str],
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Return `__getattr__` and `__dir__` functions for `package`.
+    `exports` maps each exported name to a "module:attribute" spec,
+    where the module may be relative to `package` and the attribute
+    may be dotted, or to just "module" to export the module itself.
+    Each export is resolved on first access, then stored in the
+    package's namespace so later accesses are free.
+    """
+    def __getattr__(name: str) -> Any:
+        try:
+            spec = exports[name]
+        except KeyError:
+            raise AttributeError(
+                f"module {package!r} has no attribute {name!r}",
+            ) from None
+        module_name, _, attrs = spec.partition(":")
+        value = import_module(module_name, package)
+        if attrs:
+            value = reduce(getattr, attrs.split("."), value)
+        setattr(modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(modules[package])) | set(exports))
+
+    return __getattr__, __dir__
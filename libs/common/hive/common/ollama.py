@@ -5,7 +5,6 @@ from httpx import Timeout
 from ollama import Client as _Client, ListResponse
 
 from .endpoint_config import read_endpoint_config
-from .httpx import DEFAULT_CLIENT
 from .units import MINUTE
 from .typing import dynamic_cast
 
@@ -15,7 +14,7 @@ Model: TypeAlias = ListResponse.Model
 # Ollama disables httpx's default timeout of 5 seconds.
 # We reenable it, except with a longer read timeout to
 # allow for slowness.
-_DEFAULT_TIMEOUT_KWARGS = DEFAULT_CLIENT.timeout.as_dict()
+_DEFAULT_TIMEOUT_KWARGS = Timeout(5.0).as_dict()
 _DEFAULT_TIMEOUT_KWARGS["read"] = max(
     _DEFAULT_TIMEOUT_KWARGS.get("read") or 0,
     (5 * MINUTE).total_seconds(),
@@ -1,5 +1,9 @@
+import subprocess
+import sys
+
 import pytest
 
+from contextlib import suppress
 from pathlib import Path
 from typing import Iterable
 
@@ -32,3 +36,36 @@ def test_config_dir(
 def want_to_see(caplog: pytest.LogCaptureFixture, msg: str) -> None:
     failure_detail = f"didn't see: {msg}"
     assert any(r.getMessage() == msg for r in caplog.records), failure_detail
+
+
+def assert_imports_within_budget(
+        module: str,
+        *,
+        max_seconds: float = 0.25,
+        forbidden: Iterable[str] = (),
+) -> None:
+    """Import `module` in a fresh interpreter, and check it took at
+    most `max_seconds`, and didn't import any of the `forbidden`
+    top-level packages along the way.
+    """
+    stderr = subprocess.run(
+        (sys.executable, "-X", "importtime", "-c", f"import {module}"),
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stderr
+    imported = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        with suppress(ValueError):
+            imported[name.strip()] = int(cumulative) / 1e6
+
+    loaded = {name.split(".", 1)[0] for name in imported}
+    unwanted = sorted(loaded.intersection(forbidden))
+    assert not unwanted, f"import {module}: imported {', '.join(unwanted)}"
+
+    seconds = imported[module]
+    assert seconds <= max_seconds, \
+        f"import {module}: took {seconds:.3f}s, budget {max_seconds:.3f}s"
@@ -1,10 +1,15 @@
+import asyncio
 import json
 
 from http.server import BaseHTTPRequestHandler, HTTPServer
+from threading import Thread
 
 import pytest
 
+from httpx import ConnectError
+
 from hive.common import httpx
+from hive.common.httpx import ClientFactory
 from hive.common.socketserver import serving
 
 
@@ -22,6 +27,8 @@ class TestServerRequestHandler(BaseHTTPRequestHandler):
         self.send_response(200)
         self.send_header("Content-type", "application/json")
         self.send_header("Content-Length", str(len(response)))
+        if self.path == "/cacheable":
+            self.send_header("Cache-Control", "max-age=60")
         self.end_headers()
         self.wfile.write(response)
 
@@ -72,3 +79,72 @@ def test_response_as_json(test_server):
     }
     assert headers["content-type"] == "application/json"
     assert headers["content-length"] == str(len(r.content))
+
+
+def test_client_stats(test_server, tmp_path):
+    factory = ClientFactory(cache_path=tmp_path)
+    with factory.client() as client:
+        for _ in range(2):
+            r = client.get(f"{test_server.base_url}/cacheable")
+            r.raise_for_status()
+    stats = factory.stats.as_dict()
+    assert stats["requests"] == 2
+    assert stats["errors"] == 0
+    assert stats["cache_misses"] == 1
+    assert stats["cache_hits"] == 1
+    assert stats["bytes_received"] == 2 * len(r.content)
+    assert 0 < stats["max_response_seconds"] <= stats["response_seconds"]
+
+
+def test_client_user_agent(test_server):
+    factory = ClientFactory(cache=False, user_agent="Test/1.0")
+    with factory.client() as client:
+        r = client.get(test_server.base_url)
+    assert r.json()["headers"]["user-agent"] == "Test/1.0"
+
+
+def test_client_errors():
+    factory = ClientFactory(cache=False, max_connections_per_host=1)
+    with factory.client() as client:
+        for _ in range(2):
+            with pytest.raises(ConnectError):
+                client.get("http://127.0.0.1:1/")
+    assert factory.stats.errors == 2
+
+
+def test_max_connections_per_host(test_server):
+    factory = ClientFactory(cache=False, max_connections_per_host=1)
+    responses = []
+    with factory.client() as client:
+        with client.stream("GET", test_server.base_url) as r:
+            thread = Thread(
+                target=lambda: responses.append(client.get(
+                    test_server.base_url,
+                )),
+                daemon=True,
+            )
+            thread.start()
+            thread.join(0.25)
+            assert thread.is_alive()
+            r.read()
+        thread.join(5)
+    assert not thread.is_alive()
+    assert responses[0].status_code == 200
+
+
+def test_async_client(test_server, tmp_path):
+    factory = ClientFactory(cache_path=tmp_path)
+    with factory.client() as client:
+        client.get(f"{test_server.base_url}/cacheable").raise_for_status()
+
+    async def fetch_all():
+        async with factory.async_client() as client:
+            return await asyncio.gather(*(
+                client.get(f"{test_server.base_url}/cacheable")
+                for _ in range(3)
+            ))
+
+    for r in asyncio.run(fetch_all()):
+        r.raise_for_status()
+        assert r.extensions["from_cache"]
+    assert factory.stats.cache_hits == 3
@@ -0,0 +1,15 @@
+from hive.common.testing import assert_imports_within_budget
+
+
+def test_import_hive_common():
+    assert_imports_within_budget(
+        "hive.common",
+        forbidden=("hishel", "httpx", "yaml"),
+    )
+
+
+def test_import_hive_common_httpx():
+    assert_imports_within_budget(
+        "hive.common.httpx",
+        forbidden=("hishel", "yaml"),
+    )
@@ -1,5 +1,8 @@
 import os
 
+from datetime import timedelta
+from queue import Queue
+
 import pytest
 
 from hive.common import read_config
@@ -49,3 +52,49 @@ def write_file(dirname, ext, content, basename="config"):
     if ext not in DEFAULT_READER.search_exts:
         return basename
     return new_basename
+
+
+def test_reads_are_cached(test_config_dir, monkeypatch):  # noqa: F811
+    key = write_file(test_config_dir, ".json", '{"hello": "world"}')
+    assert read_config(key) == {"hello": "world"}
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache miss")
+
+    with monkeypatch.context() as m:
+        m.setattr(DEFAULT_READER, "_read", fail)
+        result = read_config(key)
+        assert result == {"hello": "world"}
+        result["hello"] = "mutated"
+        assert read_config(key) == {"hello": "world"}
+
+
+def test_changed_files_are_reread(test_config_dir):  # noqa: F811
+    key = write_file(test_config_dir, ".json", '{"hello": "world"}')
+    assert read_config(key) == {"hello": "world"}
+    write_file(test_config_dir, ".json", '{"hello": "goodbye"}')
+    assert read_config(key) == {"hello": "goodbye"}
+
+
+def test_invalidate(test_config_dir):  # noqa: F811
+    key = write_file(test_config_dir, ".json", '{"hello": "world"}')
+    assert read_config(key) == {"hello": "world"}
+    write_file(test_config_dir, "", "hello: yaml")
+    assert read_config(key) == {"hello": "world"}
+    DEFAULT_READER.invalidate(key)
+    assert read_config(key) == {"hello": "yaml"}
+
+
+def test_watch(test_config_dir):  # noqa: F811
+    key = write_file(test_config_dir, ".json", '{"hello": "world"}')
+    changes = Queue()
+    stop = DEFAULT_READER.watch(
+        key,
+        changes.put,
+        interval=timedelta(milliseconds=10),
+    )
+    try:
+        write_file(test_config_dir, ".json", '{"hello": "rotated"}')
+        assert changes.get(timeout=5) == {"hello": "rotated"}
+    finally:
+        stop()
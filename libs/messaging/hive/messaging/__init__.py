@@ -1,14 +1,42 @@
-from pika.exceptions import UnroutableError
+from typing import TYPE_CHECKING
 
-from .channel import Channel
-from .connection import Connection
-from .message import Message
-from .message_bus import MessageBus
+from hive.common.lazy import lazy_exports
 
-DEFAULT_MESSAGE_BUS = MessageBus()
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from contextlib import AbstractContextManager
 
-blocking_connection = DEFAULT_MESSAGE_BUS.blocking_connection
-publisher_connection = DEFAULT_MESSAGE_BUS.publisher_connection
+    from pika.exceptions import UnroutableError
+
+    from . import metrics
+    from .batch import PublishBatch, PublishBatchError
+    from .channel import Channel
+    from .connection import Connection
+    from .message import Message
+    from .message_bus import DEFAULT_MESSAGE_BUS, MessageBus
+    from .priority import Priority
+
+    blocking_connection = DEFAULT_MESSAGE_BUS.blocking_connection
+    publisher_connection = DEFAULT_MESSAGE_BUS.publisher_connection
+    pooled_channel: Callable[[], AbstractContextManager[Channel]]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "Channel": ".channel:Channel",
+    "Connection": ".connection:Connection",
+    "DEFAULT_MESSAGE_BUS": ".message_bus:DEFAULT_MESSAGE_BUS",
+    "Message": ".message:Message",
+    "MessageBus": ".message_bus:MessageBus",
+    "Priority": ".priority:Priority",
+    "PublishBatch": ".batch:PublishBatch",
+    "PublishBatchError": ".batch:PublishBatchError",
+    "UnroutableError": "pika.exceptions:UnroutableError",
+    "blocking_connection":
+        ".message_bus:DEFAULT_MESSAGE_BUS.blocking_connection",
+    "metrics": ".metrics",
+    "pooled_channel": ".message_bus:DEFAULT_MESSAGE_BUS.pooled_channel",
+    "publisher_connection":
+        ".message_bus:DEFAULT_MESSAGE_BUS.publisher_connection",
+})
 
 __all__ = [
     "Channel",
@@ -16,7 +44,12 @@ __all__ = [
     "DEFAULT_MESSAGE_BUS",
     "Message",
     "MessageBus",
+    "Priority",
+    "PublishBatch",
+    "PublishBatchError",
     "UnroutableError",
     "blocking_connection",
+    "metrics",
+    "pooled_channel",
     "publisher_connection",
 ]
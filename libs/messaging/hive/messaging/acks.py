@@ -0,0 +1,84 @@
+import logging
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Optional
+
+from pika.adapters.blocking_connection import BlockingChannel as _PikaChannel
+
+from hive.common.units import MILLISECOND
+
+logger = logging.getLogger(__name__)
+d = logger.debug
+
+
+@dataclass
+class AckBatcher:
+    """Coalesce acknowledgements into `basic_ack(multiple=True)` calls.
+
+    Successfully handled deliveries are acknowledged in batches of up
+    to `max_batch_size`, or after at most `max_delay`, whichever comes
+    first.  Rejections are unaffected, and are sent immediately so
+    the message is dead-lettered as soon as its handler fails.
+
+    Multiple-acks cover every outstanding delivery up to and including
+    the given tag, so this is only safe if every delivery with a lower
+    tag on the same channel has already been acked or rejected, i.e.
+    if deliveries are handled in order and this batcher is the only
+    thing acking messages on its channel.
+    """
+    _pika: _PikaChannel
+    max_batch_size: int = 1
+    max_delay: timedelta = 100 * MILLISECOND
+    _pending_tag: Optional[int] = field(default=None, init=False)
+    _pending_count: int = field(default=0, init=False)
+    _timer: Optional[object] = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        if self.max_batch_size < 1:
+            raise ValueError(self.max_batch_size)
+
+    @property
+    def is_batching(self) -> bool:
+        return self.max_batch_size > 1
+
+    def ack(self, delivery_tag: int) -> None:
+        if not self.is_batching:
+            self._pika.basic_ack(delivery_tag=delivery_tag)
+            return
+
+        self._pending_tag = delivery_tag
+        self._pending_count += 1
+        if self._pending_count >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = self._pika.connection.call_later(
+                self.max_delay.total_seconds(),
+                self._on_timer,
+            )
+
+    def reject(self, delivery_tag: int) -> None:
+        self._pika.basic_reject(delivery_tag=delivery_tag, requeue=False)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self.flush()
+
+    def flush(self) -> None:
+        """Send any pending acknowledgements.
+        """
+        if (timer := self._timer) is not None:
+            self._timer = None
+            self._pika.connection.remove_timeout(timer)
+
+        if (delivery_tag := self._pending_tag) is None:
+            return
+        count = self._pending_count
+        self._pending_tag = None
+        self._pending_count = 0
+
+        d("Acking %d message(s) up to %d", count, delivery_tag)
+        if count == 1:
+            self._pika.basic_ack(delivery_tag=delivery_tag)
+        else:
+            self._pika.basic_ack(delivery_tag=delivery_tag, multiple=True)
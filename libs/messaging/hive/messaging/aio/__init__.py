@@ -0,0 +1,25 @@
+"""Asyncio-native counterparts to :mod:`hive.messaging`'s blocking API.
+"""
+from typing import TYPE_CHECKING
+
+from hive.common.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from ..message_bus import DEFAULT_MESSAGE_BUS
+    from .channel import AsyncChannel
+    from .connection import AsyncConnection
+
+    async_connection = DEFAULT_MESSAGE_BUS.async_connection
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "AsyncChannel": ".channel:AsyncChannel",
+    "AsyncConnection": ".connection:AsyncConnection",
+    "async_connection":
+        "..message_bus:DEFAULT_MESSAGE_BUS.async_connection",
+})
+
+__all__ = [
+    "AsyncChannel",
+    "AsyncConnection",
+    "async_connection",
+]
@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Optional, TYPE_CHECKING
+
+from pika.channel import Channel as _PikaChannel
+from pika.exceptions import ChannelClosed
+from pika.spec import BasicProperties
+
+from ..channel import ChannelBase
+from ..confirms import ConfirmTracker
+from ..message import Message
+from ..metrics import HandlerTimer
+from ..semantics import Semantics
+from .futures import call_async, reject, resolve
+
+if TYPE_CHECKING:
+    from ..typing import ConsumerTag
+    from .typing import OnAsyncMessageCallback
+
+logger = logging.getLogger(__name__)
+d = logger.debug
+
+
+@dataclass
+class AsyncChannel(ChannelBase):
+    """Like :class:`hive.messaging.Channel` but for asyncio.
+
+    Publishing methods are coroutines that return once the message
+    is confirmed by the broker (if the channel has confirm_delivery
+    enabled), so many publishes may be in flight at once.  Consumer
+    callbacks are coroutines, with up to `concurrency` invocations
+    running concurrently per consumer.
+    """
+    _pika: _PikaChannel
+    _exchanges: dict[tuple[str, str], asyncio.Future[str]] = field(
+        default_factory=dict,
+        init=False,
+    )
+    _rpcs: set[asyncio.Future[Any]] = field(default_factory=set, init=False)
+    _tasks: set[asyncio.Task[None]] = field(default_factory=set, init=False)
+    _confirms: Optional[ConfirmTracker] = field(default=None, init=False)
+    _prefetch_count: Optional[int] = field(default=None, init=False)
+    _closed: Optional[asyncio.Future[BaseException]] = field(
+        default=None,
+        init=False,
+    )
+
+    def __hash__(self) -> int:
+        return id(self)
+
+    async def _on_open(self, *, confirm_delivery: bool) -> None:
+        self._closed = asyncio.get_running_loop().create_future()
+        self._pika.add_on_close_callback(self._on_close)
+        if confirm_delivery:
+            confirms = ConfirmTracker()
+            self._pika.add_on_return_callback(confirms.on_return)
+            await self._rpc(self._pika.confirm_delivery, confirms.on_ack_nack)
+            self._confirms = confirms
+
+    def _on_close(self, _: Any, reason: BaseException) -> None:
+        d("%s: channel closed: %s", self, reason)
+        if self._closed is not None:
+            resolve(self._closed, reason)
+        for future in self._rpcs:
+            reject(future, reason)
+        self._rpcs.clear()
+        if (confirms := self._confirms) is not None:
+            confirms.on_close(_, reason)
+        for task in self._tasks:
+            task.cancel()
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self._pika.is_open)
+
+    async def close(self) -> None:
+        """Cancel any running consumer callbacks, then close the
+        channel.  Messages whose callbacks were cancelled are left
+        unacknowledged, for the broker to redeliver.
+        """
+        tasks = self._tasks - {asyncio.current_task()}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._pika.is_open:
+            self._pika.close()
+        if self._closed is not None:
+            await self._closed
+
+    async def _rpc(
+            self,
+            func: Callable[..., Any],
+            *args: Any,
+            **kwargs: Any
+    ) -> Any:
+        if not self._pika.is_open:
+            raise ChannelClosed(-1, "channel is not open")
+        future = call_async(func, *args, **kwargs)
+        self._rpcs.add(future)
+        try:
+            return await future
+        finally:
+            self._rpcs.discard(future)
+
+    # Same as `Channel`, but awaitable.
+
+    async def publish_request(self, **kwargs: Any) -> None:
+        await self._publish(mandatory=True, **kwargs)
+
+    async def publish_event(self, **kwargs: Any) -> None:
+        await self._publish(**kwargs)
+
+    async def maybe_publish_event(self, **kwargs: Any) -> None:
+        try:
+            await self.publish_event(**kwargs)
+        except Exception:
+            logger.warning("EXCEPTION", exc_info=True)
+
+    async def consume_requests(self, **kwargs: Any) -> ConsumerTag:
+        return await self._consume(Semantics.COMPETING_CONSUMERS, **kwargs)
+
+    async def consume_events(self, **kwargs: Any) -> ConsumerTag:
+        return await self._consume(Semantics.PUBLISH_SUBSCRIBE, **kwargs)
+
+    async def start_consuming(self) -> None:
+        """Wait until this channel closes, consuming as we go.
+        """
+        if self._closed is None:
+            raise RuntimeError("not opened")
+        await asyncio.shield(self._closed)
+
+    # Publishing
+
+    async def _publish(
+            self,
+            *,
+            routing_key: str,
+            topic: str = "",
+            correlation_id: Optional[str] = None,
+            mandatory: bool = False,
+            consume_by: Optional[datetime] = None,
+            priority: Optional[int] = None,
+            **kwargs: Any,
+    ) -> None:
+        payload, prepared = self._prepare(routing_key, **kwargs)
+
+        exchange = await self._exchange_for(routing_key, topic)
+        routing_key = topic
+
+        properties = self._basic_properties(
+            **prepared,
+            correlation_id=correlation_id,
+            consume_by=consume_by,
+            priority=priority,
+        )
+
+        await self._basic_publish(
+            exchange=exchange,
+            routing_key=routing_key,
+            body=payload,
+            properties=properties,
+            mandatory=mandatory,
+        )
+
+    async def _basic_publish(
+            self,
+            *,
+            exchange: str,
+            routing_key: str,
+            body: bytes,
+            properties: BasicProperties,
+            mandatory: bool,
+    ) -> None:
+        if not self._pika.is_open:
+            raise ChannelClosed(-1, "channel is not open")
+
+        kwargs: dict[str, Any] = {
+            "exchange": exchange,
+            "routing_key": routing_key,
+            "body": body,
+            "properties": properties,
+            "mandatory": mandatory,
+        }
+        if (confirms := self._confirms) is None:
+            self._pika.basic_publish(**kwargs)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        confirms.publish(future, self._pika.basic_publish, **kwargs)
+        await future
+
+    # Consuming
+
+    async def _consume(
+            self,
+            semantics: Semantics,
+            *,
+            queue: str,
+            on_message_callback: OnAsyncMessageCallback,
+            exclusive: bool = False,
+            topic: str = "",
+            max_priority: Optional[int] = None,
+            **consume_kwargs: Any
+    ) -> ConsumerTag:
+        exchange = await self._exchange_for(queue, topic)
+        queue = self._consumer_queue(semantics, queue, exclusive)
+
+        kwargs: dict[str, Any] = {}
+        if max_priority is not None:
+            kwargs["arguments"] = self._priority_arguments(max_priority)
+        if exclusive:
+            await self.queue_declare(queue, exclusive=True, **kwargs)
+        else:
+            await self.queue_declare(
+                queue,
+                durable=True,
+                dead_letter_routing_key=queue,
+                **kwargs
+            )
+
+        kwargs = {}
+        if topic:
+            kwargs["routing_key"] = topic
+
+        await self._rpc(
+            self._pika.queue_bind,
+            queue=queue,
+            exchange=exchange,
+            **kwargs
+        )
+
+        return await self._basic_consume(
+            queue,
+            on_message_callback,
+            **consume_kwargs
+        )
+
+    async def set_prefetch_count(self, value: int) -> None:
+        if self._prefetch_count == value:
+            return
+        if self._prefetch_count is not None:
+            raise ValueError(value)
+        await self._rpc(self._pika.basic_qos, prefetch_count=value)
+        self._prefetch_count = value
+
+    @property
+    def prefetch_count(self) -> Optional[int]:
+        return self._prefetch_count
+
+    async def _basic_consume(
+            self,
+            queue: str,
+            on_message_callback: OnAsyncMessageCallback,
+            *,
+            concurrency: int = 1,
+            prefetch_count: Optional[int] = None,
+            drop_expired: bool = False,
+            max_age: Optional[timedelta] = None,
+    ) -> ConsumerTag:
+        """Start a consumer that acks or dead-letters every message.
+
+        :param concurrency: The maximum number of `on_message_callback`
+            invocations this consumer will run at once.
+        :param prefetch_count: The maximum number of unacknowledged
+            messages the broker will deliver to this channel.  The
+            default is `concurrency`.
+        :param drop_expired: Ack without handling messages whose
+            publishers' `consume_by` deadlines have passed.
+        :param max_age: Ack without handling messages whose CloudEvent
+            `time` is longer ago than this.
+        """
+        if concurrency < 1:
+            raise ValueError(concurrency)
+        if prefetch_count is None:
+            prefetch_count = concurrency
+        await self.set_prefetch_count(prefetch_count)
+        is_stale = self._staleness_check(drop_expired, max_age)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def handle_message(message: Message) -> None:
+            delivery_tag = message.method.delivery_tag
+            assert delivery_tag is not None
+            async with semaphore:
+                timer = HandlerTimer(queue, message)
+                try:
+                    await on_message_callback(self, message)
+                    timer.done("ack")
+                    if self._pika.is_open:
+                        self._pika.basic_ack(delivery_tag=delivery_tag)
+
+                except Exception as e:
+                    timer.done("reject")
+                    if self._pika.is_open:
+                        self._pika.basic_reject(
+                            delivery_tag=delivery_tag,
+                            requeue=False,
+                        )
+                    self._log_callback_exception(e)
+
+        def _wrapped_callback(
+                channel: _PikaChannel,
+                *args: Any,
+                **kwargs: Any,
+        ) -> None:
+            assert channel is self._pika
+            message = Message(*args, **kwargs)
+            if self._discard_if_stale(queue, message, is_stale):
+                delivery_tag = message.method.delivery_tag
+                assert delivery_tag is not None
+                self._pika.basic_ack(delivery_tag=delivery_tag)
+                return
+            task = asyncio.get_running_loop().create_task(
+                handle_message(message),
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        consumer_tag: Optional[str] = None
+
+        def basic_consume(**kwargs: Any) -> None:
+            nonlocal consumer_tag
+            consumer_tag = self._pika.basic_consume(**kwargs)
+
+        await self._rpc(
+            basic_consume,
+            queue=queue,
+            on_message_callback=_wrapped_callback,
+        )
+        assert consumer_tag is not None
+        return consumer_tag
+
+    # Exchanges
+
+    async def _exchange_for(self, routing_key: str, topic: str) -> str:
+        return await self._hive_exchange(
+            routing_key,
+            self._exchange_type_for(topic),
+        )
+
+    async def dead_letter_exchange(self) -> str:
+        return await self._hive_exchange("dead.letter", "direct")
+
+    async def _hive_exchange(self, exchange: str, exchange_type: str) -> str:
+        key = (exchange, exchange_type)
+        if (future := self._exchanges.get(key)) is None:
+            future = asyncio.ensure_future(
+                self._declare_hive_exchange(exchange, exchange_type),
+            )
+            self._exchanges[key] = future
+
+            def forget_failure(future: asyncio.Future[str]) -> None:
+                if future.cancelled() or future.exception() is not None:
+                    if self._exchanges.get(key) is future:
+                        del self._exchanges[key]
+
+            future.add_done_callback(forget_failure)
+        return await asyncio.shield(future)
+
+    async def _declare_hive_exchange(
+            self,
+            exchange: str,
+            exchange_type: str,
+    ) -> str:
+        name = self._hive_exchange_name(exchange)
+        await self._rpc(
+            self._pika.exchange_declare,
+            exchange=name,
+            exchange_type=exchange_type,
+            durable=True,
+        )
+        return name
+
+    # Queues
+
+    async def queue_declare(
+            self,
+            queue: str,
+            *,
+            dead_letter_routing_key: Optional[str] = None,
+            arguments: Optional[dict[str, Any]] = None,
+            **kwargs: Any
+    ) -> None:
+        if dead_letter_routing_key:
+            DLX_ARG = "x-dead-letter-exchange"
+            if arguments:
+                if DLX_ARG in arguments:
+                    raise ValueError(arguments)
+                arguments = arguments.copy()
+            else:
+                arguments = {}
+
+            dead_letter_queue = self._dead_letter_queue_for(
+                dead_letter_routing_key,
+            )
+            await self._rpc(
+                self._pika.queue_declare,
+                dead_letter_queue,
+                durable=True,
+            )
+
+            dead_letter_exchange = await self.dead_letter_exchange()
+            await self._rpc(
+                self._pika.queue_bind,
+                queue=dead_letter_queue,
+                exchange=dead_letter_exchange,
+                routing_key=dead_letter_routing_key,
+            )
+
+            arguments[DLX_ARG] = dead_letter_exchange
+
+        if arguments:
+            kwargs["arguments"] = arguments
+        await self._rpc(self._pika.queue_declare, queue, **kwargs)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+
+from dataclasses import KW_ONLY, dataclass, field
+from typing import Any, Optional, TYPE_CHECKING
+from typing_extensions import Self
+
+from pika import ConnectionParameters
+from pika.adapters.asyncio_connection import AsyncioConnection
+from pika.channel import Channel as _PikaChannel
+
+from .channel import AsyncChannel
+from .futures import resolve, reject
+
+if TYPE_CHECKING:
+    from .typing import OnAsyncChannelOpenCallback
+
+
+@dataclass
+class AsyncConnection:
+    """Like :class:`hive.messaging.Connection` but for asyncio.
+
+    Use as an async context manager::
+
+        async with async_connection() as conn:
+            channel = await conn.channel()
+            ...
+    """
+    _params: ConnectionParameters
+    _: KW_ONLY
+    on_channel_open: Optional[OnAsyncChannelOpenCallback] = None
+    _pika: Optional[AsyncioConnection] = field(default=None, init=False)
+    _closed: Optional[asyncio.Future[Optional[BaseException]]] = field(
+        default=None,
+        init=False,
+    )
+
+    def __hash__(self) -> int:
+        return id(self)
+
+    async def __aenter__(self) -> Self:
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    @property
+    def is_open(self) -> bool:
+        return self._pika is not None and self._pika.is_open
+
+    async def open(self) -> None:
+        if self._pika is not None:
+            raise RuntimeError("already opened")
+
+        loop = asyncio.get_running_loop()
+        opened: asyncio.Future[None] = loop.create_future()
+        closed: asyncio.Future[Optional[BaseException]] = loop.create_future()
+
+        def on_open(_: Any) -> None:
+            resolve(opened, None)
+
+        def on_open_error(_: Any, exc: BaseException | str) -> None:
+            if not isinstance(exc, BaseException):
+                exc = ConnectionError(exc)
+            reject(opened, exc)
+            resolve(closed, exc)
+
+        def on_close(_: Any, exc: BaseException) -> None:
+            reject(opened, exc)
+            resolve(closed, exc)
+
+        self._closed = closed
+        self._pika = AsyncioConnection(
+            self._params,
+            on_open_callback=on_open,
+            on_open_error_callback=on_open_error,
+            on_close_callback=on_close,
+            custom_ioloop=loop,
+        )
+        try:
+            await opened
+        except BaseException:
+            self._pika = None
+            raise
+
+    async def close(self) -> None:
+        if self._pika is None or self._closed is None:
+            return
+        if not self._pika.is_closed and not self._pika.is_closing:
+            self._pika.close()
+        await self._closed
+
+    async def wait_closed(self) -> Optional[BaseException]:
+        """Wait for the connection to close, and return the reason.
+        """
+        if self._closed is None:
+            raise RuntimeError("not opened")
+        return await asyncio.shield(self._closed)
+
+    async def channel(
+            self,
+            *,
+            name: str = "",
+            confirm_delivery: bool = True,
+    ) -> AsyncChannel:
+        """Like :meth:`hive.messaging.Connection.channel`.
+
+        :param name: Used by `AsyncChannel.consume_events()` to
+            construct unique queue names.
+        :param confirm_delivery: Whether to enable delivery
+            confirmations.  Hive's default is True.
+        """
+        if self._pika is None:
+            raise RuntimeError("not opened")
+
+        loop = asyncio.get_running_loop()
+        opened: asyncio.Future[_PikaChannel] = loop.create_future()
+        pika_channel = self._pika.channel(
+            on_open_callback=lambda c: resolve(opened, c),
+        )
+        # Channels are closed if the broker refuses them, and when
+        # their connection closes.
+        pika_channel.add_on_close_callback(lambda _, e: reject(opened, e))
+        channel = AsyncChannel(await opened, name=name)
+        await channel._on_open(confirm_delivery=confirm_delivery)
+        if self.on_channel_open:
+            self.on_channel_open(channel)
+        return channel
@@ -0,0 +1,34 @@
+import asyncio
+
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+def resolve(future: asyncio.Future[T], result: T) -> None:
+    """Set a future's result, unless it's already done (or cancelled).
+    """
+    if not future.done():
+        future.set_result(result)
+
+
+def reject(future: asyncio.Future[Any], exc: BaseException) -> None:
+    """Set a future's exception, unless it's already done (or cancelled).
+    """
+    if not future.done():
+        future.set_exception(exc)
+
+
+def call_async(
+        func: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any
+) -> asyncio.Future[Any]:
+    """Call a Pika method that takes a `callback` argument, and
+    return a future that's resolved with whatever gets passed to
+    the callback, usually the reply frame.
+    """
+    future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+    func(*args, callback=lambda result: resolve(future, result), **kwargs)
+    return future
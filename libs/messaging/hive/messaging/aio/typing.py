@@ -0,0 +1,11 @@
+from collections.abc import Awaitable
+from typing import Callable, TypeAlias
+
+from ..message import Message
+from .channel import AsyncChannel
+
+OnAsyncChannelOpenCallback: TypeAlias = Callable[[AsyncChannel], None]
+OnAsyncMessageCallback: TypeAlias = Callable[
+    [AsyncChannel, Message],
+    Awaitable[None],
+]
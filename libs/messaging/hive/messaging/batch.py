@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any, Optional, Protocol
+
+from pika import BasicProperties
+
+
+@dataclass
+class PreparedPublish:
+    """A message encapsulated for publishing, but not yet published.
+    """
+    routing_key: str
+    topic: str
+    body: bytes
+    properties: BasicProperties
+    mandatory: bool
+
+
+class BatchPublisher(Protocol):
+    @property
+    def _prepare_publish(self) -> Callable[..., PreparedPublish]: ...
+
+    def _send_batch(
+            self,
+            batch: list[PreparedPublish],
+    ) -> list[Future[None]]: ...
+
+
+class PublishBatchError(Exception):
+    """Some messages in a batch weren't delivered.
+
+    :ivar failures: Each failed message's index in its batch, mapped
+        to the exception its individual publish would have raised,
+        for example :class:`pika.exceptions.UnroutableError`.
+    """
+    def __init__(self, failures: dict[int, BaseException], size: int):
+        self.failures = failures
+        self.size = size
+        super().__init__(f"{len(failures)} of {size} messages failed")
+
+
+@dataclass
+class PublishBatch:
+    """Collect messages, encapsulating each as it's added, then publish
+    them back to back and wait for the broker to confirm them all at
+    once.  Use as a context manager to publish on exit, or call `flush`.
+    """
+    _channel: BatchPublisher
+    _prepared: list[PreparedPublish] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self._prepared)
+
+    def publish_request(self, **kwargs: Any) -> None:
+        self._prepared.append(
+            self._channel._prepare_publish(mandatory=True, **kwargs),
+        )
+
+    def publish_event(self, **kwargs: Any) -> None:
+        self._prepared.append(self._channel._prepare_publish(**kwargs))
+
+    def flush(self) -> None:
+        """Publish everything added since the last flush, and wait
+        until all of it is confirmed.  Raises :class:`PublishBatchError`
+        if any message wasn't delivered.
+        """
+        batch, self._prepared = self._prepared, []
+        if not batch:
+            return
+        futures = self._channel._send_batch(batch)
+        failures = {
+            index: exception
+            for index, exception in enumerate(
+                future.exception() for future in futures
+            )
+            if exception is not None
+        }
+        if failures:
+            raise PublishBatchError(failures, len(batch))
+
+    def __enter__(self) -> PublishBatch:
+        return self
+
+    def __exit__(
+            self,
+            exc_type: Optional[type[BaseException]],
+            exc_value: Optional[BaseException],
+            traceback: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,334 @@
+"""Throughput and latency benchmarks for :mod:`hive.messaging`.
+
+Run against the broker :class:`MessageBus` would normally connect
+to, for example the test server in ``tests/server``, or against the
+in-process stand-in in :mod:`hive.messaging.memory`::
+
+    hive-messaging-benchmark --output results.json
+    hive-messaging-benchmark --broker memory latency prefetch
+
+Results are written as a single JSON document, so they can be saved
+and compared across releases to spot regressions.  Every benchmark
+publishes events to the durable fanout exchange ``hive.benchmark``,
+and consumes them from exclusive queues, so nothing is left queued
+on the broker.
+"""
+import json
+import logging
+import platform
+import sys
+
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
+from statistics import fmean, quantiles
+from threading import Event, Thread
+from time import perf_counter
+from timeit import Timer
+from typing import Any, Optional
+
+from hive.common import ArgumentParser, utc_now
+
+from .__version__ import __version__
+from .channel import Channel
+from .message import Message
+from .message_bus import MessageBus
+
+logger = logging.getLogger(__name__)
+
+ROUTING_KEY = "benchmark"
+
+Results = dict[str, Any]
+
+
+@dataclass
+class Benchmarks:
+    bus: MessageBus
+    count: int = 1000
+    payload_size: int = 256
+    prefetch_counts: tuple[int, ...] = (1, 10, 100)
+    timeout: float = 60.0
+
+    def run(self, names: Iterable[str] = ()) -> Results:
+        """Run the named benchmarks, or all of them, and return
+        their results.
+        """
+        if not (names := list(names)):
+            names = list(BENCHMARKS)
+        results = {}
+        for name in names:
+            logger.info("Running %s benchmark", name)
+            results[name] = getattr(self, name)()
+        return results
+
+    @property
+    def data(self) -> dict[str, str]:
+        return {"padding": "x" * self.payload_size}
+
+    def publish(self) -> Results:
+        """Publish rate with and without delivery confirmation.
+        """
+        results = {}
+        with self.bus.blocking_connection() as conn:
+            for confirm_delivery in (False, True):
+                channel = conn.channel(confirm_delivery=confirm_delivery)
+                key = "confirmed" if confirm_delivery else "unconfirmed"
+                results[key] = self._time_publishes(channel.publish_event)
+        return results
+
+    def handoff(self) -> Results:
+        """The overhead of publishing via :class:`PublisherConnection`'s
+        I/O thread, compared with publishing directly.
+        """
+        with self.bus.blocking_connection() as conn:
+            direct = self._time_publishes(conn.channel().publish_event)
+
+        with self.bus.publisher_connection() as conn:
+            channel = conn.channel()
+            publisher = self._time_publishes(channel.publish_event)
+
+            def publish_async(**kwargs: Any) -> None:
+                futures.append(channel.publish_event_async(**kwargs))
+
+            futures: list[Future[None]] = []
+            start = perf_counter()
+            self._publish_all(publish_async)
+            wait(futures, timeout=self.timeout)
+            publisher_async = self._rate(perf_counter() - start)
+
+        overhead = (publisher["seconds"] - direct["seconds"]) / self.count
+        return {
+            "direct": direct,
+            "publisher_connection": publisher,
+            "publisher_connection_async": publisher_async,
+            "overhead_seconds_per_message": overhead,
+        }
+
+    def latency(self) -> Results:
+        """End-to-end latency, from just before each event is published
+        to the start of its consumer's callback.
+        """
+        samples: list[float] = []
+
+        def on_message(channel: Channel, message: Message) -> None:
+            samples.append(perf_counter() - message.json()["data"]["sent"])
+            if len(samples) >= self.count:
+                channel._pika.stop_consuming()
+
+        consumer = self._start_consumer(on_message)
+        with self.bus.blocking_connection() as conn:
+            channel = conn.channel()
+            for _ in range(self.count):
+                channel.publish_event(
+                    routing_key=ROUTING_KEY,
+                    data={"sent": perf_counter(), **self.data},
+                )
+        consumer.join(self.timeout)
+        return {"messages": len(samples), **_summarize(samples)}
+
+    def encapsulation(self) -> Results:
+        """CPU time to encapsulate a message for publishing.
+        """
+        payloads: dict[str, dict[str, Any]] = {
+            "dict": {"message": self.data},
+            "bytes": {
+                "message": b"x" * self.payload_size,
+                "content_type": "application/octet-stream",
+            },
+            "cloudevent": {"data": self.data},
+        }
+        results = {}
+        for name, kwargs in payloads.items():
+            timer = Timer(lambda: Channel._prepare_publish(
+                routing_key=ROUTING_KEY,
+                **kwargs
+            ))
+            number = max(self.count, 100)
+            seconds = min(timer.repeat(repeat=3, number=number)) / number
+            results[name] = {"seconds_per_message": seconds}
+        return results
+
+    def prefetch(self) -> Results:
+        """Consume rate from a full queue at different prefetch counts.
+        """
+        results = {}
+        for prefetch_count in self.prefetch_counts:
+            handled = 0
+            finished_at = 0.0
+
+            def on_message(channel: Channel, message: Message) -> None:
+                nonlocal handled, finished_at
+                handled += 1
+                if handled >= self.count:
+                    finished_at = perf_counter()
+                    channel._pika.stop_consuming()
+
+            ready = Event()
+            consumer = self._start_consumer(
+                on_message,
+                prefetch_count=prefetch_count,
+                wait_for=ready,
+            )
+            with self.bus.blocking_connection() as conn:
+                self._publish_all(conn.channel().publish_event)
+            start = perf_counter()
+            ready.set()
+            consumer.join(self.timeout)
+            results[str(prefetch_count)] = self._rate(
+                (finished_at or perf_counter()) - start,
+                handled,
+            )
+        return results
+
+    # Helpers
+
+    def _publish_all(self, publish: Callable[..., Any]) -> None:
+        for _ in range(self.count):
+            publish(routing_key=ROUTING_KEY, data=self.data)
+
+    def _time_publishes(self, publish: Callable[..., Any]) -> Results:
+        start = perf_counter()
+        self._publish_all(publish)
+        return self._rate(perf_counter() - start)
+
+    def _rate(
+            self,
+            seconds: float,
+            messages: Optional[int] = None,
+    ) -> Results:
+        if messages is None:
+            messages = self.count
+        return {
+            "messages": messages,
+            "seconds": seconds,
+            "messages_per_second": messages / seconds if seconds else None,
+        }
+
+    def _start_consumer(
+            self,
+            on_message_callback: Callable[[Channel, Message], None],
+            *,
+            wait_for: Optional[Event] = None,
+            **kwargs: Any
+    ) -> Thread:
+        """Start consuming on a new connection in a new thread, once
+        the consumer's queue is bound and `wait_for` (if supplied)
+        is set.
+        """
+        bound = Event()
+
+        def run() -> None:
+            try:
+                with self.bus.blocking_connection() as conn:
+                    channel = conn.channel(name="benchmark")
+                    channel.consume_events(
+                        queue=ROUTING_KEY,
+                        on_message_callback=on_message_callback,
+                        exclusive=True,
+                        **kwargs
+                    )
+                    bound.set()
+                    if wait_for is not None:
+                        wait_for.wait(self.timeout)
+                    channel.start_consuming()
+            finally:
+                bound.set()
+
+        thread = Thread(target=run, name="BenchmarkConsumer", daemon=True)
+        thread.start()
+        bound.wait(self.timeout)
+        return thread
+
+
+BENCHMARKS = ("publish", "handoff", "latency", "encapsulation", "prefetch")
+
+
+def _summarize(samples: list[float]) -> Results:
+    if len(samples) < 2:
+        return {}
+    percentiles = quantiles(samples, n=100, method="inclusive")
+    return {
+        "min_seconds": min(samples),
+        "mean_seconds": fmean(samples),
+        "p50_seconds": percentiles[49],
+        "p90_seconds": percentiles[89],
+        "p99_seconds": percentiles[98],
+        "max_seconds": max(samples),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "benchmarks",
+        metavar="BENCHMARK",
+        nargs="*",
+        help=f"benchmarks to run [default: all of {', '.join(BENCHMARKS)}]",
+    )
+    parser.add_argument(
+        "--broker",
+        choices=("rabbitmq", "memory"),
+        default="rabbitmq",
+        help="broker to run against [default: rabbitmq]",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=Benchmarks.count,
+        help=f"messages per measurement [default: {Benchmarks.count}]",
+    )
+    parser.add_argument(
+        "--payload-size",
+        type=int,
+        default=Benchmarks.payload_size,
+        help=f"payload size in bytes [default: {Benchmarks.payload_size}]",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        nargs="+",
+        default=Benchmarks.prefetch_counts,
+        help="prefetch counts to compare [default: 1 10 100]",
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="file to write results to [default: stdout]",
+    )
+    args = parser.parse_args(argv)
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name!r}")
+
+    if args.broker == "memory":
+        from .memory import InMemoryMessageBus
+        bus: MessageBus = InMemoryMessageBus()
+    else:
+        bus = MessageBus()
+
+    benchmarks = Benchmarks(
+        bus,
+        count=args.count,
+        payload_size=args.payload_size,
+        prefetch_counts=tuple(args.prefetch),
+    )
+    report = {
+        "hive_messaging_version": __version__,
+        "python_version": platform.python_version(),
+        "broker": args.broker,
+        "started_at": utc_now().isoformat(),
+        "count": args.count,
+        "payload_size": args.payload_size,
+        "results": benchmarks.run(args.benchmarks),
+    }
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(report, fp, indent=2)
+            print(file=fp)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,15 @@ import json
 import logging
 
 from base64 import b32encode
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from dataclasses import KW_ONLY, dataclass
-from functools import cache, cached_property
+from dataclasses import KW_ONLY, dataclass, field
+from functools import cache, cached_property, partial
 from secrets import token_bytes
-from typing import Any, Literal, Optional, TYPE_CHECKING
+from threading import Lock
+from time import monotonic
+from typing import Any, Iterable, Literal, Optional, TYPE_CHECKING, cast
+from uuid import uuid4
 
 from cloudevents.pydantic import CloudEvent
 from cloudevents.conversion import to_json
@@ -16,28 +20,461 @@ from cloudevents.conversion import to_json
 from pika import BasicProperties
 from pika.adapters.blocking_connection import BlockingChannel as _PikaChannel
 from pika.delivery_mode import DeliveryMode  # type: ignore
+from pika.exceptions import ChannelWrongStateError
 
 from pydantic import BaseModel
 
 from hive.common import SERVICE_NAME, utc_now
-
-from .message import Message
+from hive.common.typing import AnyCallable
+from hive.common.units import MILLISECOND, SECOND
+
+from .acks import AckBatcher
+from .batch import PreparedPublish, PublishBatch
+from .confirms import ConfirmTracker
+from .encoding import CLOUDEVENTS_HEADER_PREFIX, JSON, compress
+from .message import CONSUME_BY_HEADER, Message, _content_type_info
+from .metrics import HandlerTimer
+from .priority import Priority
 from .semantics import Semantics
+from .threadsafe import PublisherCallback, PublisherChannel
+from .topology import Topology
+from .typing_indicator import TypingIndicators
 
 if TYPE_CHECKING:
-    from .typing import ConsumerTag, OnMessageCallback
+    from .typing import ConsumerTag, OnMessageCallback, StalenessCheck
 
 logger = logging.getLogger(__name__)
 
 
+# Optional attributes _serialize_event can serialize, in the order
+# cloudevents.conversion.to_json would serialize them.
+_SERIALIZABLE_ATTRIBUTES = (
+    "datacontenttype",
+    "dataschema",
+    "subject",
+)
+
+
+@cache
+def _default_event_source() -> str:
+    return f"https://gbenson.net/hive/services/{SERVICE_NAME}"
+
+
+@cache
+def _default_event_type(routing_key: str) -> str:
+    return "net.gbenson.hive." + (
+        routing_key
+        .removesuffix("s")
+        .removesuffix("e")
+        .replace(".", "_")
+    )
+
+
 @dataclass
-class Channel:
-    """The primary entry point for interacting with Hive's message bus.
+class RecordedConsumer:
+    """The arguments a consumer was started with, so it can be
+    restarted on another channel.
+    """
+    semantics: Semantics
+    kwargs: dict[str, Any]
+
+    def start(self, channel: Channel) -> ConsumerTag:
+        return channel._consume(self.semantics, **self.kwargs)
+
+
+@dataclass
+class ChannelBase:
+    """Functionality shared by :class:`Channel` and its asyncio twin,
+    :class:`hive.messaging.aio.AsyncChannel`.  Everything here must
+    be independent of Pika's connection adapters.
     """
-    _pika: _PikaChannel
     _: KW_ONLY
     name: str = ""
 
+    # Queue-name disambiguation for consume_events().
+
+    @cached_property
+    def consumer_name(self) -> str:
+        """Name for per-consumer fanout queues to this channel.
+
+        May be overwritten or overridden.  You may need this to avoid
+        competing consumers on fanout "queue"s, though using named
+        channels to ensure unique names is preferable.
+        """
+        parts = list(SERVICE_NAME.split("-"))
+        if (channel_name := self.name):
+            parts.append(channel_name)
+        return ".".join(parts)
+
+    def _consumer_queue(
+            self,
+            semantics: Semantics,
+            queue: str,
+            exclusive: bool,
+    ) -> str:
+        if semantics is Semantics.PUBLISH_SUBSCRIBE:
+            if (prefix := self.consumer_name):
+                queue = f"{prefix}.{queue}"
+            if exclusive:
+                suffix = b32encode(token_bytes(5)).decode("ascii")
+                queue = f"{queue}-{suffix}"
+        return queue
+
+    # Exchange and queue names
+
+    @staticmethod
+    def _hive_exchange_name(exchange: str) -> str:
+        return f"hive.{exchange}"
+
+    @staticmethod
+    def _exchange_type_for(topic: str) -> str:
+        return "topic" if topic else "fanout"
+
+    @staticmethod
+    def _dead_letter_queue_for(routing_key: str) -> str:
+        return f"x.{routing_key}"
+
+    @staticmethod
+    def _priority_arguments(max_priority: int) -> dict[str, Any]:
+        if not 1 <= max_priority <= 255:
+            raise ValueError(max_priority)
+        return {"x-max-priority": int(max_priority)}
+
+    # Encapsulation
+
+    @classmethod
+    def _prepare_publish(
+            cls,
+            *,
+            routing_key: str,
+            topic: str = "",
+            correlation_id: Optional[str] = None,
+            mandatory: bool = False,
+            consume_by: Optional[datetime] = None,
+            priority: Optional[int] = None,
+            **kwargs: Any
+    ) -> PreparedPublish:
+        """Do everything to publish a message that doesn't involve
+        the broker.
+        """
+        body, properties = cls._prepare(routing_key, **kwargs)
+        return PreparedPublish(
+            routing_key=routing_key,
+            topic=topic,
+            body=body,
+            properties=cls._basic_properties(
+                **properties,
+                correlation_id=correlation_id,
+                consume_by=consume_by,
+                priority=priority,
+            ),
+            mandatory=mandatory,
+        )
+
+    @classmethod
+    def _prepare(
+            cls,
+            routing_key: str,
+            *,
+            binary: bool = False,
+            content_encoding: Optional[str] = None,
+            **kwargs: Any
+    ) -> tuple[bytes, dict[str, Any]]:
+        """Prepare messages for transmission, returning the body and
+        the properties that describe it.  New CloudEvents are sent in
+        binary content mode if `binary` is True.  Bodies are compressed
+        if `content_encoding` is supplied.
+        """
+        properties: dict[str, Any] = {}
+        if binary:
+            body, content_type, headers = cls._encapsulate_binary(
+                routing_key,
+                **kwargs
+            )
+            properties["headers"] = headers
+        else:
+            body, content_type = cls._encapsulate(routing_key, **kwargs)
+        properties["content_type"] = content_type
+
+        if content_encoding:
+            body = compress(body, content_encoding)
+            properties["content_encoding"] = content_encoding
+
+        return body, properties
+
+    @classmethod
+    def _encapsulate(
+            cls,
+            routing_key: str,
+            **kwargs: Any
+    ) -> tuple[bytes, str]:
+        """Prepare messages for transmission.
+        """
+        message = kwargs.pop("message", None)
+        if message is None:
+            if (payload := cls._serialize_event(routing_key, **kwargs)):
+                return payload, "application/cloudevents+json"
+            message = cls._encapsulate_new(routing_key, **kwargs)
+            kwargs = {}
+
+        content_type = kwargs.pop("content_type", None)
+        if kwargs:
+            raise ValueError(kwargs)
+
+        return cls._encapsulate_old(message, content_type)
+
+    @staticmethod
+    def _encapsulate_new(
+            routing_key: str,
+            *,
+            source: Optional[str] = None,
+            type: Optional[str] = None,
+            time: Optional[datetime] = None,
+            **kwargs: Any
+    ) -> CloudEvent:
+        """Prepare messages for transmission.
+        """
+        if not source:
+            source = _default_event_source()
+        if not type:
+            type = _default_event_type(routing_key)
+        if not time:
+            time = utc_now()
+        if isinstance((data := kwargs.get("data")), BaseModel):
+            kwargs["data"] = data.model_dump(mode="json")
+        return CloudEvent(source=source, type=type, time=time, **kwargs)
+
+    @staticmethod
+    def _serialize_event(
+            routing_key: str,
+            *,
+            source: Optional[str] = None,
+            type: Optional[str] = None,
+            time: Optional[datetime] = None,
+            **kwargs: Any
+    ) -> Optional[bytes]:
+        """Serialize a new CloudEvent in structured JSON mode without
+        building a :class:`CloudEvent`, or return None if the event is
+        anything out of the ordinary, for `_encapsulate_new` to handle.
+        The output is what `to_json(_encapsulate_new(...))` would be,
+        except that pydantic models' data is embedded exactly as
+        `model_dump_json` serializes it.
+        """
+        if not kwargs.keys() <= {"id", "data", *_SERIALIZABLE_ATTRIBUTES}:
+            return None
+
+        data = kwargs.pop("data", None)
+        if isinstance(data, BaseModel):
+            serialized_data: Optional[str] = data.model_dump_json()
+        elif data is None:
+            serialized_data = None
+        elif isinstance(data, (bytes, bytearray)):
+            return None  # data_base64
+        else:
+            try:
+                serialized_data = json.dumps(data)
+            except TypeError:
+                return None
+
+        attributes = {
+            "specversion": "1.0",
+            "id": kwargs.pop("id", None) or str(uuid4()),
+            "source": source or _default_event_source(),
+            "type": type or _default_event_type(routing_key),
+        }
+        for name in _SERIALIZABLE_ATTRIBUTES:
+            if (value := kwargs.get(name)) is not None:
+                attributes[name] = value
+        if not all(isinstance(v, str) for v in attributes.values()):
+            return None
+        if time is None:
+            time = utc_now()
+        elif not isinstance(time, datetime):
+            return None
+        attributes["time"] = time.isoformat()
+
+        fields = [
+            f"{json.dumps(name)}: {json.dumps(value)}"
+            for name, value in attributes.items()
+        ]
+        if serialized_data is not None:
+            fields.append(f'"data": {serialized_data}')
+        return f"{{{', '.join(fields)}}}".encode("utf-8")
+
+    @classmethod
+    def _encapsulate_binary(
+            cls,
+            routing_key: str,
+            **kwargs: Any
+    ) -> tuple[bytes, str, dict[str, Any]]:
+        """Prepare a new CloudEvent for transmission in binary content
+        mode, with its attributes in headers and its data as the body.
+        The data is serialized according to `datacontenttype`, which
+        defaults to JSON, or sent as-is if it's bytes.
+        """
+        if "message" in kwargs:
+            raise ValueError("message")
+        data = kwargs.pop("data", None)
+        content_type = kwargs.pop("datacontenttype", None)
+        event = cls._encapsulate_new(routing_key, **kwargs)
+        headers = {
+            f"{CLOUDEVENTS_HEADER_PREFIX}{name}": value
+            for name, value in event.get_attributes().items()
+            if value is not None
+        }
+
+        if isinstance(data, (bytes, bytearray)):
+            if not content_type:
+                content_type = "application/octet-stream"
+            return bytes(data), content_type, headers
+
+        if isinstance(data, BaseModel):
+            data = data.model_dump(mode="json")
+        if not content_type:
+            content_type = JSON.content_type
+        if (format := _content_type_info(content_type).format) is None:
+            raise ValueError(f"datacontenttype={content_type}")
+        body = b"" if data is None else format.dumps(data)
+        return body, content_type, headers
+
+    @staticmethod
+    def _encapsulate_old(
+            msg: bytes | dict[str, Any] | CloudEvent,
+            content_type: Optional[str],
+    ) -> tuple[bytes, str]:
+        """Prepare messages for transmission.
+        """
+        if isinstance(msg, CloudEvent):
+            return to_json(msg), "application/cloudevents+json"
+        if not isinstance(msg, bytes):
+            if not content_type:
+                return json.dumps(msg).encode("utf-8"), "application/json"
+            if (format := _content_type_info(content_type).format) is None:
+                raise ValueError(f"content_type={content_type}")
+            return format.dumps(msg), content_type
+        if not content_type:
+            raise ValueError(f"content_type={content_type}")
+        return msg, content_type
+
+    @staticmethod
+    def _basic_properties(
+            *,
+            content_type: str,
+            content_encoding: Optional[str] = None,
+            headers: Optional[dict[str, Any]] = None,
+            correlation_id: Optional[str] = None,
+            consume_by: Optional[datetime] = None,
+            priority: Optional[int] = None,
+    ) -> BasicProperties:
+        properties = {
+            "content_type": content_type,
+            "content_encoding": content_encoding,
+            "headers": headers,
+            "correlation_id": correlation_id,
+            "delivery_mode": DeliveryMode.Persistent,
+        }
+
+        if priority is not None:
+            if not 0 <= priority <= 255:
+                raise ValueError(priority)
+            properties["priority"] = int(priority)
+
+        if consume_by:
+            ttl = consume_by - datetime.now(tz=timezone.utc)
+            ttl_ms = ttl // timedelta(milliseconds=1)  # never overstate
+            properties["expiration"] = str(ttl_ms)
+            # The expiration is relative to when the broker enqueues
+            # the message, so consumers can't recover the deadline
+            # from it.
+            properties["headers"] = {
+                **(headers or {}),
+                CONSUME_BY_HEADER: consume_by.isoformat(),
+            }
+
+        return BasicProperties(**properties)
+
+    @staticmethod
+    def _staleness_check(
+            drop_expired: bool,
+            max_age: Optional[timedelta],
+    ) -> Optional[StalenessCheck]:
+        """Return a function that returns why a delivered message is
+        stale, or None if it isn't, or return None if no messages are
+        to be considered stale.  Messages are stale if `drop_expired`
+        and their publisher's `consume_by` deadline has passed, or if
+        their CloudEvent `time` is more than `max_age` ago.
+        """
+        if not drop_expired and max_age is None:
+            return None
+
+        def check(message: Message) -> Optional[str]:
+            now = utc_now()
+            if drop_expired and message.is_expired(now):
+                return "expired"
+            if max_age is None or (age := message.age(now)) is None:
+                return None
+            if age > max_age:
+                return f"{age.total_seconds():.1f} seconds old"
+            return None
+
+        return check
+
+    @staticmethod
+    def _discard_if_stale(
+            queue: str,
+            message: Message,
+            is_stale: Optional[StalenessCheck],
+    ) -> bool:
+        """Return True if `message` should be acked without handling.
+        """
+        if is_stale is None:
+            return False
+        try:
+            reason = is_stale(message)
+        except Exception:
+            logger.warning("%s: Can't check message age", queue,
+                           exc_info=True)
+            return False
+        if not reason:
+            return False
+        logger.info("%s: Discarding message %d: %s",
+                    queue, message.method.delivery_tag, reason)
+        HandlerTimer(queue, message).done("stale")
+        return True
+
+    @staticmethod
+    def _log_callback_exception(e: Exception) -> None:
+        """Log an exception raised by an `on_message_callback`.
+        """
+        logged = False
+        try:
+            if isinstance(e, NotImplementedError) and e.args:
+                if (traceback := e.__traceback__):
+                    while (next_tb := traceback.tb_next):
+                        traceback = next_tb
+                    code = traceback.tb_frame.f_code
+                    try:
+                        func = getattr(code, "co_qualname")
+                    except AttributeError:
+                        func = code.co_name  # Python <=3.10
+                    logger.warning("%s:%s:UNHANDLED", func, e)
+                    logged = True
+
+        except Exception:
+            logger.exception("NESTED EXCEPTION")
+        if not logged:
+            logger.exception("EXCEPTION")
+
+
+@dataclass
+class Channel(ChannelBase):
+    """The primary entry point for interacting with Hive's message bus.
+    """
+    _pika: _PikaChannel
+    _topology: Topology = field(default_factory=Topology, kw_only=True)
+    _draining: bool = field(default=False, init=False, repr=False)
+    _threadsafe_stopped: bool = field(default=False, init=False, repr=False)
+
     def __hash__(self) -> int:
         return id(self)
 
@@ -77,52 +514,215 @@ class Channel:
         except Exception:
             logger.warning("EXCEPTION", exc_info=True)
 
+    def publish_batch(self) -> PublishBatch:
+        """Return a :class:`PublishBatch` for this channel.
+        """
+        return PublishBatch(self)
+
+    def publish_many(
+            self,
+            messages: Iterable[dict[str, Any]],
+            *,
+            mandatory: bool = False,
+    ) -> None:
+        """Publish many messages, each specified by a dict of the
+        keyword arguments `publish_event` accepts, and wait for the
+        broker to confirm them all.  Use `mandatory=True` for requests.
+        Raises :class:`PublishBatchError` if any message wasn't
+        delivered, but only once every message has been published.
+
+        Confirms are only awaited once per batch on channels with
+        pipelined confirms, i.e. those from :func:`publisher_connection`.
+        On other channels each message waits for its own confirm.
+        """
+        with self.publish_batch() as batch:
+            for kwargs in messages:
+                if mandatory:
+                    batch.publish_request(**kwargs)
+                else:
+                    batch.publish_event(**kwargs)
+
+    def publish_request_async(self, **kwargs: Any) -> Future[None]:
+        """Like `publish_request` but returns without waiting for the
+        broker to confirm delivery, if possible.  The returned future
+        completes when delivery is confirmed, or raises the exception
+        `publish_request` would have raised.
+        """
+        return self._publish_async(mandatory=True, **kwargs)
+
+    def publish_event_async(self, **kwargs: Any) -> Future[None]:
+        """Like `publish_event` but returns without waiting for the
+        broker to confirm delivery, if possible.
+        """
+        return self._publish_async(**kwargs)
+
     def consume_requests(self, **kwargs: Any) -> None:
         self._consume(Semantics.COMPETING_CONSUMERS, **kwargs)
 
     def consume_events(self, **kwargs: Any) -> None:
         self._consume(Semantics.PUBLISH_SUBSCRIBE, **kwargs)
 
-    def start_consuming(self) -> None:
-        self._pika.start_consuming()
+    def start_consuming(
+            self,
+            *,
+            drain_timeout: timedelta = 30 * SECOND,
+    ) -> None:
+        """Process I/O events and dispatch consumer callbacks until
+        all consumers are cancelled or the connection closes.
+
+        :param drain_timeout: The maximum time to wait on return for
+            concurrent consumers' in-flight callbacks to complete.
+        """
+        self._start_threadsafe()
+        try:
+            self._pika.start_consuming()
+        finally:
+            self._drain_workers(drain_timeout)
+            if (acks := self._acks) is not None and self._pika.is_open:
+                acks.flush()
 
     # Lower-level handlers for PUBLISH_* and CONSUME_*
     #  - Everything should go through these
     #  - XXX merge _consume into *basic_consume*?
 
+    def _publish_async(self, **kwargs: Any) -> Future[None]:
+        future: Future[None] = Future()
+        future.set_running_or_notify_cancel()
+        try:
+            self._publish(future=future, **kwargs)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        return future
+
     def _publish(
             self,
             *,
-            routing_key: str,
-            topic: str = "",
-            correlation_id: Optional[str] = None,
-            mandatory: bool = False,
-            consume_by: Optional[datetime] = None,
+            future: Optional[Future[None]] = None,
             **kwargs: Any,
     ) -> None:
-        payload, content_type = self._encapsulate(routing_key, **kwargs)
+        self._publish_prepared(self._prepare_publish(**kwargs), future)
 
-        exchange = self._exchange_for(routing_key, topic)
-        routing_key = topic
+    def _publish_prepared(
+            self,
+            prepared: PreparedPublish,
+            future: Optional[Future[None]] = None,
+    ) -> None:
+        exchange = self._exchange_for(prepared.routing_key, prepared.topic)
 
-        properties = {
-            "content_type": content_type,
-            "correlation_id": correlation_id,
-            "delivery_mode": DeliveryMode.Persistent,
-        }
+        self._basic_publish(
+            exchange=exchange,
+            routing_key=prepared.topic,
+            body=prepared.body,
+            properties=prepared.properties,
+            mandatory=prepared.mandatory,
+            future=future,
+        )
 
-        if consume_by:
-            ttl = consume_by - datetime.now(tz=timezone.utc)
-            ttl_ms = round(ttl / timedelta(milliseconds=1))
-            properties["expiration"] = str(ttl_ms)
+    def _send_batch(self, batch: list[PreparedPublish]) -> list[Future[None]]:
+        """Publish `batch` back to back, then wait until every message
+        is confirmed.  Must be called on the I/O thread.
+        """
+        futures = self._publish_batch(batch)
+        if self._confirms is None:
+            return futures
+
+        remaining = sum(not future.done() for future in futures)
+
+        def on_done(_: Future[None]) -> None:
+            nonlocal remaining
+            remaining -= 1
+
+        for future in futures:
+            if not future.done():
+                future.add_done_callback(on_done)
+        if remaining:
+            self._pika.connection._flush_output(  # type: ignore[attr-defined]
+                lambda: remaining == 0,
+            )
+        return futures
 
-        self._pika.basic_publish(
-            exchange=exchange,
-            routing_key=routing_key,
-            body=payload,
-            properties=BasicProperties(**properties),
-            mandatory=mandatory,
+    def _publish_batch(
+            self,
+            batch: list[PreparedPublish],
+            futures: Optional[list[Future[None]]] = None,
+    ) -> list[Future[None]]:
+        """Publish `batch` without waiting for confirms, returning
+        futures that complete as the broker confirms each message.
+        """
+        if futures is None:
+            futures = [Future() for _ in batch]
+        for prepared, future in zip(batch, futures):
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                self._publish_prepared(prepared, future)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+        return futures
+
+    def _basic_publish(
+            self,
+            *,
+            future: Optional[Future[None]] = None,
+            **kwargs: Any
+    ) -> None:
+        """Publish a message.  If `future` is supplied, this method
+        may return before delivery is confirmed, and `future` will
+        be completed once it is.  Otherwise this method blocks until
+        delivery is confirmed (if confirmations are enabled).
+        """
+        if (confirms := self._confirms) is None:
+            self._pika.basic_publish(**kwargs)
+            if future is not None:
+                future.set_result(None)
+            return
+
+        wait = future is None
+        if future is None:
+            future = Future()
+            future.set_running_or_notify_cancel()
+
+        confirms.publish(future, self._pika.basic_publish, **kwargs)
+        if not wait:
+            return
+
+        # BlockingChannel.basic_publish waits like this for its own
+        # confirms.  It's safe when nested inside the I/O thread's
+        # process_data_events, e.g. in consumer callbacks or calls
+        # proxied by PublisherChannel, where process_data_events
+        # would never return because the confirm isn't dispatched
+        # as a BlockingConnection event.
+        self._pika.connection._flush_output(  # type: ignore[attr-defined]
+            future.done,
         )
+        future.result()
+
+    # Pipelined publisher confirms.
+    #
+    # Pika's BlockingChannel.confirm_delivery makes basic_publish
+    # block until each message is confirmed, so only one message
+    # may be awaiting confirmation at any time.  Channels with
+    # pipelined confirms instead enable confirmations on the
+    # underlying asynchronous channel, and match confirmations
+    # to messages themselves.
+
+    @property
+    def _confirms(self) -> Optional[ConfirmTracker]:
+        return getattr(self, "_confirm_tracker", None)
+
+    def _pipeline_confirms(self) -> None:
+        """Enable pipelined publisher confirms on this channel.
+        """
+        if self._confirms is not None:
+            return
+        impl = self._pika._impl  # type: ignore[attr-defined]
+        confirms = ConfirmTracker()
+        impl.add_on_close_callback(confirms.on_close)
+        impl.add_on_return_callback(confirms.on_return)
+        impl.confirm_delivery(ack_nack_callback=confirms.on_ack_nack)
+        self._confirm_tracker = confirms
 
     def _consume(
             self,
@@ -132,17 +732,30 @@ class Channel:
             on_message_callback: OnMessageCallback,
             exclusive: bool = False,
             topic: str = "",
+            max_priority: Optional[int] = None,
+            **consume_kwargs: Any
     ) -> ConsumerTag:
-        exchange = self._exchange_for(queue, topic)
+        """Declare, bind and consume from a queue.
 
-        if semantics is Semantics.PUBLISH_SUBSCRIBE:
-            if (prefix := self.consumer_name):
-                queue = f"{prefix}.{queue}"
-            if exclusive:
-                suffix = b32encode(token_bytes(5)).decode("ascii")
-                queue = f"{queue}-{suffix}"
+        :param max_priority: Declare the queue as a priority queue,
+            with priorities from 0 to this.  Changing an existing
+            queue's maximum priority requires deleting the queue.
+        """
+        self._recorded_consumers.append(RecordedConsumer(semantics, dict(
+            queue=queue,
+            on_message_callback=on_message_callback,
+            exclusive=exclusive,
+            topic=topic,
+            max_priority=max_priority,
+            **consume_kwargs
+        )))
+
+        exchange = self._exchange_for(queue, topic)
+        queue = self._consumer_queue(semantics, queue, exclusive)
 
         kwargs: dict[str, Any] = {}
+        if max_priority is not None:
+            kwargs["arguments"] = self._priority_arguments(max_priority)
         if exclusive:
             kwargs["exclusive"] = True
         else:
@@ -155,36 +768,41 @@ class Channel:
         if topic:
             kwargs["routing_key"] = topic
 
-        self._pika.queue_bind(queue=queue, exchange=exchange, **kwargs)
-
-        return self._basic_consume(queue, on_message_callback)
+        self._declare(
+            "queue_bind",
+            queue=queue,
+            exchange=exchange,
+            **kwargs
+        )
 
-    # Queue-name disambiguation for consume_events().
+        return self._basic_consume(
+            queue,
+            on_message_callback,
+            **consume_kwargs
+        )
 
     @cached_property
-    def consumer_name(self) -> str:
-        """Name for per-consumer fanout queues to this channel.
-
-        May be overwritten or overridden.  You may need this to avoid
-        competing consumers on fanout "queue"s, though using named
-        channels to ensure unique names is preferable.
+    def _recorded_consumers(self) -> list[RecordedConsumer]:
+        """Every consumer started on this channel, for restarting on
+        another by :class:`hive.messaging.supervisor.Supervisor`.
         """
-        parts = list(SERVICE_NAME.split("-"))
-        if (channel_name := self.name):
-            parts.append(channel_name)
-        return ".".join(parts)
+        return []
+
+    # Declarations are made at most once per connection.
+
+    def _declare(self, method: str, *args: Any, **kwargs: Any) -> None:
+        self._topology.declare(self._pika, method, *args, **kwargs)
 
     # Exchanges
 
-    @cache
     def _exchange_for(self, routing_key: str, topic: str) -> str:
         return self._hive_exchange(
             exchange=routing_key,
-            exchange_type="topic" if topic else "fanout",
+            exchange_type=self._exchange_type_for(topic),
             durable=True,
         )
 
-    @cached_property
+    @property
     def dead_letter_exchange(self) -> str:
         return self._hive_exchange(
             exchange="dead.letter",
@@ -193,8 +811,8 @@ class Channel:
         )
 
     def _hive_exchange(self, exchange: str, **kwargs: Any) -> str:
-        name = f"hive.{exchange}"
-        self._pika.exchange_declare(exchange=name, **kwargs)
+        name = self._hive_exchange_name(exchange)
+        self._declare("exchange_declare", exchange=name, **kwargs)
         return name
 
     # Queues
@@ -204,7 +822,7 @@ class Channel:
             queue: str,
             *,
             dead_letter_routing_key: Optional[str] = None,
-            arguments: Optional[dict[str, str]] = None,
+            arguments: Optional[dict[str, Any]] = None,
             **kwargs: Any
     ) -> None:
         if dead_letter_routing_key:
@@ -216,14 +834,18 @@ class Channel:
             else:
                 arguments = {}
 
-            dead_letter_queue = f"x.{dead_letter_routing_key}"
-            self._pika.queue_declare(
+            dead_letter_queue = self._dead_letter_queue_for(
+                dead_letter_routing_key,
+            )
+            self._declare(
+                "queue_declare",
                 dead_letter_queue,
                 durable=True,
             )
 
             dead_letter_exchange = self.dead_letter_exchange
-            self._pika.queue_bind(
+            self._declare(
+                "queue_bind",
                 queue=dead_letter_queue,
                 exchange=dead_letter_exchange,
                 routing_key=dead_letter_routing_key,
@@ -233,67 +855,7 @@ class Channel:
 
         if arguments:
             kwargs["arguments"] = arguments
-        self._pika.queue_declare(queue, **kwargs)
-
-    @classmethod
-    def _encapsulate(
-            cls,
-            routing_key: str,
-            **kwargs: Any
-    ) -> tuple[bytes, str]:
-        """Prepare messages for transmission.
-        """
-        message = kwargs.pop("message", None)
-        if message is None:
-            message = cls._encapsulate_new(routing_key, **kwargs)
-            kwargs = {}
-
-        content_type = kwargs.pop("content_type", None)
-        if kwargs:
-            raise ValueError(kwargs)
-
-        return cls._encapsulate_old(message, content_type)
-
-    @staticmethod
-    def _encapsulate_new(
-            routing_key: str,
-            *,
-            source: Optional[str] = None,
-            type: Optional[str] = None,
-            time: Optional[datetime] = None,
-            **kwargs: Any
-    ) -> CloudEvent:
-        """Prepare messages for transmission.
-        """
-        if not source:
-            source = f"https://gbenson.net/hive/services/{SERVICE_NAME}"
-        if not type:
-            type = "net.gbenson.hive." + (
-                routing_key
-                .removesuffix("s")
-                .removesuffix("e")
-                .replace(".", "_")
-            )
-        if not time:
-            time = utc_now()
-        if isinstance((data := kwargs.get("data")), BaseModel):
-            kwargs["data"] = json.loads(data.model_dump_json())
-        return CloudEvent(source=source, type=type, time=time, **kwargs)
-
-    @staticmethod
-    def _encapsulate_old(
-            msg: bytes | dict[str, Any] | CloudEvent,
-            content_type: Optional[str],
-    ) -> tuple[bytes, str]:
-        """Prepare messages for transmission.
-        """
-        if isinstance(msg, CloudEvent):
-            return to_json(msg), "application/cloudevents+json"
-        if not isinstance(msg, bytes):
-            return json.dumps(msg).encode("utf-8"), "application/json"
-        if not content_type:
-            raise ValueError(f"content_type={content_type}")
-        return msg, content_type
+        self._declare("queue_declare", queue, **kwargs)
 
     @property
     def prefetch_count(self) -> Optional[int]:
@@ -308,46 +870,266 @@ class Channel:
         self._pika.basic_qos(prefetch_count=value)
         self._prefetch_count = value
 
+    @property
+    def _acks(self) -> Optional[AckBatcher]:
+        return getattr(self, "_ack_batcher", None)
+
+    def _configure_acks(
+            self,
+            max_batch_size: int,
+            max_delay: timedelta,
+    ) -> AckBatcher:
+        """Return this channel's :class:`AckBatcher`, creating it if
+        necessary.  All consumers on a channel share one batcher, so
+        all consumers on a channel must use the same settings.
+        """
+        if (acks := self._acks) is not None:
+            if (acks.max_batch_size, acks.max_delay) != (
+                    max_batch_size, max_delay):
+                raise ValueError(max_batch_size)
+            return acks
+        acks = AckBatcher(
+            self._pika,
+            max_batch_size=max_batch_size,
+            max_delay=max_delay,
+        )
+        self._ack_batcher = acks
+        return acks
+
     def _basic_consume(
             self,
             queue: str,
             on_message_callback: OnMessageCallback,
+            *,
+            concurrency: int = 1,
+            prefetch_count: Optional[int] = None,
+            ack_batch_size: int = 1,
+            ack_batch_delay: timedelta = 100 * MILLISECOND,
+            drop_expired: bool = False,
+            max_age: Optional[timedelta] = None,
     ) -> ConsumerTag:
-        self.prefetch_count = 1  # Receive one message at a time.
+        """Start a consumer that acks or dead-letters every message.
+
+        :param concurrency: The maximum number of `on_message_callback`
+            invocations to run at once.  Hive's default is 1, i.e.
+            run callbacks on the connection's I/O thread.  Values
+            greater than 1 run callbacks in a pool of worker threads,
+            passing them a channel whose methods are invoked on the
+            I/O thread, as with :class:`PublisherConnection`.
+        :param prefetch_count: The maximum number of unacknowledged
+            messages the broker will deliver to this channel, or 0
+            for no limit.  The default is `concurrency`.
+        :param ack_batch_size: Acknowledge successfully handled
+            messages in batches of up to this many, using multiple-
+            acks.  Must not exceed a nonzero `prefetch_count`.  Hive's default
+            is 1, i.e. acknowledge each message individually.
+        :param ack_batch_delay: The maximum time a successfully
+            handled message's acknowledgement may be delayed for
+            when `ack_batch_size` is greater than 1.
+        :param drop_expired: Ack without handling messages whose
+            publishers' `consume_by` deadlines have passed.  The broker
+            only expires messages at the head of a queue, so a backlog
+            may contain expired messages.
+        :param max_age: Ack without handling messages whose CloudEvent
+            `time` is longer ago than this.
+        """
+        if concurrency < 1:
+            raise ValueError(concurrency)
+        if prefetch_count is None:
+            prefetch_count = concurrency
+        if prefetch_count and ack_batch_size > prefetch_count:
+            raise ValueError(ack_batch_size)
+        if concurrency > 1 and ack_batch_size > 1:
+            # Multiple-acks require in-order completion.
+            raise ValueError(ack_batch_size)
+        self.prefetch_count = prefetch_count
+        acks = self._configure_acks(ack_batch_size, ack_batch_delay)
+        is_stale = self._staleness_check(drop_expired, max_age)
+
+        if concurrency > 1:
+            return self._basic_consume_concurrent(
+                queue,
+                on_message_callback,
+                acks,
+                concurrency,
+                is_stale,
+            )
 
         def _wrapped_callback(channel: Channel, message: Message) -> None:
             delivery_tag = message.method.delivery_tag
             assert delivery_tag is not None
+            if self._discard_if_stale(queue, message, is_stale):
+                acks.ack(delivery_tag)
+                return
+            timer = HandlerTimer(queue, message)
             try:
                 on_message_callback(channel, message)
-                channel._pika.basic_ack(delivery_tag=delivery_tag)
+                timer.done("ack")
+                acks.ack(delivery_tag)
 
             except Exception as e:
-                channel._pika.basic_reject(
-                    delivery_tag=delivery_tag,
-                    requeue=False,
-                )
-                logged = False
-                try:
-                    if isinstance(e, NotImplementedError) and e.args:
-                        if (traceback := e.__traceback__):
-                            while (next_tb := traceback.tb_next):
-                                traceback = next_tb
-                            code = traceback.tb_frame.f_code
-                            try:
-                                func = getattr(code, "co_qualname")
-                            except AttributeError:
-                                func = code.co_name  # Python <=3.10
-                            logger.warning("%s:%s:UNHANDLED", func, e)
-                            logged = True
-
-                except Exception:
-                    logger.exception("NESTED EXCEPTION")
-                if not logged:
-                    logger.exception("EXCEPTION")
+                timer.done("reject")
+                acks.reject(delivery_tag)
+                self._log_callback_exception(e)
 
         return self._basic_consume_raw(queue, _wrapped_callback)
 
+    def _basic_consume_concurrent(
+            self,
+            queue: str,
+            on_message_callback: OnMessageCallback,
+            acks: AckBatcher,
+            concurrency: int,
+            is_stale: Optional[StalenessCheck] = None,
+    ) -> ConsumerTag:
+        executor = ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix=f"{queue}-worker",
+        )
+        threadsafe_channel = cast(Channel, self.threadsafe_channel)
+
+        def _worker(message: Message) -> None:
+            delivery_tag = message.method.delivery_tag
+            assert delivery_tag is not None
+            settle = acks.ack
+            timer = HandlerTimer(queue, message)
+            try:
+                on_message_callback(threadsafe_channel, message)
+                timer.done("ack")
+            except Exception as e:
+                timer.done("reject")
+                settle = acks.reject
+                self._log_callback_exception(e)
+
+            try:
+                self._call_threadsafe(settle, delivery_tag)
+            except Exception:
+                logger.exception("Failed to settle message %d", delivery_tag)
+
+        def _wrapped_callback(channel: Channel, message: Message) -> None:
+            if self._draining:
+                # Hand it to another consumer.
+                delivery_tag = message.method.delivery_tag
+                assert delivery_tag is not None
+                self._pika.basic_reject(delivery_tag, requeue=True)
+                return
+            if self._discard_if_stale(queue, message, is_stale):
+                delivery_tag = message.method.delivery_tag
+                assert delivery_tag is not None
+                acks.ack(delivery_tag)
+                return
+            worker = executor.submit(_worker, message)
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+
+        return self._basic_consume_raw(queue, _wrapped_callback)
+
+    @cached_property
+    def _workers(self) -> set[Future[None]]:
+        """Concurrent consumers' submitted callbacks.
+        """
+        return set()
+
+    def _drain_workers(self, timeout: timedelta) -> None:
+        """Process I/O events until concurrent consumers' callbacks
+        complete, or `timeout` expires, then stop accepting calls from
+        worker threads.  Messages delivered meanwhile are requeued.
+        """
+        deadline = monotonic() + timeout.total_seconds()
+        self._draining = True
+        try:
+            while self._workers and self._pika.connection.is_open:
+                if (time_limit := deadline - monotonic()) <= 0:
+                    logger.warning(
+                        "Abandoning %d in-flight callbacks",
+                        len(self._workers),
+                    )
+                    break
+                self._pika.connection.process_data_events(
+                    time_limit=min(time_limit, 0.1),  # type: ignore[arg-type]
+                )
+        finally:
+            self._draining = False
+            self._stop_threadsafe()
+
+    # Cross-thread invocation, for concurrent consumers.
+
+    @cached_property
+    def threadsafe_channel(self) -> PublisherChannel:
+        """A proxy for this channel that may be used from any thread.
+        Method calls are invoked on the connection's I/O thread, and
+        block until they complete.  Calls fail with
+        :class:`pika.exceptions.ChannelWrongStateError` once
+        `start_consuming` has returned.
+        """
+        return PublisherChannel(
+            self._invoke_threadsafe,
+            self,
+            _schedule=self._call_threadsafe,
+        )
+
+    def _invoke_threadsafe(
+            self,
+            func: AnyCallable,
+            *args: Any,
+            **kwargs: Any
+    ) -> Any:
+        callback = PublisherCallback(func, args, kwargs)
+        self._call_threadsafe(callback)
+        return callback.join()
+
+    @cached_property
+    def _threadsafe_lock(self) -> Lock:
+        return Lock()
+
+    @cached_property
+    def _threadsafe_calls(self) -> dict[object, AnyCallable]:
+        """Calls from other threads the I/O thread hasn't made yet.
+        """
+        return {}
+
+    def _start_threadsafe(self) -> None:
+        with self._threadsafe_lock:
+            self._threadsafe_stopped = False
+
+    def _stop_threadsafe(self) -> None:
+        """Refuse further calls from other threads, and make any still
+        queued now, so no caller waits forever for an I/O thread that
+        is no longer processing events.  Must be called on the I/O
+        thread.
+        """
+        with self._threadsafe_lock:
+            self._threadsafe_stopped = True
+            calls = self._threadsafe_calls.copy()
+            self._threadsafe_calls.clear()
+        for func in calls.values():
+            try:
+                func()
+            except Exception:
+                logger.exception("EXCEPTION")
+
+    def _call_threadsafe(self, func: AnyCallable, *args: Any) -> None:
+        if args:
+            func = partial(func, *args)
+        token = object()
+
+        def call() -> None:
+            with self._threadsafe_lock:
+                if calls.pop(token, None) is None:
+                    return  # already called by _stop_threadsafe
+            func()
+
+        with self._threadsafe_lock:
+            if self._threadsafe_stopped:
+                raise ChannelWrongStateError("Channel is not consuming")
+            calls = self._threadsafe_calls
+            calls[token] = func
+            try:
+                self._pika.connection.add_callback_threadsafe(call)
+            except BaseException:
+                del calls[token]
+                raise
+
     def _basic_consume_raw(
             self,
             queue: str,
@@ -419,12 +1201,26 @@ class Channel:
             sender: str = "hive",
     ) -> None:
         """https://pkg.go.dev/maunium.net/go/mautrix#Client.UserTyping
+
+        Updates that wouldn't visibly change the indicator, such as
+        cancelling it twice, or extending it by only a little, aren't
+        published.  See :class:`TypingIndicators`.
         """
+        if not self._typing_indicators.update(sender, timeout):
+            return
         nanos = round(timeout.total_seconds() * 1e9) if timeout else 0
-        self.maybe_publish_matrix_event("user_typing", {
-            "sender": sender,
-            "timeout": nanos,
-        })
+        try:
+            self.publish_matrix_event("user_typing", {
+                "sender": sender,
+                "timeout": nanos,
+            })
+        except Exception:
+            self._typing_indicators.forget(sender)
+            logger.warning("EXCEPTION", exc_info=True)
+
+    @cached_property
+    def _typing_indicators(self) -> TypingIndicators:
+        return TypingIndicators()
 
     # Low(er)-level publish_request wrappers for Matrix chat.
     #
@@ -442,6 +1238,7 @@ class Channel:
             type=f"net.gbenson.hive.matrix_{event_type}_request",
             data={k: v for k, v in event_data.items() if v or v == 0},
             routing_key="matrix.requests",
+            priority=Priority.INTERACTIVE,
         )
 
     def maybe_publish_matrix_event(self, *args: Any, **kwargs: Any) -> None:
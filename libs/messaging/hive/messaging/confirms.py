@@ -0,0 +1,189 @@
+import logging
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Optional, Protocol
+
+from pika.adapters.blocking_connection import ReturnedMessage
+from pika.exceptions import NackError, UnroutableError
+from pika.spec import Basic, BasicProperties
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Settleable(Protocol):
+    """Both :class:`asyncio.Future` and :class:`concurrent.futures.Future`.
+    """
+    def done(self) -> bool: ...
+
+    def set_result(self, result: None) -> None: ...
+
+    def set_exception(self, exception: BaseException) -> None: ...
+
+
+@dataclass
+class PendingPublish:
+    """A published message awaiting confirmation from the broker.
+    """
+    future: Settleable
+    exchange: str
+    routing_key: str
+    body: bytes
+    returned: Optional[ReturnedMessage] = None
+    published_at: float = field(default_factory=monotonic)
+
+    def settle(self, exception: Optional[BaseException] = None) -> None:
+        metrics.publish_confirmed(
+            self.exchange,
+            outcome=self._outcome(exception),
+            seconds=monotonic() - self.published_at,
+        )
+        if self.future.done():
+            return
+        if exception is None:
+            self.future.set_result(None)
+        else:
+            self.future.set_exception(exception)
+
+    @staticmethod
+    def _outcome(exception: Optional[BaseException]) -> str:
+        if exception is None:
+            return "ack"
+        if isinstance(exception, NackError):
+            return "nack"
+        if isinstance(exception, UnroutableError):
+            return "unroutable"
+        return "failed"
+
+
+@dataclass
+class ConfirmTracker:
+    """Match publisher confirms to the messages they confirm, so many
+    publishes can be awaiting confirmation at once.
+
+    Register `on_ack_nack` with :meth:`pika.channel.Channel.confirm_delivery`
+    and `on_return` with :meth:`pika.channel.Channel.add_on_return_callback`,
+    then publish every message with `publish`.  Each
+    future is resolved when its message is acked, or fails with
+    :class:`pika.exceptions.UnroutableError` or
+    :class:`pika.exceptions.NackError` as the blocking API would raise.
+    """
+    _next_delivery_tag: int = 1
+    _unconfirmed: dict[int, PendingPublish] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self._unconfirmed)
+
+    def publish(
+            self,
+            future: Settleable,
+            basic_publish: Callable[..., Any],
+            *,
+            exchange: str,
+            routing_key: str,
+            body: bytes,
+            **kwargs: Any
+    ) -> None:
+        """Call `basic_publish`, arranging for `future` to be settled
+        when the broker confirms the message.  Nothing is expected if
+        `basic_publish` raises, so later confirms still match up.
+        """
+        delivery_tag = self.expect(
+            future,
+            exchange=exchange,
+            routing_key=routing_key,
+            body=body,
+        )
+        try:
+            basic_publish(
+                exchange=exchange,
+                routing_key=routing_key,
+                body=body,
+                **kwargs
+            )
+        except BaseException:
+            self._unexpect(delivery_tag)
+            raise
+
+    def expect(
+            self,
+            future: Settleable,
+            *,
+            exchange: str,
+            routing_key: str,
+            body: bytes,
+    ) -> int:
+        """Expect confirmation of the next message published, and
+        return the delivery tag the broker will confirm it with.
+        """
+        delivery_tag = self._next_delivery_tag
+        pending = PendingPublish(future, exchange, routing_key, body)
+        self._unconfirmed[delivery_tag] = pending
+        self._next_delivery_tag += 1
+        return delivery_tag
+
+    def _unexpect(self, delivery_tag: int) -> None:
+        """Undo `expect`, for a message that wasn't published.
+        """
+        if delivery_tag != self._next_delivery_tag - 1:
+            raise ValueError(delivery_tag)
+        del self._unconfirmed[delivery_tag]
+        self._next_delivery_tag = delivery_tag
+
+    def on_return(
+            self,
+            _: Any,
+            method: Basic.Return,
+            properties: BasicProperties,
+            body: bytes,
+    ) -> None:
+        returned = ReturnedMessage(method, properties, body)
+
+        # Basic.Return precedes the Basic.Ack for the same message,
+        # but carries no delivery tag, so find the earliest pending
+        # publish it could be.  Identical messages are equivalent.
+        for pending in self._unconfirmed.values():
+            if pending.returned is not None:
+                continue
+            if pending.exchange != method.exchange:
+                continue
+            if pending.routing_key != method.routing_key:
+                continue
+            if pending.body != body:
+                continue
+            pending.returned = returned
+            return
+
+        logger.warning("Unroutable message: %s", method)
+
+    def on_ack_nack(self, frame: Any) -> None:
+        method = frame.method
+        delivery_tag = method.delivery_tag
+        if method.multiple:
+            delivery_tags = [
+                tag for tag in self._unconfirmed if tag <= delivery_tag
+            ]
+        else:
+            delivery_tags = [delivery_tag]
+
+        for tag in delivery_tags:
+            if (pending := self._unconfirmed.pop(tag, None)) is None:
+                continue
+            returned = pending.returned
+            if isinstance(method, Basic.Nack):
+                pending.settle(NackError([returned] if returned else []))
+            elif returned is not None:
+                pending.settle(UnroutableError([returned]))
+            else:
+                pending.settle()
+
+    def on_close(self, _: Any, reason: BaseException) -> None:
+        """Fail everything still awaiting confirmation.
+        """
+        unconfirmed = self._unconfirmed
+        self._unconfirmed = {}
+        for pending in unconfirmed.values():
+            pending.settle(reason)
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import KW_ONLY, dataclass
+from dataclasses import KW_ONLY, dataclass, field
 from typing import Any, Optional, TYPE_CHECKING
 from typing_extensions import Self
 
 from pika import BlockingConnection as _PikaConnection
 
 from .channel import Channel
+from .topology import Topology
 
 if TYPE_CHECKING:
     from .typing import OnChannelOpenCallback
@@ -17,6 +18,7 @@ class Connection:
     _pika: _PikaConnection
     _: KW_ONLY
     on_channel_open: Optional[OnChannelOpenCallback] = None
+    topology: Topology = field(default_factory=Topology, repr=False)
 
     def __hash__(self) -> int:
         return id(self)
@@ -25,6 +27,7 @@ class Connection:
         return self
 
     def __exit__(self, *exc_info: Any) -> None:
+        self.topology.clear()
         if self._pika.is_open:
             self._pika.close()
 
@@ -34,7 +37,11 @@ class Connection:
             name: str = "",
             **kwargs: Any
     ) -> Channel:
-        return Channel(self._pika.channel(**kwargs), name=name)
+        return Channel(
+            self._pika.channel(**kwargs),
+            name=name,
+            _topology=self.topology,
+        )
 
     def channel(
             self,
@@ -56,7 +63,10 @@ class Connection:
         """
         channel = self._channel(name=name, **kwargs)
         if confirm_delivery:
-            channel._pika.confirm_delivery()  # Don't fail silently.
+            self._confirm_delivery(channel)  # Don't fail silently.
         if self.on_channel_open:
             self.on_channel_open(channel)
         return channel
+
+    def _confirm_delivery(self, channel: Channel) -> None:
+        channel._pika.confirm_delivery()
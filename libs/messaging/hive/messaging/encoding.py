@@ -0,0 +1,128 @@
+"""Payload formats and content encodings.
+
+JSON is always available.  MessagePack, CBOR and Zstandard need
+the optional `msgpack`, `cbor` and `zstd` extras respectively.
+"""
+import gzip
+import json
+
+from dataclasses import dataclass
+from importlib import import_module
+from types import ModuleType
+from typing import Any, Callable, Optional
+
+# Prefix of AMQP headers carrying binary-mode CloudEvents' attributes.
+CLOUDEVENTS_HEADER_PREFIX = "cloudEvents:"
+
+PYPI_EXTRA = {
+    "cbor2": "cbor",
+    "msgpack": "msgpack",
+    "zstandard": "zstd",
+}
+
+
+def _require(module: str) -> ModuleType:
+    try:
+        return import_module(module)
+    except ImportError as e:
+        extra = PYPI_EXTRA[module]
+        raise ImportError(
+            f"{module} not installed: install hive-messaging[{extra}]",
+        ) from e
+
+
+@dataclass(frozen=True)
+class Format:
+    """A way of serializing Python objects.
+    """
+    name: str
+    content_type: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj).encode("utf-8")
+
+
+def _msgpack_dumps(obj: Any) -> bytes:
+    return bytes(_require("msgpack").packb(obj))
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return _require("msgpack").unpackb(data)
+
+
+def _cbor_dumps(obj: Any) -> bytes:
+    return bytes(_require("cbor2").dumps(obj))
+
+
+def _cbor_loads(data: bytes) -> Any:
+    return _require("cbor2").loads(data)
+
+
+JSON = Format("json", "application/json", _json_dumps, json.loads)
+MSGPACK = Format("msgpack", "application/msgpack", _msgpack_dumps,
+                 _msgpack_loads)
+CBOR = Format("cbor", "application/cbor", _cbor_dumps, _cbor_loads)
+
+# Content subtypes (or structured syntax suffixes) of each format.
+FORMATS = {
+    "json": JSON,
+    "msgpack": MSGPACK,
+    "vnd.msgpack": MSGPACK,
+    "x-msgpack": MSGPACK,
+    "cbor": CBOR,
+}
+
+
+def format_for(subtype: str, suffix: Optional[str] = None) -> Optional[Format]:
+    """Return the format for an "application/..." content type.
+    """
+    if (format := FORMATS.get(subtype)) is not None:
+        return format
+    if suffix:
+        return FORMATS.get(suffix)
+    return None
+
+
+@dataclass(frozen=True)
+class Encoding:
+    """A content encoding, i.e. a compression scheme.
+    """
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return bytes(_require("zstandard").ZstdCompressor().compress(data))
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return bytes(_require("zstandard").ZstdDecompressor().decompress(data))
+
+
+ENCODINGS = {
+    encoding.name: encoding
+    for encoding in (
+        Encoding("gzip", gzip.compress, gzip.decompress),
+        Encoding("zstd", _zstd_compress, _zstd_decompress),
+    )
+}
+
+
+def compress(data: bytes, content_encoding: Optional[str]) -> bytes:
+    if not content_encoding or content_encoding == "identity":
+        return data
+    if (encoding := ENCODINGS.get(content_encoding)) is None:
+        raise NotImplementedError(content_encoding)
+    return encoding.compress(data)
+
+
+def decompress(data: bytes, content_encoding: Optional[str]) -> bytes:
+    if not content_encoding or content_encoding == "identity":
+        return data
+    if (encoding := ENCODINGS.get(content_encoding)) is None:
+        raise NotImplementedError(content_encoding)
+    return encoding.decompress(data)
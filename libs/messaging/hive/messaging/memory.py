@@ -0,0 +1,946 @@
+"""An in-process stand-in for RabbitMQ, for wiring services together
+and load testing them without a broker or a network.
+
+:class:`InMemoryBroker` implements the parts of AMQP 0-9-1 Hive uses:
+direct, fanout and topic exchanges; durable and exclusive queues;
+per-consumer prefetch; priority queues; acks, rejects and requeues;
+per-message and per-queue TTLs; dead-lettering; mandatory publishing;
+and publisher confirms.  Its connections and channels implement the subset of
+:class:`pika.BlockingConnection` and its channels' API that
+:class:`hive.messaging.Connection` and :class:`hive.messaging.Channel`
+use, so the real Hive classes run on top of it unmodified::
+
+    bus = InMemoryMessageBus()
+    with bus.blocking_connection() as conn:
+        channel = conn.channel()
+        ...
+
+As with Pika, each connection must only be used by one thread at a
+time, except for `add_callback_threadsafe`.  Consumer callbacks, timers
+and publisher confirms are dispatched by `process_data_events`.  Nothing
+persists: the broker forgets everything when it's garbage collected.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from functools import lru_cache, partial
+from itertools import count
+from threading import Condition, RLock
+from time import monotonic, time
+from typing import Any, Optional, TYPE_CHECKING
+
+from pika.adapters.blocking_connection import ReturnedMessage
+from pika.exceptions import (
+    ChannelClosedByBroker,
+    ChannelClosedByClient,
+    ChannelWrongStateError,
+    ConnectionClosedByBroker,
+    ConnectionClosedByClient,
+    ConnectionWrongStateError,
+    UnroutableError,
+)
+from pika.frame import Method
+from pika.spec import Basic, BasicProperties, Exchange, Queue
+
+from .connection import Connection
+from .message_bus import MessageBus
+from .typing import OnChannelOpenCallback
+
+if TYPE_CHECKING:
+    from .aio import AsyncConnection
+    from .aio.typing import OnAsyncChannelOpenCallback
+
+logger = logging.getLogger(__name__)
+d = logger.debug
+
+Callback = Callable[[], None]
+
+
+@dataclass
+class _Message:
+    exchange: str
+    routing_key: str
+    properties: BasicProperties
+    body: bytes
+    expires_at: Optional[float] = None
+    priority: int = 0
+    redelivered: bool = False
+
+    def is_expired(self, now: float) -> bool:
+        return self.expires_at is not None and self.expires_at <= now
+
+
+@dataclass
+class _Exchange:
+    name: str
+    type: str
+    bindings: set[tuple[str, str]] = field(default_factory=set)
+
+    def route(self, routing_key: str) -> set[str]:
+        """Return the names of the queues `routing_key` routes to.
+        """
+        if self.type == "fanout":
+            return {queue for queue, _ in self.bindings}
+        if self.type == "topic":
+            return {
+                queue
+                for queue, pattern in self.bindings
+                if _topic_matches(pattern, routing_key)
+            }
+        return {
+            queue
+            for queue, binding_key in self.bindings
+            if binding_key == routing_key
+        }
+
+
+def _topic_matches(binding_key: str, routing_key: str) -> bool:
+    """Match an AMQP topic binding key, where "*" matches exactly one
+    word and "#" matches zero or more, against a routing key.
+    """
+    return _match_words(
+        tuple(binding_key.split(".")),
+        tuple(routing_key.split(".")),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _match_words(pattern: tuple[str, ...], words: tuple[str, ...]) -> bool:
+    if not pattern:
+        return not words
+    head, rest = pattern[0], pattern[1:]
+    if head == "#":
+        return any(
+            _match_words(rest, words[index:])
+            for index in range(len(words) + 1)
+        )
+    if not words:
+        return False
+    return head in ("*", words[0]) and _match_words(rest, words[1:])
+
+
+@dataclass
+class _Consumer:
+    tag: str
+    queue: str
+    channel: InMemoryChannel
+    callback: Callable[..., None]
+    prefetch_count: int
+    unacked: int = 0
+
+    @property
+    def has_capacity(self) -> bool:
+        if not self.prefetch_count:
+            return True
+        return self.unacked < self.prefetch_count
+
+
+@dataclass
+class _Queue:
+    name: str
+    arguments: dict[str, Any]
+    owner: Optional[InMemoryConnection] = None
+    messages: deque[_Message] = field(default_factory=deque)
+    consumers: list[_Consumer] = field(default_factory=list)
+    _next_consumer: int = 0
+
+    def next_consumer(self) -> Optional[_Consumer]:
+        """Return the next consumer with capacity, round-robin.
+        """
+        for _ in range(len(self.consumers)):
+            index = self._next_consumer % len(self.consumers)
+            self._next_consumer = index + 1
+            if (consumer := self.consumers[index]).has_capacity:
+                return consumer
+        return None
+
+
+@dataclass
+class InMemoryBroker:
+    """Exchanges, queues and the messages in them.
+    """
+    _exchanges: dict[str, _Exchange] = field(default_factory=dict)
+    _queues: dict[str, _Queue] = field(default_factory=dict)
+    _lock: RLock = field(default_factory=RLock, repr=False)
+    _queue_names: count[int] = field(default_factory=count, repr=False)
+    _connections: list[InMemoryConnection] = field(
+        default_factory=list,
+        repr=False,
+    )
+
+    def __post_init__(self) -> None:
+        self._exchanges[""] = _Exchange("", "direct")
+
+    def connect(self) -> InMemoryConnection:
+        connection = InMemoryConnection(self)
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def restart(self) -> None:
+        """Force every connection closed, as RabbitMQ does when it
+        shuts down.  Exchanges, queues and messages survive, except
+        for exclusive queues, which are deleted with their owners.
+        """
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            connection._close(ConnectionClosedByBroker(
+                320,
+                "CONNECTION_FORCED - broker forced connection closure"
+                " with reason 'shutdown'",
+            ))
+
+    def message_count(self, queue: str) -> int:
+        with self._lock:
+            return len(self._expire(self._get_queue(queue)).messages)
+
+    def queued(self, queue: str) -> list[tuple[BasicProperties, bytes]]:
+        """Return the properties and body of each message in `queue`.
+        """
+        with self._lock:
+            return [
+                (message.properties, message.body)
+                for message in self._expire(self._get_queue(queue)).messages
+            ]
+
+    # Declarations
+
+    def exchange_declare(self, exchange: str, exchange_type: str) -> None:
+        with self._lock:
+            if (existing := self._exchanges.get(exchange)) is None:
+                self._exchanges[exchange] = _Exchange(exchange, exchange_type)
+            elif existing.type != exchange_type:
+                raise ChannelClosedByBroker(
+                    406,
+                    f"PRECONDITION_FAILED - inequivalent arg 'type' for"
+                    f" exchange '{exchange}': received '{exchange_type}'"
+                    f" but current is '{existing.type}'",
+                )
+
+    def queue_declare(
+            self,
+            connection: InMemoryConnection,
+            queue: str,
+            *,
+            exclusive: bool,
+            arguments: dict[str, Any],
+    ) -> _Queue:
+        with self._lock:
+            if not queue:
+                queue = f"amq.gen-{next(self._queue_names)}"
+            if (existing := self._queues.get(queue)) is None:
+                owner = connection if exclusive else None
+                existing = self._queues[queue] = _Queue(
+                    queue,
+                    arguments,
+                    owner,
+                )
+                self._exchanges[""].bindings.add((queue, queue))
+            elif existing.owner not in (None, connection):
+                raise ChannelClosedByBroker(
+                    405,
+                    f"RESOURCE_LOCKED - cannot obtain exclusive access"
+                    f" to locked queue '{queue}'",
+                )
+            elif existing.arguments != arguments:
+                raise ChannelClosedByBroker(
+                    406,
+                    f"PRECONDITION_FAILED - inequivalent arguments for"
+                    f" queue '{queue}'",
+                )
+            return existing
+
+    def queue_bind(self, queue: str, exchange: str, routing_key: str) -> None:
+        with self._lock:
+            self._get_queue(queue)
+            self._get_exchange(exchange).bindings.add((queue, routing_key))
+
+    def _get_queue(self, queue: str) -> _Queue:
+        if (result := self._queues.get(queue)) is None:
+            raise ChannelClosedByBroker(
+                404,
+                f"NOT_FOUND - no queue '{queue}'",
+            )
+        return result
+
+    def _get_exchange(self, exchange: str) -> _Exchange:
+        if (result := self._exchanges.get(exchange)) is None:
+            raise ChannelClosedByBroker(
+                404,
+                f"NOT_FOUND - no exchange '{exchange}'",
+            )
+        return result
+
+    def _delete_queues(self, owner: InMemoryConnection) -> None:
+        with self._lock:
+            owned = [q for q in self._queues.values() if q.owner is owner]
+            for queue in owned:
+                del self._queues[queue.name]
+                for exchange in self._exchanges.values():
+                    exchange.bindings = {
+                        binding
+                        for binding in exchange.bindings
+                        if binding[0] != queue.name
+                    }
+
+    # Publishing
+
+    def publish(self, message: _Message) -> bool:
+        """Route `message`, returning False if it was unroutable.
+        """
+        with self._lock:
+            exchange = self._get_exchange(message.exchange)
+            queues = exchange.route(message.routing_key)
+            for queue in queues:
+                self._enqueue(self._queues[queue], message)
+            return bool(queues)
+
+    def _enqueue(self, queue: _Queue, message: _Message) -> None:
+        expires_at = None
+        ttls = [
+            int(ttl)
+            for ttl in (
+                message.properties.expiration,
+                queue.arguments.get("x-message-ttl"),
+            )
+            if ttl is not None
+        ]
+        if ttls:
+            expires_at = monotonic() + min(ttls) / 1000
+
+        priority = 0
+        if (max_priority := queue.arguments.get("x-max-priority")):
+            priority = min(message.properties.priority or 0, max_priority)
+        message = replace(message, expires_at=expires_at, priority=priority)
+
+        # Queue behind everything of the same or higher priority.
+        index = len(queue.messages)
+        while index and queue.messages[index - 1].priority < priority:
+            index -= 1
+        queue.messages.insert(index, message)
+        self._dispatch(queue)
+
+    def _expire(self, queue: _Queue) -> _Queue:
+        """Dead-letter expired messages from the head of `queue`.  Like
+        RabbitMQ, messages that expire behind unexpired ones stay in
+        the queue until they reach its head.
+        """
+        now = monotonic()
+        while queue.messages and queue.messages[0].is_expired(now):
+            self._dead_letter(queue, queue.messages.popleft(), "expired")
+        return queue
+
+    def _dispatch(self, queue: _Queue) -> None:
+        """Deliver messages from the head of `queue` to its consumers,
+        until it's empty or every consumer has all the unacknowledged
+        messages its prefetch count allows.
+        """
+        while self._expire(queue).messages:
+            if (consumer := queue.next_consumer()) is None:
+                return
+            consumer.channel._deliver(consumer, queue.messages.popleft())
+
+    def _settle(
+            self,
+            consumer: _Consumer,
+            message: _Message,
+            requeue: Optional[bool],
+    ) -> None:
+        """Acknowledge (`requeue` is None) or reject a delivery.
+        """
+        consumer.unacked -= 1
+        if (queue := self._queues.get(consumer.queue)) is None:
+            return
+        if requeue:
+            queue.messages.appendleft(replace(message, redelivered=True))
+        elif requeue is not None:
+            self._dead_letter(queue, message, "rejected")
+
+    def _dead_letter(
+            self,
+            queue: _Queue,
+            message: _Message,
+            reason: str,
+    ) -> None:
+        if (exchange := queue.arguments.get("x-dead-letter-exchange")) is None:
+            d("%s: Dropping %s message", queue.name, reason)
+            return
+        routing_key = queue.arguments.get(
+            "x-dead-letter-routing-key",
+            message.routing_key,
+        )
+
+        properties = BasicProperties(**vars(message.properties))
+        properties.expiration = None
+        properties.headers = dict(properties.headers or {})
+        deaths = [dict(death) for death in properties.headers.get(
+            "x-death",
+            [],
+        )]
+        for death in deaths:
+            if death["queue"] == queue.name and death["reason"] == reason:
+                death["count"] += 1
+                deaths.remove(death)
+                deaths.insert(0, death)
+                break
+        else:
+            deaths.insert(0, {
+                "count": 1,
+                "reason": reason,
+                "queue": queue.name,
+                "time": int(time()),
+                "exchange": message.exchange,
+                "routing-keys": [message.routing_key],
+            })
+        properties.headers["x-death"] = deaths
+
+        if exchange not in self._exchanges:
+            d("%s: Dropping %s message: no exchange %r",
+              queue.name, reason, exchange)
+            return
+        self.publish(_Message(exchange, routing_key, properties, message.body))
+
+
+@dataclass(eq=False)
+class InMemoryConnection:
+    """Like :class:`pika.BlockingConnection`, but connected to an
+    :class:`InMemoryBroker`.
+    """
+    broker: InMemoryBroker
+    is_open: bool = True
+    _closed_by: Optional[Exception] = None
+    _channels: list[InMemoryChannel] = field(default_factory=list)
+    _events: deque[Callback] = field(default_factory=deque, repr=False)
+    _condition: Condition = field(default_factory=Condition, repr=False)
+    _timers: list[tuple[float, int, Callback]] = field(default_factory=list)
+    _timer_ids: count[int] = field(default_factory=count, repr=False)
+    _channel_numbers: count[int] = field(
+        default_factory=lambda: count(1),
+        repr=False,
+    )
+
+    @property
+    def is_closed(self) -> bool:
+        return not self.is_open
+
+    def channel(
+            self,
+            channel_number: Optional[int] = None,
+    ) -> InMemoryChannel:
+        self._check_open()
+        if channel_number is None:
+            channel_number = next(self._channel_numbers)
+        channel = InMemoryChannel(self, channel_number)
+        self._channels.append(channel)
+        return channel
+
+    def close(
+            self,
+            reply_code: int = 200,
+            reply_text: str = "Normal shutdown",
+    ) -> None:
+        self._check_open()
+        self._close(ConnectionClosedByClient(reply_code, reply_text))
+
+    def _close(self, reason: Exception) -> None:
+        with self._condition:
+            if not self.is_open:
+                return
+            self.is_open = False
+            if not isinstance(reason, ConnectionClosedByClient):
+                self._closed_by = reason
+            self._events.clear()
+            self._timers.clear()
+            self._condition.notify_all()
+        for channel in list(self._channels):
+            if channel.is_open:
+                channel._close(reason)
+        with self.broker._lock:
+            self.broker._delete_queues(self)
+            if self in self.broker._connections:
+                self.broker._connections.remove(self)
+
+    def _check_open(self) -> None:
+        """Raise the exception that closed this connection, if it was
+        closed other than by the client, else ConnectionWrongStateError,
+        if it's closed.
+        """
+        if self.is_open:
+            return
+        if self._closed_by is not None:
+            raise self._closed_by
+        raise ConnectionWrongStateError("Connection is closed")
+
+    # Event dispatch
+
+    def _post(self, callback: Callback) -> None:
+        with self._condition:
+            if not self.is_open:
+                return
+            self._events.append(callback)
+            self._condition.notify()
+
+    def add_callback_threadsafe(self, callback: Callback) -> None:
+        with self._condition:
+            if not self.is_open:
+                raise ConnectionWrongStateError(
+                    "BlockingConnection.add_callback_threadsafe() called"
+                    " on closed or closing connection.",
+                )
+            self._events.append(callback)
+            self._condition.notify()
+
+    def call_later(self, delay: float, callback: Callback) -> int:
+        timer_id = next(self._timer_ids)
+        with self._condition:
+            heapq.heappush(
+                self._timers,
+                (monotonic() + delay, timer_id, callback),
+            )
+        return timer_id
+
+    def remove_timeout(self, timeout_id: int) -> None:
+        with self._condition:
+            self._timers = [
+                timer for timer in self._timers if timer[1] != timeout_id
+            ]
+            heapq.heapify(self._timers)
+
+    def process_data_events(self, time_limit: Optional[float] = 0) -> None:
+        """Dispatch pending events and due timers.  If none are ready,
+        wait up to `time_limit` seconds, or forever if `time_limit` is
+        None, for some to be.
+        """
+        self._check_open()
+        deadline = None if time_limit is None else monotonic() + time_limit
+        while not self._dispatch_ready():
+            with self._condition:
+                if not self.is_open:
+                    if self._closed_by is not None:
+                        raise self._closed_by
+                    return
+                if self._events:
+                    continue
+                now = monotonic()
+                timeout = None if deadline is None else deadline - now
+                if self._timers:
+                    until_timer = self._timers[0][0] - now
+                    if timeout is None or until_timer < timeout:
+                        timeout = until_timer
+                if timeout is not None and timeout <= 0:
+                    if deadline is not None and deadline <= now:
+                        return
+                    continue
+                self._condition.wait(timeout)
+
+    def _flush_output(self, *waiters: Callable[[], bool]) -> None:
+        """Dispatch events until one of `waiters` returns True.
+        """
+        while not any(ready() for ready in waiters):
+            self.process_data_events(time_limit=None)
+
+    def _dispatch_ready(self) -> bool:
+        """Run every event and timer that's ready, returning True if
+        there were any.
+        """
+        now = monotonic()
+        with self._condition:
+            ready = list(self._events)
+            self._events.clear()
+            while self._timers and self._timers[0][0] <= now:
+                ready.append(heapq.heappop(self._timers)[2])
+        for callback in ready:
+            callback()
+        return bool(ready)
+
+    def sleep(self, duration: float) -> None:
+        deadline = monotonic() + duration
+        while (remaining := deadline - monotonic()) > 0:
+            self.process_data_events(time_limit=remaining)
+
+
+@dataclass(eq=False)
+class InMemoryChannel:
+    """Like :class:`pika.adapters.blocking_connection.BlockingChannel`,
+    but on an :class:`InMemoryConnection`.
+    """
+    connection: InMemoryConnection
+    channel_number: int
+    is_open: bool = True
+    _prefetch_count: int = 0
+    _consumers: dict[str, _Consumer] = field(default_factory=dict)
+    _unacked: dict[int, tuple[_Consumer, _Message]] = field(
+        default_factory=dict,
+    )
+    _delivery_tags: count[int] = field(default_factory=lambda: count(1))
+    _consumer_tags: count[int] = field(default_factory=lambda: count(1))
+    _confirm_mode: Optional[str] = None
+    _publish_tags: count[int] = field(default_factory=lambda: count(1))
+    _on_ack_nack: Optional[Callable[[Any], None]] = None
+    _on_close_callbacks: list[Callable[..., None]] = field(
+        default_factory=list,
+    )
+    _on_return_callbacks: list[Callable[..., None]] = field(
+        default_factory=list,
+    )
+
+    @property
+    def broker(self) -> InMemoryBroker:
+        return self.connection.broker
+
+    @property
+    def is_closed(self) -> bool:
+        return not self.is_open
+
+    @property
+    def consumer_tags(self) -> list[str]:
+        return list(self._consumers)
+
+    @property
+    def _impl(self) -> InMemoryChannel:
+        """Stands in for the asynchronous channel Pika's blocking
+        channels wrap.
+        """
+        return self
+
+    def _check_open(self) -> None:
+        if not self.is_open:
+            raise ChannelWrongStateError("Channel is closed.")
+
+    def add_on_close_callback(self, callback: Callable[..., None]) -> None:
+        self._on_close_callbacks.append(callback)
+
+    def add_on_return_callback(self, callback: Callable[..., None]) -> None:
+        self._on_return_callbacks.append(callback)
+
+    def close(
+            self,
+            reply_code: int = 0,
+            reply_text: str = "Normal shutdown",
+    ) -> None:
+        self._check_open()
+        self._close(ChannelClosedByClient(reply_code, reply_text))
+
+    def _close(self, reason: Exception) -> None:
+        """Cancel this channel's consumers and requeue its unacked
+        deliveries, as the broker does when a channel closes.
+        """
+        with self.broker._lock:
+            self.is_open = False
+            consumers = list(self._consumers.values())
+            self._consumers.clear()
+            unacked = sorted(self._unacked.items(), reverse=True)
+            self._unacked.clear()
+            queues = set()
+            for consumer in consumers:
+                self._remove_consumer(consumer)
+            for _, (consumer, message) in unacked:
+                self.broker._settle(consumer, message, requeue=True)
+                queues.add(consumer.queue)
+            for queue in queues:
+                if (q := self.broker._queues.get(queue)) is not None:
+                    self.broker._dispatch(q)
+        if self in self.connection._channels:
+            self.connection._channels.remove(self)
+        for callback in self._on_close_callbacks:
+            callback(self, reason)
+
+    def _fail(self, reason: ChannelClosedByBroker) -> None:
+        """Close this channel because of a protocol error, as brokers
+        do, then raise `reason`.
+        """
+        self._close(reason)
+        raise reason
+
+    def _call_broker(self, func: Callable[..., Any], *args: Any,
+                     **kwargs: Any) -> Any:
+        self._check_open()
+        try:
+            return func(*args, **kwargs)
+        except ChannelClosedByBroker as e:
+            self._fail(e)
+
+    # Declarations
+
+    def exchange_declare(
+            self,
+            exchange: str,
+            exchange_type: str = "direct",
+            passive: bool = False,
+            durable: bool = False,
+            auto_delete: bool = False,
+            internal: bool = False,
+            arguments: Optional[dict[str, Any]] = None,
+    ) -> Method[Any]:
+        if passive:
+            self._call_broker(self.broker._get_exchange, exchange)
+        else:
+            self._call_broker(
+                self.broker.exchange_declare,
+                exchange,
+                str(exchange_type),
+            )
+        return Method(self.channel_number, Exchange.DeclareOk())
+
+    def queue_declare(
+            self,
+            queue: str,
+            passive: bool = False,
+            durable: bool = False,
+            exclusive: bool = False,
+            auto_delete: bool = False,
+            arguments: Optional[dict[str, Any]] = None,
+    ) -> Method[Any]:
+        if passive:
+            q = self._call_broker(self.broker._get_queue, queue)
+        else:
+            q = self._call_broker(
+                self.broker.queue_declare,
+                self.connection,
+                queue,
+                exclusive=exclusive,
+                arguments=dict(arguments or {}),
+            )
+        return Method(self.channel_number, Queue.DeclareOk(
+            queue=q.name,
+            message_count=len(q.messages),
+            consumer_count=len(q.consumers),
+        ))
+
+    def queue_bind(
+            self,
+            queue: str,
+            exchange: str,
+            routing_key: Optional[str] = None,
+            arguments: Optional[dict[str, Any]] = None,
+    ) -> Method[Any]:
+        if routing_key is None:
+            routing_key = queue
+        self._call_broker(self.broker.queue_bind, queue, exchange, routing_key)
+        return Method(self.channel_number, Queue.BindOk())
+
+    # Publishing
+
+    def confirm_delivery(
+            self,
+            ack_nack_callback: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        """Enable publisher confirms.  With no callback, `basic_publish`
+        raises :class:`pika.exceptions.UnroutableError` for returned
+        messages, like :class:`BlockingChannel`.  With a callback,
+        confirms are dispatched to it asynchronously, like
+        :class:`pika.channel.Channel`.
+        """
+        self._check_open()
+        if self._confirm_mode is not None:
+            raise ValueError("Confirms already enabled")
+        self._confirm_mode = "async" if ack_nack_callback else "blocking"
+        self._on_ack_nack = ack_nack_callback
+
+    def basic_publish(
+            self,
+            exchange: str,
+            routing_key: str,
+            body: bytes,
+            properties: Optional[BasicProperties] = None,
+            mandatory: bool = False,
+    ) -> None:
+        if properties is None:
+            properties = BasicProperties()
+        message = _Message(exchange, routing_key, properties, body)
+        routed = self._call_broker(self.broker.publish, message)
+
+        returned = None
+        if mandatory and not routed:
+            returned = ReturnedMessage(
+                Basic.Return(
+                    reply_code=312,
+                    reply_text="NO_ROUTE",
+                    exchange=exchange,
+                    routing_key=routing_key,
+                ),
+                properties,
+                body,
+            )
+
+        if self._confirm_mode == "blocking":
+            if returned is not None:
+                raise UnroutableError([returned])
+            return
+
+        if returned is not None:
+            for callback in self._on_return_callbacks:
+                self.connection._post(partial(
+                    callback,
+                    self,
+                    returned.method,
+                    returned.properties,
+                    returned.body,
+                ))
+
+        if (on_ack_nack := self._on_ack_nack) is not None:
+            frame = Method(
+                self.channel_number,
+                Basic.Ack(delivery_tag=next(self._publish_tags)),
+            )
+            self.connection._post(partial(on_ack_nack, frame))
+
+    # Consuming
+
+    def basic_qos(
+            self,
+            prefetch_size: int = 0,
+            prefetch_count: int = 0,
+            global_qos: bool = False,
+    ) -> None:
+        self._check_open()
+        self._prefetch_count = prefetch_count
+
+    def basic_consume(
+            self,
+            queue: str,
+            on_message_callback: Callable[..., None],
+            auto_ack: bool = False,
+            exclusive: bool = False,
+            consumer_tag: Optional[str] = None,
+            arguments: Optional[dict[str, Any]] = None,
+    ) -> str:
+        if auto_ack:
+            raise NotImplementedError("auto_ack")
+        if not consumer_tag:
+            tag = next(self._consumer_tags)
+            consumer_tag = f"ctag{self.channel_number}.{tag}"
+        with self.broker._lock:
+            q = self._call_broker(self.broker._get_queue, queue)
+            consumer = _Consumer(
+                consumer_tag,
+                queue,
+                self,
+                on_message_callback,
+                self._prefetch_count,
+            )
+            self._consumers[consumer_tag] = consumer
+            q.consumers.append(consumer)
+            self.broker._dispatch(q)
+        return consumer_tag
+
+    def basic_cancel(self, consumer_tag: str) -> list[Any]:
+        with self.broker._lock:
+            if (consumer := self._consumers.pop(consumer_tag, None)):
+                self._remove_consumer(consumer)
+        return []
+
+    def _remove_consumer(self, consumer: _Consumer) -> None:
+        if (queue := self.broker._queues.get(consumer.queue)) is not None:
+            queue.consumers.remove(consumer)
+
+    def _deliver(self, consumer: _Consumer, message: _Message) -> None:
+        """Send `message` to `consumer`.  Called with the broker locked.
+        """
+        delivery_tag = next(self._delivery_tags)
+        self._unacked[delivery_tag] = (consumer, message)
+        consumer.unacked += 1
+        method = Basic.Deliver(
+            consumer_tag=consumer.tag,
+            delivery_tag=delivery_tag,
+            redelivered=message.redelivered,
+            exchange=message.exchange,
+            routing_key=message.routing_key,
+        )
+
+        def dispatch() -> None:
+            if not self.is_open:
+                return
+            consumer.callback(self, method, message.properties, message.body)
+
+        self.connection._post(dispatch)
+
+    def basic_ack(self, delivery_tag: int = 0, multiple: bool = False) -> None:
+        self._settle(delivery_tag, multiple, None)
+
+    def basic_nack(
+            self,
+            delivery_tag: int = 0,
+            multiple: bool = False,
+            requeue: bool = True,
+    ) -> None:
+        self._settle(delivery_tag, multiple, requeue)
+
+    def basic_reject(self, delivery_tag: int, requeue: bool = True) -> None:
+        self._settle(delivery_tag, False, requeue)
+
+    def _settle(
+            self,
+            delivery_tag: int,
+            multiple: bool,
+            requeue: Optional[bool],
+    ) -> None:
+        self._check_open()
+        with self.broker._lock:
+            if multiple:
+                tags = [tag for tag in self._unacked if tag <= delivery_tag]
+                if delivery_tag and not tags:
+                    tags = [delivery_tag]
+            else:
+                tags = [delivery_tag]
+            if any(tag not in self._unacked for tag in tags):
+                self._fail(ChannelClosedByBroker(
+                    406,
+                    f"PRECONDITION_FAILED - unknown delivery tag"
+                    f" {delivery_tag}",
+                ))
+            queues = set()
+            for tag in tags:
+                consumer, message = self._unacked.pop(tag)
+                self.broker._settle(consumer, message, requeue)
+                queues.add(consumer.queue)
+            for queue in queues:
+                if (q := self.broker._queues.get(queue)) is not None:
+                    self.broker._dispatch(q)
+
+    def start_consuming(self) -> None:
+        """Dispatch events until all consumers are cancelled.
+        """
+        while self._consumers and self.is_open:
+            self.connection.process_data_events(time_limit=None)
+
+    def stop_consuming(self, consumer_tag: Optional[str] = None) -> None:
+        if consumer_tag is not None:
+            self.basic_cancel(consumer_tag)
+            return
+        for tag in list(self._consumers):
+            self.basic_cancel(tag)
+
+
+@dataclass
+class InMemoryMessageBus(MessageBus):
+    """A :class:`MessageBus` whose connections are to an in-process
+    :class:`InMemoryBroker`.  Connection parameters are ignored.
+    """
+    broker: InMemoryBroker = field(default_factory=InMemoryBroker)
+
+    def blocking_connection(
+            self,
+            *,
+            connection_class: type[Connection] = Connection,
+            on_channel_open: Optional[OnChannelOpenCallback] = None,
+            **kwargs: Any
+    ) -> Connection:
+        return connection_class(
+            self.broker.connect(),  # type: ignore[arg-type]
+            on_channel_open=on_channel_open,
+        )
+
+    def async_connection(
+            self,
+            *,
+            on_channel_open: Optional[OnAsyncChannelOpenCallback] = None,
+            **kwargs: Any
+    ) -> AsyncConnection:
+        raise NotImplementedError("async_connection")
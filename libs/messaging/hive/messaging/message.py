@@ -1,11 +1,52 @@
 import json
 
 from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import cached_property, lru_cache
 from typing import Any, Optional
 
 from cloudevents.pydantic import CloudEvent
 from contenttype import ContentType  # type: ignore
 from pika.spec import Basic, BasicProperties
+from pydantic import TypeAdapter
+
+from hive.common import utc_now
+
+from .encoding import (
+    CLOUDEVENTS_HEADER_PREFIX,
+    JSON,
+    Format,
+    decompress,
+    format_for,
+)
+
+# Header carrying the absolute deadline publishers give as consume_by.
+CONSUME_BY_HEADER = "hive-consume-by"
+
+
+@dataclass(frozen=True)
+class ContentTypeInfo:
+    is_json: bool
+    is_cloudevent: bool
+    format: Optional[Format]
+
+
+@lru_cache(maxsize=64)
+def _content_type_info(content_type: Optional[str]) -> ContentTypeInfo:
+    """Parse a content type.  Hive uses only a handful of distinct
+    content types, so each is parsed only once.
+    """
+    ct = ContentType.parse(content_type)
+    if ct.type != "application":
+        format = None
+    else:
+        format = format_for(str(ct.subtype), ct.suffix and str(ct.suffix))
+    return ContentTypeInfo(
+        is_json=format is not None and format.name == "json",
+        is_cloudevent=(str(ct.type) == "application"
+                       and str(ct.subtype) == "cloudevents"),
+        format=format,
+    )
 
 
 @dataclass
@@ -22,29 +63,178 @@ class Message:
     def content_type(self) -> Optional[str]:
         return self.properties.content_type
 
+    @property
+    def content_encoding(self) -> Optional[str]:
+        return self.properties.content_encoding
+
+    @cached_property
+    def payload(self) -> bytes:
+        """The body, decompressed according to its content encoding.
+        """
+        return decompress(self.body, self.content_encoding)
+
+    @cached_property
+    def _content_type_info(self) -> ContentTypeInfo:
+        return _content_type_info(self.content_type)
+
     @property
     def is_json(self) -> bool:
-        ct = ContentType.parse(self.content_type)
-        if ct.type != "application":
-            return False
-        if ct.subtype == "json":
-            return True
-        return str(ct.suffix) == "json"
+        return self._content_type_info.is_json
 
     def json(self) -> Any:
-        if not self.is_json:
+        """Decode the payload.  Despite the name, payloads may be
+        MessagePack or CBOR as well as JSON.
+        """
+        if (format := self._content_type_info.format) is None:
             raise ValueError(self.content_type)
-        return json.loads(self.body)
+        if format is JSON:
+            return json.loads(self.payload)
+        return format.loads(self.payload)
 
     @property
     def is_cloudevent(self) -> bool:
-        ct = ContentType.parse(self.content_type)
-        return str(ct.type) == "application" \
-            and str(ct.subtype) == "cloudevents"
+        if self.is_binary_cloudevent:
+            return True
+        return self._content_type_info.is_cloudevent
+
+    @property
+    def is_binary_cloudevent(self) -> bool:
+        """True if this message is a CloudEvent in binary content mode,
+        i.e. with its attributes in headers, and its data as the body.
+        """
+        headers = self.properties.headers
+        if not isinstance(headers, dict):
+            return False
+        return f"{CLOUDEVENTS_HEADER_PREFIX}specversion" in headers
 
     def event(self) -> CloudEvent:
+        if self.is_binary_cloudevent:
+            return CloudEvent.model_validate(self._binary_event_attributes())
+        if not self.is_cloudevent:
+            raise ValueError(self.content_type)
+        if not self.is_json:
+            raise NotImplementedError(self.content_type)
+        return CloudEvent.model_validate_json(self.payload)
+
+    def _binary_event_attributes(self) -> dict[str, Any]:
+        headers = self.properties.headers or {}
+        attributes = {
+            name.removeprefix(CLOUDEVENTS_HEADER_PREFIX): value
+            for name, value in headers.items()
+            if name.startswith(CLOUDEVENTS_HEADER_PREFIX)
+        }
+        if self.content_type:
+            attributes["datacontenttype"] = self.content_type
+        if self.body:
+            if self.content_type and self._content_type_info.format:
+                attributes["data"] = self.json()
+            else:
+                attributes["data"] = self.payload
+        return attributes
+
+    def lazy_event(self) -> "LazyEvent":
+        """Like `event`, but the returned event's attributes aren't
+        validated, and its data isn't validated until it's accessed.
+        Use this to cheaply discard events by type or subject.
+        """
+        return self._lazy_event
+
+    @property
+    def event_time(self) -> Optional[datetime]:
+        """The `time` attribute of this message's CloudEvent, or None
+        if this message isn't a CloudEvent with a `time`.
+        """
+        if self.is_binary_cloudevent:
+            headers = self.properties.headers or {}
+            if (time := headers.get(f"{CLOUDEVENTS_HEADER_PREFIX}time")):
+                return _DATETIME.validate_python(time)
+            return None
+        if not self.is_cloudevent or not self.is_json:
+            return None
+        return self.lazy_event().time
+
+    @cached_property
+    def deadline(self) -> Optional[datetime]:
+        """The time by which the publisher wanted this message consumed,
+        or None if it didn't say.
+        """
+        headers = self.properties.headers
+        if not isinstance(headers, dict):
+            return None
+        if (deadline := headers.get(CONSUME_BY_HEADER)) is None:
+            return None
+        return _DATETIME.validate_python(deadline)
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        """Return True if this message's deadline has passed.
+        """
+        if (deadline := self.deadline) is None:
+            return False
+        return deadline < (now or utc_now())
+
+    def age(self, now: Optional[datetime] = None) -> Optional[timedelta]:
+        """Return the time since this message's CloudEvent `time`,
+        or None if it has none.  Binary-mode events' ages are read
+        from their headers, without decoding their data.
+        """
+        if (event_time := self.event_time) is None:
+            return None
+        return (now or utc_now()) - event_time
+
+    @cached_property
+    def _lazy_event(self) -> "LazyEvent":
+        if self.is_binary_cloudevent:
+            return LazyEvent(self._binary_event_attributes())
         if not self.is_cloudevent:
             raise ValueError(self.content_type)
         if not self.is_json:
             raise NotImplementedError(self.content_type)
-        return CloudEvent.model_validate_json(self.body)
+        attributes = json.loads(self.payload)
+        if not isinstance(attributes, dict):
+            raise ValueError(type(attributes))
+        return LazyEvent(attributes)
+
+
+_DATETIME = TypeAdapter(datetime)
+
+
+@dataclass
+class LazyEvent:
+    """A CloudEvent's decoded but unvalidated attributes.
+    """
+    _attributes: dict[str, Any]
+
+    @property
+    def id(self) -> Optional[str]:
+        return self._attributes.get("id")
+
+    @property
+    def source(self) -> Optional[str]:
+        return self._attributes.get("source")
+
+    @property
+    def type(self) -> Optional[str]:
+        return self._attributes.get("type")
+
+    @property
+    def subject(self) -> Optional[str]:
+        return self._attributes.get("subject")
+
+    @cached_property
+    def time(self) -> Optional[datetime]:
+        if (time := self._attributes.get("time")) is None:
+            return None
+        return _DATETIME.validate_python(time)
+
+    @property
+    def data(self) -> Any:
+        return self.event().data
+
+    @cached_property
+    def _event(self) -> CloudEvent:
+        return CloudEvent.model_validate(self._attributes)
+
+    def event(self) -> CloudEvent:
+        """Return the fully-validated event.
+        """
+        return self._event
@@ -1,9 +1,13 @@
+from __future__ import annotations
+
 import os
 import ssl
 
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from functools import cached_property
-from typing import Any, Optional
+from typing import Any, Optional, TYPE_CHECKING
 
 from pika import (
     BlockingConnection,
@@ -15,10 +19,16 @@ from pika.exceptions import AMQPConnectionError
 
 from hive.common import read_config
 
+from .channel import Channel
 from .connection import Connection
+from .pool import ConnectionPool
 from .publisher import PublisherConnection
 from .typing import OnChannelOpenCallback
 
+if TYPE_CHECKING:
+    from .aio import AsyncConnection
+    from .aio.typing import OnAsyncChannelOpenCallback
+
 
 @dataclass
 class MessageBus:
@@ -30,8 +40,11 @@ class MessageBus:
     )
     config_key: str = "rabbitmq"
 
-    @cached_property
+    @property
     def config(self) -> dict[str, Any]:
+        """The broker's configuration.  Read afresh, from the config
+        reader's cache, so reconnections use rotated credentials.
+        """
         return read_config(self.config_key)
 
     @property
@@ -101,3 +114,37 @@ class MessageBus:
         return self.blocking_connection(
             connection_class=PublisherConnection,
             **kwargs)
+
+    @cached_property
+    def pool(self) -> ConnectionPool:
+        """Connections for :meth:`pooled_channel`.
+        """
+        return ConnectionPool(self.blocking_connection)
+
+    @contextmanager
+    def pooled_channel(self) -> Iterator[Channel]:
+        """Borrow a channel on a pooled blocking connection, for
+        short-lived users that would otherwise open and close a
+        connection of their own.
+        """
+        with self.pool.channel() as channel:
+            yield channel
+
+    def async_connection(
+            self,
+            *,
+            on_channel_open: Optional[OnAsyncChannelOpenCallback] = None,
+            **kwargs: Any
+    ) -> AsyncConnection:
+        """Return an unopened :class:`hive.messaging.aio.AsyncConnection`.
+        Use it as an async context manager to open and close it.
+        """
+        from .aio import AsyncConnection
+
+        return AsyncConnection(
+            self.connection_params(**kwargs),
+            on_channel_open=on_channel_open,
+        )
+
+
+DEFAULT_MESSAGE_BUS: MessageBus = MessageBus()
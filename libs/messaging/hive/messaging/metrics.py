@@ -0,0 +1,321 @@
+"""Consumer and publisher instrumentation.
+
+Channels report each message they handle and each publish the broker
+confirms to every registered :class:`Hook`.  The default hook is an
+in-process :class:`Registry` of counters and histograms, which
+:func:`make_server` serves over HTTP in Prometheus' text format.
+"""
+import logging
+
+from bisect import bisect_left
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from time import monotonic, time
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from .message import Message
+
+logger = logging.getLogger(__name__)
+
+Labels = tuple[tuple[str, str], ...]
+
+# Bucket upper bounds, in seconds.  Queue waits may be long.
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+
+
+class Hook:
+    """Receives instrumentation events.  Subclass, override whichever
+    methods you need, and register instances with :func:`add_hook`.
+    Hooks are called on whichever thread handled the message or
+    received the confirm, so must be thread-safe, and quick.
+    """
+    def message_handled(
+            self,
+            queue: str,
+            *,
+            outcome: str,
+            handler_seconds: float,
+            wait_seconds: Optional[float],
+    ) -> None:
+        """A consumer's callback returned ("ack") or raised ("reject"),
+        or the message was discarded unhandled as stale ("stale").
+
+        :param wait_seconds: The time between the message's CloudEvent
+            `time` and its callback starting, or None if the message
+            isn't a CloudEvent.
+        """
+
+    def publish_confirmed(
+            self,
+            exchange: str,
+            *,
+            outcome: str,
+            seconds: float,
+    ) -> None:
+        """The broker acked ("ack"), nacked ("nack") or returned
+        ("unroutable") a message published with confirms enabled,
+        or the channel closed before it did ("failed").
+        """
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(init=False)
+    sum: float = field(default=0.0, init=False)
+    count: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record `value`.  Callers must hold the registry's lock.
+        """
+        if (index := bisect_left(self.buckets, value)) < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+@dataclass
+class Registry(Hook):
+    """In-process counters and histograms, recorded from hook calls.
+    """
+    _counters: dict[tuple[str, Labels], float] = field(default_factory=dict)
+    _histograms: dict[tuple[str, Labels], Histogram] = field(
+        default_factory=dict,
+    )
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def message_handled(
+            self,
+            queue: str,
+            *,
+            outcome: str,
+            handler_seconds: float,
+            wait_seconds: Optional[float],
+    ) -> None:
+        with self._lock:
+            self._increment(
+                "hive_messages_handled_total",
+                queue=queue,
+                outcome=outcome,
+            )
+            self._observe(
+                "hive_message_handler_seconds",
+                handler_seconds,
+                queue=queue,
+            )
+            if wait_seconds is not None:
+                self._observe(
+                    "hive_message_wait_seconds",
+                    max(wait_seconds, 0.0),
+                    queue=queue,
+                )
+
+    def publish_confirmed(
+            self,
+            exchange: str,
+            *,
+            outcome: str,
+            seconds: float,
+    ) -> None:
+        with self._lock:
+            self._increment(
+                "hive_publishes_confirmed_total",
+                exchange=exchange,
+                outcome=outcome,
+            )
+            self._observe(
+                "hive_publish_confirm_seconds",
+                seconds,
+                exchange=exchange,
+            )
+
+    def _increment(self, name: str, **labels: str) -> None:
+        key = (name, _labels(labels))
+        self._counters[key] = self._counters.get(key, 0) + 1
+
+    def _observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, _labels(labels))
+        if (histogram := self._histograms.get(key)) is None:
+            histogram = self._histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def counter(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get((name, _labels(labels)), 0)
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get((name, _labels(labels)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """Return everything recorded, in Prometheus' text format.
+        """
+        with self._lock:
+            return "".join(self._render())
+
+    def _render(self) -> Iterator[str]:
+        last_name = None
+        for (name, labels), value in sorted(self._counters.items()):
+            if name != last_name:
+                yield f"# TYPE {name} counter\n"
+                last_name = name
+            yield f"{name}{_format_labels(labels)} {value:g}\n"
+
+        for (name, labels), hist in sorted(self._histograms.items()):
+            if name != last_name:
+                yield f"# TYPE {name} histogram\n"
+                last_name = name
+            cumulative = 0
+            for bound, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                le = labels + (("le", f"{bound:g}"),)
+                yield f"{name}_bucket{_format_labels(le)} {cumulative}\n"
+            le = labels + (("le", "+Inf"),)
+            yield f"{name}_bucket{_format_labels(le)} {hist.count}\n"
+            yield f"{name}_sum{_format_labels(labels)} {hist.sum:g}\n"
+            yield f"{name}_count{_format_labels(labels)} {hist.count}\n"
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(
+        f'{name}="{_escape(value)}"' for name, value in labels
+    ) + "}"
+
+
+def _escape(value: str) -> str:
+    return (value
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"))
+
+
+DEFAULT_REGISTRY = Registry()
+
+_hooks: list[Hook] = [DEFAULT_REGISTRY]
+
+
+def add_hook(hook: Hook) -> None:
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    _hooks.remove(hook)
+
+
+def _call_hooks(method: str, *args: Any, **kwargs: Any) -> None:
+    for hook in tuple(_hooks):
+        try:
+            getattr(hook, method)(*args, **kwargs)
+        except Exception:
+            logger.exception("%s.%s failed", type(hook).__name__, method)
+
+
+@dataclass
+class HandlerTimer:
+    """Time one consumer callback invocation.  Only the first call
+    to `done` is reported.
+    """
+    queue: str
+    message: "Message"
+    started_at: float = field(default_factory=time)
+    _start: float = field(default_factory=monotonic)
+    _done: bool = False
+
+    def done(self, outcome: str) -> None:
+        if self._done:
+            return
+        self._done = True
+        if not _hooks:
+            return
+        handler_seconds = monotonic() - self._start
+        _call_hooks(
+            "message_handled",
+            self.queue,
+            outcome=outcome,
+            handler_seconds=handler_seconds,
+            wait_seconds=self._wait_seconds(),
+        )
+
+    def _wait_seconds(self) -> Optional[float]:
+        try:
+            event_time = self.message.event_time
+        except Exception:
+            logger.debug("Can't get event time", exc_info=True)
+            return None
+        if not isinstance(event_time, datetime):
+            return None
+        return self.started_at - event_time.timestamp()
+
+
+def publish_confirmed(
+        exchange: str,
+        *,
+        outcome: str,
+        seconds: float,
+) -> None:
+    if not _hooks:
+        return
+    _call_hooks(
+        "publish_confirmed",
+        exchange,
+        outcome=outcome,
+        seconds=seconds,
+    )
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry: Registry = DEFAULT_REGISTRY
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format, *args)
+
+
+def make_server(
+        port: int,
+        host: str = "",
+        registry: Registry = DEFAULT_REGISTRY,
+) -> ThreadingHTTPServer:
+    """Return a server for `registry` on `host`:`port`, to be run with
+    :func:`hive.common.socketserver.serving`.  Metrics are served from
+    ``/metrics``.
+    """
+    handler = type(
+        "MetricsRequestHandler",
+        (MetricsRequestHandler,),
+        {"registry": registry},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import logging
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import timedelta
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from hive.common.units import SECOND
+
+from .channel import Channel
+from .connection import Connection
+
+if TYPE_CHECKING:
+    from .typing import ConnectionFactory
+
+logger = logging.getLogger(__name__)
+d = logger.debug
+
+
+@dataclass
+class PooledChannel:
+    conn: Connection
+    channel: Channel
+    idle_since: float = field(default_factory=monotonic)
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self.conn._pika.is_open and self.channel._pika.is_open)
+
+    def poll(self) -> None:
+        """Process any I/O events that arrived while idle, including
+        heartbeats and the broker closing the connection.
+        """
+        self.conn._pika.process_data_events(time_limit=0)
+
+    def close(self) -> None:
+        try:
+            self.conn.__exit__(None, None, None)
+        except Exception:
+            logger.warning("EXCEPTION", exc_info=True)
+
+
+@dataclass
+class ConnectionPool:
+    """Blocking connections, each with one open channel, for reuse by
+    short-lived users that would otherwise connect, publish a few
+    messages, and disconnect.
+
+    Idle connections don't process I/O events, so they can't answer
+    broker heartbeats: `max_idle` must be comfortably less than the
+    negotiated heartbeat timeout.  Connections idle for longer are
+    closed rather than reused.
+    """
+    connect: ConnectionFactory
+    max_idle: timedelta = 60 * SECOND
+    max_size: int = 4
+    _idle: list[PooledChannel] = field(default_factory=list, init=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    @contextmanager
+    def channel(self) -> Iterator[Channel]:
+        """Borrow a channel, opening a new connection if no healthy
+        idle one is available.  The channel is returned to the pool
+        on exit, unless it or its connection closed meanwhile.
+        """
+        pooled = self._borrow()
+        try:
+            yield pooled.channel
+        finally:
+            self._release(pooled)
+
+    def _borrow(self) -> PooledChannel:
+        while (pooled := self._pop()) is not None:
+            try:
+                pooled.poll()
+            except Exception:
+                logger.info("Discarding broken pooled connection")
+                pooled.close()
+                continue
+            if pooled.is_open:
+                return pooled
+            pooled.close()
+
+        d("Opening pooled connection")
+        conn = self.connect()
+        try:
+            return PooledChannel(conn, conn.channel())
+        except BaseException:
+            conn.__exit__(None, None, None)
+            raise
+
+    def _pop(self) -> PooledChannel | None:
+        """Return the most recently used idle connection, if any,
+        closing any that have been idle for too long.
+        """
+        expired = []
+        with self._lock:
+            max_idle_since = monotonic() - self.max_idle.total_seconds()
+            while self._idle and self._idle[0].idle_since < max_idle_since:
+                expired.append(self._idle.pop(0))
+            pooled = self._idle.pop() if self._idle else None
+        for conn in expired:
+            d("Closing idle pooled connection")
+            conn.close()
+        return pooled
+
+    def _release(self, pooled: PooledChannel) -> None:
+        if not pooled.is_open:
+            pooled.close()
+            return
+        pooled.idle_since = monotonic()
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(pooled)
+                return
+        pooled.close()
+
+    def clear(self) -> None:
+        """Close all idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            pooled.close()
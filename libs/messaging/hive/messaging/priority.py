@@ -0,0 +1,17 @@
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """Message priorities.  Priorities only take effect on queues
+    whose consumers were declared with a `max_priority`; elsewhere
+    messages are delivered in the order they were published.
+    Messages published without a priority are treated as `BULK`.
+    """
+    BULK = 0
+    INTERACTIVE = 1
+
+
+# Priorities above a queue's maximum are treated as the maximum,
+# and each priority level costs the broker memory and CPU, so this
+# is just enough to separate the two lanes.
+DEFAULT_MAX_PRIORITY = max(Priority)
@@ -1,8 +1,7 @@
 import logging
 
-from dataclasses import dataclass, field
-from threading import Event, Thread
-from typing import Any, Protocol, cast
+from threading import Thread
+from typing import Any, cast
 from typing_extensions import Self
 
 from hive.common.typing import AnyCallable
@@ -10,20 +9,12 @@ from hive.common.units import SECOND
 
 from .channel import Channel
 from .connection import Connection
+from .threadsafe import PublisherCallback, PublisherChannel
 
 logger = logging.getLogger(__name__)
 d = logger.debug
 
 
-class Invoker(Protocol):
-    def __call__(
-            self,
-            func: AnyCallable,
-            *args: Any,
-            **kwargs: Any
-    ) -> Any: ...
-
-
 class PublisherConnection(Connection, Thread):
     def __init__(self, *args: Any, **kwargs: Any):
         thread_name = kwargs.pop("thread_name", "Publisher")
@@ -57,62 +48,17 @@ class PublisherConnection(Connection, Thread):
         return cast(Channel, PublisherChannel(
             self._invoke,
             self._invoke(super()._channel, *args, **kwargs),
+            _schedule=self._pika.add_callback_threadsafe,
         ))
 
+    def _confirm_delivery(self, channel: Channel) -> None:
+        """Enable pipelined publisher confirms, so callers of
+        `publish_*_async` can have many messages awaiting
+        confirmation at once.
+        """
+        channel._pipeline_confirms()
+
     def _invoke(self, func: AnyCallable, *args: Any, **kwargs: Any) -> Any:
         callback = PublisherCallback(func, args, kwargs)
         self._pika.add_callback_threadsafe(callback)
         return callback.join()
-
-
-@dataclass
-class PublisherCallback:
-    _func: AnyCallable
-    _args: tuple[str]
-    _kwargs: dict[str, Any]
-    _event: Event = field(default_factory=Event)
-    _result: Any = None
-    _exception: Exception | None = None
-
-    def __call__(self) -> None:
-        d("Entering callback")
-        try:
-            self._result = self._func(*self._args, **self._kwargs)
-        except Exception as exc:
-            self._exception = exc
-        finally:
-            self._event.set()
-            del self._func, self._args, self._kwargs
-            d("Leaving callback")
-
-    def join(self, *args: Any, **kwargs: Any) -> Any:
-        d("Waiting for callback")
-        self._event.wait(*args, **kwargs)
-        d("Callback returned")
-        try:
-            if self._exception:
-                raise self._exception
-            return self._result
-        finally:
-            del self._result, self._exception
-
-
-@dataclass
-class PublisherChannel:
-    _invoker: Invoker
-    _channel: Channel
-
-    def __getattr__(self, attr: str) -> Any:
-        result = getattr(self._channel, attr)
-        if not callable(result):
-            return result
-        return PublisherInvoker(self._invoker, result)
-
-
-@dataclass
-class PublisherInvoker:
-    _invoke: Invoker
-    _func: AnyCallable
-
-    def __call__(self, *args: Any, **kwargs: Any) -> Any:
-        return self._invoke(self._func, *args, **kwargs)
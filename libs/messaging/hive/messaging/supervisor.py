@@ -0,0 +1,97 @@
+import logging
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import timedelta
+from random import uniform
+from time import monotonic, sleep
+from typing import Any, Optional
+
+from pika.exceptions import AMQPConnectionError
+
+from hive.common.units import MILLISECOND, SECOND
+
+from .channel import Channel, RecordedConsumer
+from .typing import ConnectionFactory
+
+logger = logging.getLogger(__name__)
+
+# Failures that reconnecting might fix.  Channel-level errors, such
+# as declaring a queue with different arguments, aren't included:
+# those would just happen again.
+RECOVERABLE_ERRORS = (
+    AMQPConnectionError,  # includes broker restarts and heartbeat timeouts
+    ConnectionError,
+    TimeoutError,
+)
+
+
+@dataclass
+class Supervisor:
+    """Run consumers on a blocking connection, reconnecting with
+    jittered exponential backoff whenever the connection fails.
+
+    The first connection's consumers are started by the caller's
+    `setup` function.  Consumers are recorded as they're started,
+    and each subsequent connection re-declares and restarts the
+    recorded consumers without calling `setup` again.
+    """
+    connect: ConnectionFactory
+    min_delay: timedelta = 100 * MILLISECOND
+    max_delay: timedelta = 30 * SECOND
+    max_failures: Optional[int] = None
+    _consumers: Optional[list[RecordedConsumer]] = field(
+        default=None,
+        init=False,
+        repr=False,
+    )
+
+    def run(self, setup: Callable[[Channel], None], **kwargs: Any) -> None:
+        """Open a connection and channel, start consuming, and block
+        until the consumers are cancelled.  Keyword arguments are
+        passed to :meth:`Connection.channel`.
+
+        :raises: The last failure, after `max_failures` consecutive
+            failures to connect and consume, if `max_failures` is
+            not None.
+        """
+        failures = 0
+        while True:
+            started = monotonic()
+            try:
+                self._run(setup, kwargs)
+                return
+            except RECOVERABLE_ERRORS as e:
+                if monotonic() - started > self.max_delay.total_seconds():
+                    failures = 0  # it was working for a while
+                failures += 1
+                if self.max_failures is not None:
+                    if failures >= self.max_failures:
+                        raise
+                delay = self._backoff(failures)
+                logger.warning("Connection failed: %r: reconnecting in %.2fs",
+                               e, delay)
+                sleep(delay)
+
+    def _run(self, setup: Callable[[Channel], None], kwargs: Any) -> None:
+        with self.connect() as conn:
+            channel = conn.channel(**kwargs)
+            if (consumers := self._consumers) is None:
+                setup(channel)
+                self._consumers = channel._recorded_consumers
+            else:
+                for consumer in consumers:
+                    consumer.start(channel)
+                logger.info("Resumed %d consumer(s)", len(consumers))
+            channel.start_consuming()
+
+    def _backoff(self, failures: int) -> float:
+        """Return a random delay, between `min_delay` and a ceiling
+        that doubles with each consecutive failure up to `max_delay`.
+        """
+        min_delay = self.min_delay.total_seconds()
+        ceiling = min(
+            self.max_delay.total_seconds(),
+            min_delay * 2 ** (failures - 1),
+        )
+        return uniform(min_delay, max(min_delay, ceiling))
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import logging
+
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future
+from dataclasses import KW_ONLY, dataclass, field
+from threading import Event
+from typing import Any, Protocol, TYPE_CHECKING
+
+from hive.common.typing import AnyCallable
+
+from .batch import PreparedPublish, PublishBatch
+
+if TYPE_CHECKING:
+    from .channel import Channel
+
+logger = logging.getLogger(__name__)
+d = logger.debug
+
+
+class Invoker(Protocol):
+    def __call__(
+            self,
+            func: AnyCallable,
+            *args: Any,
+            **kwargs: Any
+    ) -> Any: ...
+
+
+@dataclass
+class PublisherCallback:
+    _func: AnyCallable
+    _args: tuple[str]
+    _kwargs: dict[str, Any]
+    _event: Event = field(default_factory=Event)
+    _result: Any = None
+    _exception: Exception | None = None
+
+    def __call__(self) -> None:
+        d("Entering callback")
+        try:
+            self._result = self._func(*self._args, **self._kwargs)
+        except Exception as exc:
+            self._exception = exc
+        finally:
+            self._event.set()
+            del self._func, self._args, self._kwargs
+            d("Leaving callback")
+
+    def join(self, *args: Any, **kwargs: Any) -> Any:
+        d("Waiting for callback")
+        self._event.wait(*args, **kwargs)
+        d("Callback returned")
+        try:
+            if self._exception:
+                raise self._exception
+            return self._result
+        finally:
+            del self._result, self._exception
+
+
+@dataclass
+class PublisherChannel:
+    _invoker: Invoker
+    _channel: Channel
+    _: KW_ONLY
+    _schedule: Callable[[Callable[[], None]], None]
+
+    def publish_request(self, **kwargs: Any) -> None:
+        self.publish_request_async(**kwargs).result()
+
+    def publish_event(self, **kwargs: Any) -> None:
+        self.publish_event_async(**kwargs).result()
+
+    def publish_request_async(self, **kwargs: Any) -> Future[None]:
+        return self._publish_async(mandatory=True, **kwargs)
+
+    def publish_event_async(self, **kwargs: Any) -> Future[None]:
+        return self._publish_async(**kwargs)
+
+    def publish_batch(self) -> PublishBatch:
+        return PublishBatch(self)
+
+    def publish_many(
+            self,
+            messages: Iterable[dict[str, Any]],
+            *,
+            mandatory: bool = False,
+    ) -> None:
+        with self.publish_batch() as batch:
+            for kwargs in messages:
+                if mandatory:
+                    batch.publish_request(**kwargs)
+                else:
+                    batch.publish_event(**kwargs)
+
+    def _prepare_publish(self, **kwargs: Any) -> PreparedPublish:
+        # Encapsulation doesn't touch the connection, so happens
+        # on the caller's thread.
+        return self._channel._prepare_publish(**kwargs)
+
+    def _send_batch(self, batch: list[PreparedPublish]) -> list[Future[None]]:
+        """Schedule `batch` to be published on the I/O thread, and
+        return futures that complete as the broker confirms each
+        message.
+        """
+        futures: list[Future[None]] = [Future() for _ in batch]
+
+        def publish() -> None:
+            self._channel._publish_batch(batch, futures)
+
+        self._schedule(publish)
+        return futures
+
+    def _publish_async(self, **kwargs: Any) -> Future[None]:
+        """Schedule a publish on the I/O thread, and return a future
+        that completes once the broker confirms delivery.  The caller
+        doesn't wait for the I/O thread.
+        """
+        future: Future[None] = Future()
+
+        def publish() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                self._channel._publish(future=future, **kwargs)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+
+        self._schedule(publish)
+        return future
+
+    def __getattr__(self, attr: str) -> Any:
+        result = getattr(self._channel, attr)
+        if not callable(result):
+            return result
+        return PublisherInvoker(self._invoker, result)
+
+
+@dataclass
+class PublisherInvoker:
+    _invoke: Invoker
+    _func: AnyCallable
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self._invoke(self._func, *args, **kwargs)
@@ -0,0 +1,53 @@
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, cast
+
+
+@dataclass
+class Topology:
+    """The exchanges, queues and bindings declared on a connection.
+
+    Declarations are idempotent, so each only needs sending to the
+    broker once per connection, however many channels make it.
+    Channels share their connection's topology, and skip the round
+    trip for anything already declared.  Connections clear their
+    topology when they close, because the broker forgets exclusive
+    and auto-delete resources when their connection goes away.
+    """
+    _declared: set[Hashable] = field(default_factory=set)
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def __len__(self) -> int:
+        return len(self._declared)
+
+    def declare(
+            self,
+            channel: Any,
+            method: str,
+            *args: Any,
+            **kwargs: Any
+    ) -> None:
+        """Call `channel`'s declaration method `method`, for example
+        "exchange_declare", unless an identical declaration was already
+        made.  Failed declarations aren't remembered.
+        """
+        key = (method, _freeze(args), _freeze(kwargs))
+        with self._lock:
+            if key in self._declared:
+                return
+        getattr(channel, method)(*args, **kwargs)
+        with self._lock:
+            self._declared.add(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._declared.clear()
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(map(_freeze, value))
+    return cast(Hashable, value)
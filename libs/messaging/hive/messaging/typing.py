@@ -1,4 +1,4 @@
-from typing import Any, Callable, TypeAlias, Protocol
+from typing import Any, Callable, Optional, TypeAlias, Protocol
 
 from .channel import Channel
 from .connection import Connection
@@ -16,3 +16,6 @@ ConsumerTag: TypeAlias = str
 
 OnChannelOpenCallback: TypeAlias = Callable[[Channel], None]
 OnMessageCallback: TypeAlias = Callable[[Channel, Message], None]
+
+# Returns why a message is stale, or None if it isn't.
+StalenessCheck: TypeAlias = Callable[[Message], Optional[str]]
@@ -0,0 +1,65 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+from threading import Lock
+from time import monotonic
+from typing import Literal, Optional
+
+from hive.common.units import MILLISECOND
+
+
+@dataclass
+class TypingIndicators:
+    """The Matrix typing indicators a channel has set, by sender, so
+    updates that wouldn't change anything needn't be published.
+
+    Only updates made through the same channel are known, so the
+    first update for each sender is always published.
+    """
+    # Don't cancel indicators due to time out sooner than this.
+    min_cancellation: timedelta = 500 * MILLISECOND
+
+    # Monotonic deadlines, in seconds.  Cancelled indicators'
+    # deadlines are the time they were cancelled.
+    _deadlines: dict[str, float] = field(default_factory=dict)
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def update(
+            self,
+            sender: str,
+            timeout: timedelta | Literal[False],
+            *,
+            min_extension: Optional[timedelta] = None,
+    ) -> bool:
+        """Record that `sender`'s indicator should now time out after
+        `timeout`, or be cancelled if `timeout` is False, and return
+        whether the update needs publishing.  Updates that would
+        extend a running indicator by less than `min_extension`,
+        which defaults to a third of `timeout`, don't.
+        """
+        now = monotonic()
+        with self._lock:
+            have_deadline = self._deadlines.get(sender)
+
+            if not timeout:
+                self._deadlines[sender] = now
+                if have_deadline is None:
+                    return True
+                remaining = have_deadline - now
+                return remaining > self.min_cancellation.total_seconds()
+
+            if min_extension is None:
+                min_extension = timeout / 3
+            want_deadline = now + timeout.total_seconds()
+            if have_deadline is not None:
+                extension = want_deadline - have_deadline
+                if extension < min_extension.total_seconds():
+                    return False
+            self._deadlines[sender] = want_deadline
+            return True
+
+    def forget(self, sender: str) -> None:
+        """Forget `sender`'s indicator, for example because publishing
+        an update failed, so the next update is published.
+        """
+        with self._lock:
+            self._deadlines.pop(sender, None)
@@ -0,0 +1,393 @@
+import asyncio
+import json
+
+import pytest
+
+from pika import BasicProperties, PlainCredentials
+from pika.exceptions import (
+    ChannelClosedByBroker,
+    ConnectionClosedByClient,
+    StreamLostError,
+    UnroutableError,
+)
+from pika.spec import Basic
+
+from hive.messaging import MessageBus
+from hive.messaging.aio import AsyncChannel
+
+
+class MockPika:
+    """Just enough of :class:`pika.channel.Channel` for AsyncChannel.
+    """
+    is_open = True
+
+    def __init__(self):
+        self.call_log = []
+        self.on_close_callbacks = []
+        self.on_message_callbacks = []
+        self.on_return_callbacks = []
+        self.on_ack_nack = None
+        self.returns = set()
+
+    def _reply(self, callback, result=None):
+        asyncio.get_running_loop().call_soon(callback, result)
+
+    def add_on_close_callback(self, callback):
+        self.on_close_callbacks.append(callback)
+
+    def close(self, reason=None):
+        self.is_open = False
+        if reason is None:
+            reason = ChannelClosedByBroker(200, "Normal shutdown")
+        for callback in self.on_close_callbacks:
+            asyncio.get_running_loop().call_soon(callback, self, reason)
+
+    def add_on_return_callback(self, callback):
+        self.on_return_callbacks.append(callback)
+
+    def confirm_delivery(self, ack_nack_callback, callback):
+        self.on_ack_nack = ack_nack_callback
+        self.publish_count = 0
+        self._reply(callback)
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+
+        def method(*args, callback=None, **kwargs):
+            self.call_log.append((attr, args, kwargs))
+            if callback:
+                self._reply(callback)
+        return method
+
+    def basic_consume(self, *, queue, on_message_callback, callback):
+        self.call_log.append(("basic_consume", (), {"queue": queue}))
+        self.on_message_callbacks.append(on_message_callback)
+        self._reply(callback)
+        return "ctag1.0"
+
+    def basic_publish(self, **kwargs):
+        self.call_log.append(("basic_publish", (), kwargs))
+        self.publish_count += 1
+        loop = asyncio.get_running_loop()
+        if kwargs["exchange"] in self.returns:
+            method = Basic.Return(
+                exchange=kwargs["exchange"],
+                routing_key=kwargs["routing_key"],
+            )
+            for callback in self.on_return_callbacks:
+                loop.call_soon(
+                    callback,
+                    self,
+                    method,
+                    kwargs["properties"],
+                    kwargs["body"],
+                )
+        frame = type("Frame", (), {
+            "method": Basic.Ack(delivery_tag=self.publish_count),
+        })
+        loop.call_soon(self.on_ack_nack, frame)
+
+    def deliver(self, delivery_tag, body):
+        method = Basic.Deliver(delivery_tag=delivery_tag)
+        props = BasicProperties(content_type="application/json")
+        for callback in self.on_message_callbacks:
+            callback(self, method, props, body)
+
+    def calls(self, *methods):
+        return [call for call in self.call_log if call[0] in methods]
+
+
+async def open_channel(**kwargs):
+    channel = AsyncChannel(MockPika(), **kwargs)
+    await channel._on_open(confirm_delivery=True)
+    return channel
+
+
+def test_publish_event():
+    async def test():
+        channel = await open_channel()
+        await asyncio.gather(*(
+            channel.publish_event(
+                message={"bonjour": n},
+                routing_key="egg.nog",
+            ) for n in range(3)
+        ))
+        return channel._pika
+
+    mock = asyncio.run(test())
+    assert mock.calls("exchange_declare") == [("exchange_declare", (), {
+        "exchange": "hive.egg.nog",
+        "exchange_type": "fanout",
+        "durable": True,
+    })]
+    assert [
+        (kwargs["exchange"], json.loads(kwargs["body"]), kwargs["mandatory"])
+        for _, _, kwargs in mock.calls("basic_publish")
+    ] == [
+        ("hive.egg.nog", {"bonjour": n}, False)
+        for n in range(3)
+    ]
+
+
+def test_publish_unroutable_request():
+    async def test():
+        channel = await open_channel()
+        channel._pika.returns.add("hive.egg.nog")
+        await channel.publish_request(
+            message={"bonjour": "madame"},
+            routing_key="egg.nog",
+        )
+
+    with pytest.raises(UnroutableError):
+        asyncio.run(test())
+
+
+def test_publish_cloudevent():
+    async def test():
+        channel = await open_channel()
+        await channel.publish_event(
+            data={"bonjour": "madame"},
+            routing_key="egg.nogs",
+        )
+        return channel._pika
+
+    mock = asyncio.run(test())
+    [(_, _, kwargs)] = mock.calls("basic_publish")
+    assert kwargs["properties"].content_type == "application/cloudevents+json"
+    event = json.loads(kwargs["body"])
+    assert event["type"] == "net.gbenson.hive.egg_nog"
+    assert event["data"] == {"bonjour": "madame"}
+
+
+def test_consume_events():
+    handled = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def on_message(channel, message):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if message.json()["fail"]:
+            raise ValueError
+        handled.append(message.method.delivery_tag)
+
+    async def test():
+        channel = await open_channel()
+        tag = await channel.consume_events(
+            queue="arr.pirates",
+            on_message_callback=on_message,
+            concurrency=3,
+        )
+        assert tag == "ctag1.0"
+
+        mock = channel._pika
+        for delivery_tag in range(1, 8):
+            fail = delivery_tag == 4
+            mock.deliver(delivery_tag, json.dumps({"fail": fail}).encode())
+        await asyncio.gather(*channel._tasks)
+        return mock
+
+    mock = asyncio.run(test())
+    assert mock.calls("basic_qos") == [("basic_qos", (), {
+        "prefetch_count": 3,
+    })]
+    assert mock.calls("queue_declare") == [(
+        "queue_declare",
+        ("x.pytest.arr.pirates",),
+        {"durable": True},
+    ), (
+        "queue_declare",
+        ("pytest.arr.pirates",),
+        {
+            "durable": True,
+            "arguments": {
+                "x-dead-letter-exchange": "hive.dead.letter",
+            },
+        },
+    )]
+    assert max_in_flight == 3
+    assert sorted(handled) == [1, 2, 3, 5, 6, 7]
+    assert sorted(
+        kwargs["delivery_tag"]
+        for _, _, kwargs in mock.calls("basic_ack")
+    ) == [1, 2, 3, 5, 6, 7]
+    assert mock.calls("basic_reject") == [("basic_reject", (), {
+        "delivery_tag": 4,
+        "requeue": False,
+    })]
+
+
+def test_close_cancels_callbacks():
+    started = asyncio.Event()
+    cancelled = False
+
+    async def on_message(channel, message):
+        nonlocal cancelled
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    async def test():
+        channel = await open_channel()
+        await channel.consume_requests(
+            queue="arr.pirates",
+            on_message_callback=on_message,
+        )
+        channel._pika.deliver(1, b"{}")
+        await started.wait()
+        await asyncio.wait_for(channel.close(), timeout=5)
+        assert not channel._tasks
+        return channel._pika
+
+    mock = asyncio.run(test())
+    assert cancelled
+    assert not mock.calls("basic_ack", "basic_reject")
+
+
+def test_failed_exchange_declaration_is_retried():
+    async def test():
+        channel = await open_channel()
+        declare = channel._declare_hive_exchange
+        failures = [ConnectionResetError()]
+
+        async def declare_hive_exchange(*args):
+            if failures:
+                raise failures.pop()
+            return await declare(*args)
+
+        channel._declare_hive_exchange = declare_hive_exchange
+        with pytest.raises(ConnectionResetError):
+            await channel.publish_event(message={}, routing_key="egg.nog")
+        await channel.publish_event(message={}, routing_key="egg.nog")
+        return channel._pika
+
+    mock = asyncio.run(test())
+    assert len(mock.calls("basic_publish")) == 1
+
+
+class MockAsyncioConnection:
+    """Just enough of :class:`pika.adapters.asyncio_connection.
+    AsyncioConnection` for AsyncConnection.
+    """
+    refuse_channels = False
+    open_channels = True
+
+    def __init__(
+            self,
+            params,
+            *,
+            on_open_callback,
+            on_open_error_callback,
+            on_close_callback,
+            custom_ioloop,
+    ):
+        self.is_open = self.is_closing = self.is_closed = False
+        self.channels = []
+        self._on_close = on_close_callback
+        self._loop = custom_ioloop
+        if params.host == "unreachable":
+            self._loop.call_soon(on_open_error_callback, self, "refused")
+        else:
+            self.is_open = True
+            self._loop.call_soon(on_open_callback, self)
+
+    def channel(self, *, on_open_callback):
+        channel = MockPika()
+        self.channels.append(channel)
+        if self.refuse_channels:
+            reason = ChannelClosedByBroker(403, "ACCESS_REFUSED")
+            self._loop.call_soon(channel.close, reason)
+        elif self.open_channels:
+            self._loop.call_soon(on_open_callback, channel)
+        return channel
+
+    def close(self, reason=None):
+        if reason is None:
+            reason = ConnectionClosedByClient(200, "Normal shutdown")
+        self.is_open = False
+        self.is_closed = True
+        for channel in self.channels:
+            if channel.is_open:
+                channel.close(reason)
+        self._loop.call_soon(self._on_close, self, reason)
+
+
+@pytest.fixture
+def message_bus(monkeypatch):
+    monkeypatch.setattr(
+        "hive.messaging.aio.connection.AsyncioConnection",
+        MockAsyncioConnection,
+    )
+    return MessageBus(host="rabbit", port=5671)
+
+
+def async_connection(message_bus, **kwargs):
+    return message_bus.async_connection(
+        credentials=PlainCredentials("guest", "guest"),
+        **kwargs
+    )
+
+
+def test_async_connection(message_bus):
+    opened_channels = []
+
+    async def test():
+        conn = async_connection(
+            message_bus,
+            on_channel_open=opened_channels.append,
+        )
+        assert not conn.is_open
+        async with conn:
+            assert conn.is_open
+            channel = await conn.channel(name="test")
+            assert channel.is_open
+            assert channel.name == "test"
+        assert not conn.is_open
+        assert not channel.is_open
+        return await conn.wait_closed()
+
+    reason = asyncio.run(test())
+    assert isinstance(reason, ConnectionClosedByClient)
+    assert len(opened_channels) == 1
+
+
+def test_async_connection_open_failure(message_bus):
+    async def test():
+        conn = async_connection(message_bus, host="unreachable")
+        with pytest.raises(ConnectionError):
+            await conn.open()
+        assert not conn.is_open
+        await asyncio.wait_for(conn.close(), timeout=5)
+        return await asyncio.wait_for(conn.wait_closed(), timeout=5)
+
+    assert isinstance(asyncio.run(test()), ConnectionError)
+
+
+def test_channel_open_refused(message_bus):
+    async def test():
+        async with async_connection(message_bus) as conn:
+            conn._pika.refuse_channels = True
+            await asyncio.wait_for(conn.channel(), timeout=5)
+
+    with pytest.raises(ChannelClosedByBroker):
+        asyncio.run(test())
+
+
+def test_channel_open_connection_lost(message_bus):
+    async def test():
+        async with async_connection(message_bus) as conn:
+            conn._pika.open_channels = False
+            opening = asyncio.ensure_future(conn.channel())
+            await asyncio.sleep(0)
+            conn._pika.close(StreamLostError("Transport indicated EOF"))
+            await asyncio.wait_for(opening, timeout=5)
+
+    with pytest.raises(StreamLostError):
+        asyncio.run(test())
@@ -0,0 +1,201 @@
+import pytest
+
+from pika import BasicProperties
+
+from hive.messaging import Channel
+
+
+class MockPika:
+    def __init__(self):
+        self.call_log = []
+        self.connection = MockConnection()
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return self._log(attr)
+
+    def _log(self, attr):
+        def method(*args, **kwargs):
+            self.call_log.append((attr, args, kwargs))
+        return method
+
+    def acks(self):
+        return [
+            (method, kwargs)
+            for method, _, kwargs in self.call_log
+            if method in {"basic_ack", "basic_reject"}
+        ]
+
+
+class MockConnection:
+    def __init__(self):
+        self.timers = {}
+        self._next_timer = 1
+
+    def call_later(self, delay, callback):
+        timer = self._next_timer
+        self._next_timer += 1
+        self.timers[timer] = (delay, callback)
+        return timer
+
+    def remove_timeout(self, timer):
+        del self.timers[timer]
+
+    def fire_timers(self):
+        timers, self.timers = self.timers, {}
+        for _, callback in timers.values():
+            callback()
+
+
+def consume(channel, on_message_callback, **kwargs):
+    channel.consume_requests(
+        queue="arr.pirates",
+        on_message_callback=on_message_callback,
+        **kwargs
+    )
+    consumes = [
+        kwargs
+        for method, _, kwargs in channel._pika.call_log
+        if method == "basic_consume"
+    ]
+    assert len(consumes) == 1
+    callback = consumes[0]["on_message_callback"]
+
+    def deliver(delivery_tag):
+        method = type("method", (), {"delivery_tag": delivery_tag})
+        props = BasicProperties(content_type="application/json")
+        callback(channel._pika, method, props, b"{}")
+
+    return deliver
+
+
+def test_unbatched_acks():
+    mock = MockPika()
+    channel = Channel(_pika=mock)
+    deliver = consume(channel, lambda channel, message: None)
+
+    for delivery_tag in range(1, 4):
+        deliver(delivery_tag)
+
+    assert ("basic_qos", (), {"prefetch_count": 1}) in mock.call_log
+    assert mock.acks() == [
+        ("basic_ack", {"delivery_tag": 1}),
+        ("basic_ack", {"delivery_tag": 2}),
+        ("basic_ack", {"delivery_tag": 3}),
+    ]
+    assert not mock.connection.timers
+
+
+def test_batched_acks():
+    mock = MockPika()
+    channel = Channel(_pika=mock)
+    deliver = consume(
+        channel,
+        lambda channel, message: None,
+        prefetch_count=10,
+        ack_batch_size=4,
+    )
+
+    for delivery_tag in range(1, 10):
+        deliver(delivery_tag)
+
+    assert ("basic_qos", (), {"prefetch_count": 10}) in mock.call_log
+    assert mock.acks() == [
+        ("basic_ack", {"delivery_tag": 4, "multiple": True}),
+        ("basic_ack", {"delivery_tag": 8, "multiple": True}),
+    ]
+    assert len(mock.connection.timers) == 1
+
+    mock.connection.fire_timers()
+    assert mock.acks()[2:] == [
+        ("basic_ack", {"delivery_tag": 9}),
+    ]
+    assert not mock.connection.timers
+
+
+def test_batched_acks_with_rejections():
+    def on_message_callback(channel, message):
+        if message.method.delivery_tag in {2, 3}:
+            raise ValueError
+
+    mock = MockPika()
+    channel = Channel(_pika=mock)
+    deliver = consume(
+        channel,
+        on_message_callback,
+        prefetch_count=10,
+        ack_batch_size=3,
+    )
+
+    for delivery_tag in range(1, 6):
+        deliver(delivery_tag)
+
+    assert mock.acks() == [
+        ("basic_reject", {"delivery_tag": 2, "requeue": False}),
+        ("basic_reject", {"delivery_tag": 3, "requeue": False}),
+        ("basic_ack", {"delivery_tag": 5, "multiple": True}),
+    ]
+    assert not mock.connection.timers
+
+
+def test_ack_batch_size_exceeds_prefetch_count():
+    channel = Channel(_pika=MockPika())
+    with pytest.raises(ValueError):
+        consume(
+            channel,
+            lambda channel, message: None,
+            prefetch_count=4,
+            ack_batch_size=5,
+        )
+
+
+def test_mismatched_ack_batch_sizes():
+    mock = MockPika()
+    channel = Channel(_pika=mock)
+    consume(
+        channel,
+        lambda channel, message: None,
+        prefetch_count=4,
+        ack_batch_size=4,
+    )
+    with pytest.raises(ValueError):
+        channel.consume_requests(
+            queue="egg.nog",
+            on_message_callback=lambda channel, message: None,
+            prefetch_count=4,
+            ack_batch_size=2,
+        )
+
+
+def test_unlimited_prefetch_count():
+    mock = MockPika()
+    channel = Channel(_pika=mock)
+    consume(
+        channel,
+        lambda channel, message: None,
+        prefetch_count=0,
+        ack_batch_size=100,
+    )
+    assert ("basic_qos", (), {"prefetch_count": 0}) in mock.call_log
+
+
+def test_start_consuming_flushes_acks():
+    mock = MockPika()
+    channel = Channel(_pika=mock)
+    deliver = consume(
+        channel,
+        lambda channel, message: None,
+        prefetch_count=10,
+        ack_batch_size=4,
+    )
+
+    for delivery_tag in range(1, 4):
+        deliver(delivery_tag)
+    assert not mock.acks()
+
+    channel.start_consuming()
+    assert mock.acks() == [
+        ("basic_ack", {"delivery_tag": 3, "multiple": True}),
+    ]
+    assert not mock.connection.timers
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from hive.messaging.benchmark import BENCHMARKS, Benchmarks, main
+from hive.messaging.memory import InMemoryMessageBus
+
+
+@pytest.fixture
+def benchmarks():
+    return Benchmarks(
+        InMemoryMessageBus(),
+        count=20,
+        prefetch_counts=(1, 5),
+        timeout=10,
+    )
+
+
+def test_benchmarks(benchmarks):
+    results = benchmarks.run()
+    assert list(results) == list(BENCHMARKS)
+    json.dumps(results)
+
+    assert results["publish"]["confirmed"]["messages"] == 20
+    assert results["handoff"]["publisher_connection_async"]["messages"] == 20
+    assert results["latency"]["messages"] == 20
+    assert 0 < results["latency"]["p50_seconds"] <= (
+        results["latency"]["max_seconds"])
+    assert set(results["encapsulation"]) == {"dict", "bytes", "cloudevent"}
+    assert {
+        prefetch_count: result["messages"]
+        for prefetch_count, result in results["prefetch"].items()
+    } == {"1": 20, "5": 20}
+
+
+def test_main(tmp_path):
+    output = tmp_path / "results.json"
+    main([
+        "--broker", "memory",
+        "--count", "10",
+        "--output", str(output),
+        "publish",
+        "encapsulation",
+    ])
+    report = json.loads(output.read_text())
+    assert report["broker"] == "memory"
+    assert report["count"] == 10
+    assert list(report["results"]) == ["publish", "encapsulation"]
+
+
+def test_unknown_benchmark():
+    with pytest.raises(SystemExit):
+        main(["--broker", "memory", "nonesuch"])
@@ -10,7 +10,7 @@ from cloudevents.pydantic import CloudEvent
 from pika import BasicProperties, DeliveryMode
 
 from hive.common import parse_datetime, parse_uuid
-from hive.messaging import Channel, Message
+from hive.messaging import Channel, Message, Priority
 
 
 class MockPika:
@@ -278,6 +278,8 @@ def test_publish_with_expiration():
     assert 0 < int(expiration) < 1000
 
     got_properties.expiration = None
+    assert list(got_properties.headers) == ["hive-consume-by"]
+    got_properties.headers = None
     assert mock.exchange_declare.call_log == [((), {
         "exchange": "hive.egg.nog",
         "exchange_type": "fanout",
@@ -617,6 +619,7 @@ def test_tell_user():
         "properties": BasicProperties(
             content_type="application/cloudevents+json",
             delivery_mode=DeliveryMode.Persistent,
+            priority=Priority.INTERACTIVE,
         ),
         "mandatory": True,
     })]
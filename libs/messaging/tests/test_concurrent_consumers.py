@@ -0,0 +1,212 @@
+import json
+import logging
+import threading
+
+from concurrent.futures import wait
+from queue import Empty, SimpleQueue
+
+import pytest
+
+from pika import BasicProperties
+from pika.exceptions import ChannelWrongStateError
+
+from hive.common.units import SECOND
+from hive.messaging import Channel
+
+
+class MockPika:
+    def __init__(self):
+        self.call_log = []
+        self.connection = MockConnection()
+        self.io_thread = threading.current_thread()
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+
+        def method(*args, **kwargs):
+            assert threading.current_thread() is self.io_thread
+            self.call_log.append((attr, args, kwargs))
+        return method
+
+    def calls(self, *methods):
+        return [call for call in self.call_log if call[0] in methods]
+
+
+class MockConnection:
+    is_open = True
+
+    def __init__(self):
+        self.callbacks = SimpleQueue()
+
+    def add_callback_threadsafe(self, callback):
+        self.callbacks.put(callback)
+
+    def process_data_events(self, count=None, *, time_limit=None):
+        if time_limit is not None:
+            try:
+                self.callbacks.get(timeout=time_limit)()
+            except Empty:
+                pass
+            return
+        for _ in range(count):
+            self.callbacks.get(timeout=5)()
+        with pytest.raises(Empty):
+            self.callbacks.get_nowait()
+
+
+def consume(channel, on_message_callback, **kwargs):
+    channel.consume_requests(
+        queue="arr.pirates",
+        on_message_callback=on_message_callback,
+        **kwargs
+    )
+    [(_, _, kwargs)] = channel._pika.calls("basic_consume")
+    callback = kwargs["on_message_callback"]
+
+    def deliver(delivery_tag, body):
+        method = type("method", (), {"delivery_tag": delivery_tag})
+        props = BasicProperties(content_type="application/json")
+        callback(channel._pika, method, props, json.dumps(body).encode())
+
+    return deliver
+
+
+def test_concurrent_consumer():
+    concurrency = 4
+    barrier = threading.Barrier(concurrency, timeout=5)
+    worker_threads = set()
+
+    def on_message_callback(channel, message):
+        worker_threads.add(threading.current_thread())
+        barrier.wait()  # Deadlocks unless callbacks run concurrently.
+        if message.json()["fail"]:
+            raise ValueError
+
+    mock = MockPika()
+    channel = Channel(_pika=mock)
+    deliver = consume(
+        channel,
+        on_message_callback,
+        concurrency=concurrency,
+    )
+    assert mock.calls("basic_qos") == [("basic_qos", (), {
+        "prefetch_count": concurrency,
+    })]
+
+    for delivery_tag in range(1, concurrency + 1):
+        deliver(delivery_tag, {"fail": delivery_tag == 2})
+    mock.connection.process_data_events(concurrency)
+
+    assert len(worker_threads) == concurrency
+    assert mock.io_thread not in worker_threads
+    assert sorted(
+        kwargs["delivery_tag"]
+        for _, _, kwargs in mock.calls("basic_ack")
+    ) == [1, 3, 4]
+    assert mock.calls("basic_reject") == [("basic_reject", (), {
+        "delivery_tag": 2,
+        "requeue": False,
+    })]
+
+
+def test_concurrent_consumer_publishes_on_io_thread():
+    def on_message_callback(channel, message):
+        channel.publish_event(message=message.json(), routing_key="egg.nog")
+
+    mock = MockPika()
+    channel = Channel(_pika=mock)
+    deliver = consume(channel, on_message_callback, concurrency=2)
+
+    deliver(1, {"hello": "world"})
+    mock.connection.process_data_events(2)  # publish, then ack
+
+    assert [
+        (method, kwargs.get("body"), kwargs.get("delivery_tag"))
+        for method, _, kwargs in mock.calls("basic_publish", "basic_ack")
+    ] == [
+        ("basic_publish", b'{"hello": "world"}', None),
+        ("basic_ack", None, 1),
+    ]
+
+
+def test_concurrent_consumer_rejects_batched_acks():
+    channel = Channel(_pika=MockPika())
+    with pytest.raises(ValueError):
+        consume(
+            channel,
+            lambda channel, message: None,
+            concurrency=2,
+            ack_batch_size=2,
+        )
+
+
+def test_start_consuming_drains_workers():
+    started = threading.Event()
+    release = threading.Event()
+
+    def on_message_callback(channel, message):
+        started.set()
+        release.wait(timeout=5)
+        channel.publish_event(message=message.json(), routing_key="egg.nog")
+
+    mock = MockPika()
+    channel = Channel(_pika=mock)
+    deliver = consume(channel, on_message_callback, concurrency=2)
+
+    deliver(1, {"hello": "world"})
+    assert started.wait(timeout=5)
+    threading.Timer(0.1, release.set).start()
+    channel.start_consuming()
+
+    assert not channel._workers
+    assert [
+        method for method, _, _ in mock.calls("basic_publish", "basic_ack")
+    ] == ["basic_publish", "basic_ack"]
+
+
+def test_start_consuming_abandons_slow_workers(caplog):
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def on_message_callback(channel, message):
+        started.set()
+        release.wait(timeout=5)
+        try:
+            channel.publish_event(message={}, routing_key="egg.nog")
+        except Exception as e:
+            errors.append(e)
+            raise
+
+    mock = MockPika()
+    channel = Channel(_pika=mock)
+    deliver = consume(channel, on_message_callback, concurrency=2)
+
+    deliver(1, {})
+    assert started.wait(timeout=5)
+    workers = set(channel._workers)
+    with caplog.at_level(logging.WARNING):
+        channel.start_consuming(drain_timeout=0.1 * SECOND)
+        release.set()
+        done, not_done = wait(workers, timeout=5)
+
+    assert not not_done
+    assert [type(e) for e in errors] == [ChannelWrongStateError]
+    assert not mock.calls("basic_publish", "basic_ack", "basic_reject")
+    assert "Abandoning 1 in-flight callbacks" in caplog.text
+    assert "Failed to settle message 1" in caplog.text
+
+
+def test_redelivers_while_draining():
+    mock = MockPika()
+    channel = Channel(_pika=mock)
+    deliver = consume(channel, lambda channel, message: None, concurrency=2)
+
+    channel._draining = True
+    deliver(1, {})
+
+    assert not channel._workers
+    assert mock.calls("basic_reject") == [
+        ("basic_reject", (1,), {"requeue": True}),
+    ]
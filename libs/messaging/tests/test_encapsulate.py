@@ -1,9 +1,14 @@
 import json
 
+from datetime import datetime, timezone
 from typing import Any
 
+import pytest
+
+from cloudevents.conversion import to_json
 from pydantic import BaseModel, ConfigDict
 
+from hive.common import parse_uuid, utc_now
 from hive.messaging import Channel
 
 
@@ -33,3 +38,50 @@ def test_encapsulate_pydantic() -> None:
     e = encapsulate(data=Data(hello="world"), routing_key="e.ps")
     assert e.content_type == "application/cloudevents+json"
     assert json.loads(e.payload)["data"] == {"hello": "world"}
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    ({},
+     {"data": {"hello": "wörld", "n": [1, 2.5, None]}},
+     {"data": []},
+     {"subject": "m.room.message", "data": "hello"},
+     {"datacontenttype": "application/json", "dataschema": "https://x/y"},
+     {"source": "https://example.com", "type": "com.example.event"},
+     {"time": datetime(2025, 3, 20, 8, 57, 44, tzinfo=timezone.utc)},
+     {"time": datetime(2025, 3, 20, 8, 57, 44)},
+     ))
+def test_serialize_event(kwargs: dict[str, Any]) -> None:
+    kwargs = {"id": "1234", "time": utc_now(), **kwargs}
+    expect = to_json(Channel._encapsulate_new("egg.nogs", **kwargs))
+    assert Channel._serialize_event("egg.nogs", **kwargs) == expect
+
+
+def test_serialize_event_default_id() -> None:
+    e1, e2 = (json.loads(encapsulate(routing_key="e.ds").payload)
+              for _ in range(2))
+    assert e1["id"] != e2["id"]
+    assert parse_uuid(e1["id"])
+
+
+def test_serialize_pydantic_event() -> None:
+    class Data(BaseModel):
+        hello: str
+        when: datetime
+
+    data = Data(hello="wörld", when=utc_now())
+    payload = Channel._serialize_event("e.ps", data=data)
+    assert payload is not None
+    assert json.loads(payload)["data"] == json.loads(data.model_dump_json())
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    ({"data": b"\x00"},
+     {"data": {"when": utc_now()}},
+     {"id": 1234},
+     {"time": "2025-03-20T08:57:44Z"},
+     {"extension": "value"},
+     ))
+def test_serialize_event_declines(kwargs: dict[str, Any]) -> None:
+    assert Channel._serialize_event("egg.nogs", **kwargs) is None
@@ -0,0 +1,69 @@
+"""Per-publish CPU cost of CloudEvent encapsulation.
+
+Run directly to print timings::
+
+   python tests/test_encapsulate_benchmark.py
+"""
+import json
+
+from timeit import Timer
+from typing import Any
+
+from cloudevents.conversion import to_json
+from pydantic import BaseModel
+
+from hive.messaging import Channel
+
+
+class Interaction(BaseModel):
+    model: str
+    prompt: str
+    chunks: list[str]
+
+
+def event_kwargs() -> list[dict[str, Any]]:
+    return [
+        {"data": {"sender": "hive", "text": "hello", "html": ""}},
+        {"data": Interaction(
+            model="llama3.2",
+            prompt="Why is the sky blue?",
+            chunks=["Rayleigh scattering. "] * 50,
+        )},
+        {"subject": "m.room.message", "data": {"body": "hi"}},
+    ]
+
+
+def before(**kwargs: Any) -> bytes:
+    """The original path, with its JSON round trip for models.
+    """
+    if isinstance((data := kwargs.get("data")), BaseModel):
+        kwargs["data"] = json.loads(data.model_dump_json())
+    event = Channel._encapsulate_new("llm.interactions", **kwargs)
+    return to_json(event)
+
+
+def after(**kwargs: Any) -> bytes:
+    return Channel._encapsulate("llm.interactions", **kwargs)[0]
+
+
+def per_publish_seconds(func: Any, number: int = 200) -> float:
+    """Return the best average time per call over a few repeats.
+    """
+    def publish_all() -> None:
+        for kwargs in event_kwargs():
+            func(**kwargs)
+
+    n = number * len(event_kwargs())
+    return min(Timer(publish_all).repeat(repeat=3, number=number)) / n
+
+
+def test_fast_path_is_faster() -> None:
+    assert per_publish_seconds(after) < per_publish_seconds(before)
+
+
+if __name__ == "__main__":
+    t_before = per_publish_seconds(before, 2000)
+    t_after = per_publish_seconds(after, 2000)
+    print(f"before: {t_before * 1e6:7.1f} µs/publish")
+    print(f" after: {t_after * 1e6:7.1f} µs/publish")
+    print(f"speedup: {t_before / t_after:.1f}x")
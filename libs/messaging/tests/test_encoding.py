@@ -0,0 +1,141 @@
+from typing import Any, Optional
+
+import pytest
+
+from pika.spec import Basic, BasicProperties
+from pydantic import BaseModel
+
+from hive.messaging import Channel, Message
+from hive.messaging.encoding import compress, decompress
+
+
+class Page(BaseModel):
+    url: str
+    html: str
+
+
+DATA = {"url": "https://example.com/", "html": "<p>hello</p>" * 100}
+
+
+def _require_extras(
+        content_type: Optional[str],
+        content_encoding: Optional[str],
+) -> None:
+    if content_type == "application/msgpack":
+        pytest.importorskip("msgpack")
+    elif content_type == "application/cbor":
+        pytest.importorskip("cbor2")
+    if content_encoding == "zstd":
+        pytest.importorskip("zstandard")
+
+
+def _roundtrip(**kwargs: Any) -> Message:
+    body, properties = Channel._prepare("llm.interactions", **kwargs)
+    return Message(
+        Basic.Deliver(),
+        Channel._basic_properties(**properties),
+        body,
+    )
+
+
+@pytest.mark.parametrize("content_encoding", (None, "gzip", "zstd"))
+def test_structured_event(content_encoding: str) -> None:
+    _require_extras(None, content_encoding)
+    message = _roundtrip(data=DATA, content_encoding=content_encoding)
+    assert message.content_type == "application/cloudevents+json"
+    assert message.content_encoding == content_encoding
+    assert message.event().data == DATA
+    assert message.lazy_event().data == DATA
+
+
+@pytest.mark.parametrize("content_encoding", (None, "gzip", "zstd"))
+@pytest.mark.parametrize("datacontenttype", (
+    None,
+    "application/json",
+    "application/msgpack",
+    "application/cbor",
+))
+def test_binary_event(
+        datacontenttype: str,
+        content_encoding: str,
+) -> None:
+    _require_extras(datacontenttype, content_encoding)
+    kwargs = {"datacontenttype": datacontenttype} if datacontenttype else {}
+    message = _roundtrip(
+        data=Page(**DATA),
+        subject="https://example.com/",
+        binary=True,
+        content_encoding=content_encoding,
+        **kwargs
+    )
+    assert message.content_type == (datacontenttype or "application/json")
+    assert message.is_binary_cloudevent
+    assert message.is_cloudevent
+    assert message.json() == DATA
+
+    event = message.event()
+    assert event.type == "net.gbenson.hive.llm_interaction"
+    assert event.subject == "https://example.com/"
+    assert event.datacontenttype == message.content_type
+    assert event.data == DATA
+
+    lazy = message.lazy_event()
+    assert lazy.type == event.type
+    assert lazy.id == event.id
+    assert lazy.time == event.time
+    assert lazy.data == DATA
+
+
+def test_binary_bytes_event() -> None:
+    message = _roundtrip(data=b"\x00\x01", binary=True)
+    assert message.content_type == "application/octet-stream"
+    assert message.event().data == b"\x00\x01"
+
+
+def test_binary_event_without_data() -> None:
+    message = _roundtrip(binary=True)
+    assert message.body == b""
+    assert message.event().data is None
+
+
+def test_binary_event_unknown_datacontenttype() -> None:
+    with pytest.raises(ValueError):
+        _roundtrip(data=DATA, datacontenttype="text/plain", binary=True)
+
+
+def test_msgpack_message() -> None:
+    pytest.importorskip("msgpack")
+    message = _roundtrip(message=DATA, content_type="application/msgpack")
+    assert message.content_type == "application/msgpack"
+    assert not message.is_json
+    assert message.json() == DATA
+    assert len(message.body) < len(Channel._encapsulate_old(DATA, None)[0])
+
+
+def test_compressed_message_is_smaller() -> None:
+    pytest.importorskip("zstandard")
+    message = _roundtrip(message=DATA, content_encoding="zstd")
+    assert len(message.body) < len(message.payload) // 10
+    assert message.json() == DATA
+
+
+def test_unknown_content_encoding() -> None:
+    with pytest.raises(NotImplementedError):
+        compress(b"", "br")
+    with pytest.raises(NotImplementedError):
+        decompress(b"", "br")
+
+
+def test_identity_encoding() -> None:
+    assert compress(b"hello", "identity") == b"hello"
+    assert decompress(b"hello", None) == b"hello"
+
+
+def test_non_binary_headers() -> None:
+    properties = BasicProperties(
+        content_type="application/json",
+        headers={"x-death": []},
+    )
+    message = Message(Basic.Deliver(), properties, b"{}")
+    assert not message.is_binary_cloudevent
+    assert not message.is_cloudevent
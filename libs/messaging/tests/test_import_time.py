@@ -0,0 +1,8 @@
+from hive.common.testing import assert_imports_within_budget
+
+
+def test_import_hive_messaging():
+    assert_imports_within_budget(
+        "hive.messaging",
+        forbidden=("cloudevents", "contenttype", "pika", "pydantic"),
+    )
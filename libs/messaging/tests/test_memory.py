@@ -0,0 +1,211 @@
+import pytest
+
+from pika import BasicProperties
+from pika.exceptions import ChannelClosedByBroker, ConnectionClosedByBroker
+
+from hive.messaging import UnroutableError
+from hive.messaging.memory import InMemoryMessageBus, _topic_matches
+
+
+@pytest.fixture
+def bus():
+    return InMemoryMessageBus()
+
+
+@pytest.fixture
+def pika_channel(bus):
+    return bus.broker.connect().channel()
+
+
+def declare(pika_channel, queue, exchange, exchange_type="fanout", **kwargs):
+    pika_channel.exchange_declare(exchange, exchange_type)
+    pika_channel.queue_declare(queue, **kwargs)
+    pika_channel.queue_bind(queue, exchange)
+
+
+def test_request_round_trip(bus):
+    received = []
+
+    def on_message_callback(channel, message):
+        received.append(message.json())
+        channel._pika.stop_consuming()
+
+    with bus.blocking_connection() as conn:
+        channel = conn.channel()
+        channel.consume_requests(
+            queue="egg.nog",
+            on_message_callback=on_message_callback,
+        )
+        channel.publish_request(
+            message={"hello": "world"},
+            routing_key="egg.nog",
+        )
+        channel.start_consuming()
+
+    assert received == [{"hello": "world"}]
+    assert bus.broker.message_count("egg.nog") == 0
+
+
+def test_events_fan_out(bus):
+    received = []
+    with bus.blocking_connection() as conn:
+        for name in ("left", "right"):
+            conn.channel(name=name).consume_events(
+                queue="egg.nog",
+                on_message_callback=lambda channel, message: received.append(
+                    (channel.name, message.event().data),
+                ),
+            )
+        conn.channel().publish_event(
+            routing_key="egg.nog",
+            data={"n": 1},
+        )
+        conn._pika.process_data_events()
+    assert sorted(received) == [("left", {"n": 1}), ("right", {"n": 1})]
+
+
+def test_unroutable_request(bus):
+    with bus.blocking_connection() as conn:
+        with pytest.raises(UnroutableError):
+            conn.channel().publish_request(
+                message={},
+                routing_key="egg.nog",
+            )
+
+
+def test_publisher_connection(bus, pika_channel):
+    declare(pika_channel, "egg.nog", "hive.egg.nog")
+    with bus.publisher_connection() as conn:
+        conn.channel().publish_many([
+            {"routing_key": "egg.nog", "data": {"n": n}}
+            for n in range(10)
+        ])
+    assert bus.broker.message_count("egg.nog") == 10
+
+
+@pytest.mark.parametrize("binding_key,routing_key,expect_match", (
+    ("egg.nog", "egg.nog", True),
+    ("egg.nog", "egg.nogs", False),
+    ("egg.*", "egg.nog", True),
+    ("egg.*", "egg", False),
+    ("egg.*", "egg.nog.x", False),
+    ("egg.#", "egg", True),
+    ("egg.#", "egg.nog.x", True),
+    ("#.nog", "nog", True),
+    ("#.nog", "egg.x.nog", True),
+    ("#", "", True),
+    ("*.#.x", "egg.x", True),
+    ("*.#.x", "x", False),
+))
+def test_topic_matches(binding_key, routing_key, expect_match):
+    assert _topic_matches(binding_key, routing_key) == expect_match
+
+
+def test_topic_routing(bus, pika_channel):
+    declare(pika_channel, "eggs", "hive.food", "topic")
+    pika_channel.queue_bind("eggs", "hive.food", "egg.#")
+    for routing_key in ("egg.nog", "spam.spam", "egg"):
+        pika_channel.basic_publish("hive.food", routing_key, b"")
+    assert bus.broker.message_count("eggs") == 2
+
+
+def test_prefetch(pika_channel):
+    declare(pika_channel, "egg.nog", "hive.egg.nog")
+    for n in range(5):
+        pika_channel.basic_publish("hive.egg.nog", "", str(n).encode())
+
+    delivered = []
+    pika_channel.basic_qos(prefetch_count=2)
+    pika_channel.basic_consume(
+        "egg.nog",
+        lambda channel, method, properties, body: delivered.append(
+            (method.delivery_tag, body),
+        ),
+    )
+    pika_channel.connection.process_data_events()
+    assert delivered == [(1, b"0"), (2, b"1")]
+
+    pika_channel.basic_ack(2)
+    pika_channel.connection.process_data_events()
+    assert delivered[2:] == [(3, b"2")]
+
+    pika_channel.basic_ack(3, multiple=True)
+    pika_channel.connection.process_data_events()
+    assert delivered[3:] == [(4, b"3"), (5, b"4")]
+
+
+@pytest.mark.parametrize("reject", (False, True))
+def test_dead_lettering(bus, pika_channel, reject):
+    pika_channel.exchange_declare("hive.dead.letter", "direct")
+    pika_channel.queue_declare("x.egg.nog")
+    pika_channel.queue_bind("x.egg.nog", "hive.dead.letter", "egg.nog")
+    declare(pika_channel, "egg.nog", "hive.egg.nog", arguments={
+        "x-dead-letter-exchange": "hive.dead.letter",
+        "x-dead-letter-routing-key": "egg.nog",
+    })
+
+    properties = BasicProperties(expiration=None if reject else "0")
+    pika_channel.basic_publish("hive.egg.nog", "", b"hello", properties)
+    if reject:
+        pika_channel.basic_consume(
+            "egg.nog",
+            lambda channel, method, *args: channel.basic_reject(
+                method.delivery_tag,
+                requeue=False,
+            ),
+        )
+        pika_channel.connection.process_data_events()
+
+    assert bus.broker.message_count("egg.nog") == 0
+    [(properties, body)] = bus.broker.queued("x.egg.nog")
+    assert body == b"hello"
+    assert properties.expiration is None
+    [death] = properties.headers["x-death"]
+    assert death["queue"] == "egg.nog"
+    assert death["reason"] == ("rejected" if reject else "expired")
+
+
+def test_expired_messages_without_dead_letter_exchange_are_dropped(
+        bus,
+        pika_channel,
+):
+    declare(pika_channel, "egg.nog", "hive.egg.nog", arguments={
+        "x-message-ttl": 0,
+    })
+    pika_channel.basic_publish("hive.egg.nog", "", b"hello")
+    assert bus.broker.message_count("egg.nog") == 0
+
+
+def test_close_requeues_unacked(bus):
+    pika_channel = bus.broker.connect().channel()
+    declare(pika_channel, "egg.nog", "hive.egg.nog")
+    pika_channel.basic_publish("hive.egg.nog", "", b"hello")
+    pika_channel.basic_consume("egg.nog", lambda *args: None)
+    assert bus.broker.message_count("egg.nog") == 0
+
+    pika_channel.connection.close()
+    assert bus.broker.message_count("egg.nog") == 1
+
+    delivered = []
+    pika_channel = bus.broker.connect().channel()
+    pika_channel.basic_consume(
+        "egg.nog",
+        lambda channel, method, *args: delivered.append(method.redelivered),
+    )
+    pika_channel.connection.process_data_events()
+    assert delivered == [True]
+
+
+def test_restart(bus):
+    pika_channel = bus.broker.connect().channel()
+    declare(pika_channel, "egg.nog", "hive.egg.nog")
+    declare(pika_channel, "spam", "hive.spam", exclusive=True)
+    pika_channel.basic_publish("hive.egg.nog", "", b"hello")
+    pika_channel.basic_consume("egg.nog", lambda *args: None)
+
+    bus.broker.restart()
+    with pytest.raises(ConnectionClosedByBroker):
+        pika_channel.connection.process_data_events()
+    assert bus.broker.message_count("egg.nog") == 1
+    with pytest.raises(ChannelClosedByBroker):
+        bus.broker.message_count("spam")
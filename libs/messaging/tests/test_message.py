@@ -1,11 +1,14 @@
 from datetime import datetime, timezone
+from unittest.mock import patch
 
 import pytest
 
 from cloudevents.abstract import CloudEvent
+from contenttype import ContentType
 from pika.spec import Basic, BasicProperties
 
 from hive.messaging import Message
+from hive.messaging.message import _content_type_info
 
 
 class TestJSONCloudEventMessage:
@@ -61,6 +64,22 @@ class TestJSONCloudEventMessage:
             "messages": ["Service restarted"],
         }
 
+    def test_lazy_event(self, message: Message) -> None:
+        e = message.lazy_event()
+        assert e.id == "3a4a9760-c52d-495b-93a1-adf2acc7cdb0"
+        assert e.type == "net.gbenson.hive.service_condition_report"
+        assert e.subject is None
+        assert e.time == datetime(
+            2025, 3, 20, 8, 57, 44, 512454,
+            tzinfo=timezone.utc,
+        )
+        assert "_event" not in e.__dict__  # not validated yet
+        assert e.data == {
+            "condition": "healthy",
+            "messages": ["Service restarted"],
+        }
+        assert e.event() == message.event()
+
 
 class TestNonCloudEventJSONMessage:
     """An old-style (non-CloudEvent) JSON-encoded message.
@@ -100,6 +119,24 @@ class TestNonCloudEventJSONMessage:
             _ = message.event()
         assert repr(excinfo.value) == "ValueError('application/json')"
 
+    def test_lazy_event(self, message: Message) -> None:
+        with pytest.raises(ValueError):
+            _ = message.lazy_event()
+
+
+def test_content_types_are_parsed_once() -> None:
+    _content_type_info.cache_clear()
+    with patch.object(
+            ContentType,
+            "parse",
+            wraps=ContentType.parse,
+    ) as parse:
+        for _ in range(3):
+            message = _build_test_message("application/cloudevents+json", b"")
+            assert message.is_json
+            assert message.is_cloudevent
+    assert parse.call_count == 1
+
 
 def _build_test_message(content_type: str, message_body: bytes) -> Message:
     props = BasicProperties(content_type=content_type)
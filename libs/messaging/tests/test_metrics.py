@@ -0,0 +1,185 @@
+from datetime import timedelta
+from urllib.request import urlopen
+
+import pytest
+
+from pika import BasicProperties
+from pika.exceptions import NackError
+
+from hive.common import utc_now
+from hive.common.socketserver import serving
+from hive.messaging import Channel, metrics
+from hive.messaging.confirms import PendingPublish
+from hive.messaging.metrics import Hook, Registry
+
+
+class MockPika:
+    def __init__(self):
+        self.call_log = []
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+
+        def method(*args, **kwargs):
+            self.call_log.append((attr, args, kwargs))
+        return method
+
+
+class RecordingHook(Hook):
+    def __init__(self):
+        self.calls = []
+
+    def message_handled(self, queue, **kwargs):
+        self.calls.append(("message_handled", queue, kwargs))
+
+    def publish_confirmed(self, exchange, **kwargs):
+        self.calls.append(("publish_confirmed", exchange, kwargs))
+
+
+@pytest.fixture
+def hook():
+    hook = RecordingHook()
+    metrics.add_hook(hook)
+    try:
+        yield hook
+    finally:
+        metrics.remove_hook(hook)
+
+
+def consume(channel, on_message_callback):
+    channel.consume_requests(
+        queue="arr.pirates",
+        on_message_callback=on_message_callback,
+    )
+    callback = [
+        kwargs["on_message_callback"]
+        for method, _, kwargs in channel._pika.call_log
+        if method == "basic_consume"
+    ][0]
+
+    def deliver(delivery_tag, body=b"{}", **kwargs):
+        method = type("method", (), {"delivery_tag": delivery_tag})
+        props = BasicProperties(**kwargs)
+        callback(channel._pika, method, props, body)
+
+    return deliver
+
+
+def test_message_handled(hook):
+    def on_message_callback(channel, message):
+        if message.json():
+            raise ValueError
+
+    deliver = consume(Channel(_pika=MockPika()), on_message_callback)
+    deliver(1, content_type="application/json")
+    deliver(2, b'{"x": 1}', content_type="application/json")
+
+    assert [(queue, kwargs["outcome"], kwargs["wait_seconds"])
+            for _, queue, kwargs in hook.calls] == [
+        ("arr.pirates", "ack", None),
+        ("arr.pirates", "reject", None),
+    ]
+    assert all(kwargs["handler_seconds"] >= 0 for _, _, kwargs in hook.calls)
+
+
+@pytest.mark.parametrize("binary", (False, True))
+def test_wait_seconds(hook, binary):
+    body, properties = Channel._prepare(
+        "arr.pirates",
+        time=utc_now() - timedelta(seconds=5),
+        data={"hello": "world"},
+        binary=binary,
+    )
+    deliver = consume(Channel(_pika=MockPika()), lambda *args: None)
+    deliver(1, body, **properties)
+
+    [(_, _, kwargs)] = hook.calls
+    assert 5 <= kwargs["wait_seconds"] < 10
+
+
+@pytest.mark.parametrize("exception,outcome", (
+    (None, "ack"),
+    (NackError([]), "nack"),
+    (RuntimeError(), "failed"),
+))
+def test_publish_confirmed(hook, exception, outcome):
+    future = type("future", (), {
+        "done": lambda self: True,
+    })()
+    PendingPublish(future, "hive.arr", "", b"").settle(exception)
+    [(method, exchange, kwargs)] = hook.calls
+    assert method == "publish_confirmed"
+    assert exchange == "hive.arr"
+    assert kwargs["outcome"] == outcome
+
+
+def test_failing_hook_is_ignored(hook):
+    class FailingHook(Hook):
+        def message_handled(self, *args, **kwargs):
+            raise RuntimeError
+
+    failing = FailingHook()
+    metrics.add_hook(failing)
+    try:
+        deliver = consume(Channel(_pika=MockPika()), lambda *args: None)
+        deliver(1)
+    finally:
+        metrics.remove_hook(failing)
+    assert len(hook.calls) == 1
+
+
+def test_registry():
+    registry = Registry()
+    for seconds in (0.003, 0.2, 1000):
+        registry.message_handled(
+            "arr.pirates",
+            outcome="ack",
+            handler_seconds=seconds,
+            wait_seconds=None,
+        )
+    registry.publish_confirmed("hive.arr", outcome="nack", seconds=0.01)
+
+    assert registry.counter(
+        "hive_messages_handled_total",
+        queue="arr.pirates",
+        outcome="ack",
+    ) == 3
+    histogram = registry.histogram(
+        "hive_message_handler_seconds",
+        queue="arr.pirates",
+    )
+    assert histogram.count == 3
+    assert sum(histogram.counts) == 2  # 1000 is only in +Inf
+    assert registry.histogram(
+        "hive_message_wait_seconds",
+        queue="arr.pirates",
+    ) is None
+
+    text = registry.render()
+    assert "# TYPE hive_messages_handled_total counter\n" in text
+    assert ("hive_messages_handled_total"
+            '{outcome="ack",queue="arr.pirates"} 3\n') in text
+    assert "# TYPE hive_message_handler_seconds histogram\n" in text
+    assert ('hive_message_handler_seconds_bucket{queue="arr.pirates",'
+            'le="0.005"} 1\n') in text
+    assert ('hive_message_handler_seconds_bucket{queue="arr.pirates",'
+            'le="+Inf"} 3\n') in text
+    assert ("hive_message_handler_seconds_count"
+            '{queue="arr.pirates"} 3\n') in text
+    assert ('hive_publishes_confirmed_total{exchange="hive.arr",'
+            'outcome="nack"} 1\n') in text
+
+    registry.clear()
+    assert registry.render() == ""
+
+
+def test_server():
+    registry = Registry()
+    registry.publish_confirmed("hive.arr", outcome="ack", seconds=0.01)
+    server = metrics.make_server(0, "127.0.0.1", registry)
+    port = server.server_address[1]
+    with serving(server):
+        with urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.status == 200
+            assert response.read().decode("utf-8") == registry.render()
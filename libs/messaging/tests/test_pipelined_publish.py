@@ -0,0 +1,257 @@
+import threading
+
+from concurrent.futures import Future
+from queue import Empty, SimpleQueue
+
+import pytest
+
+from pika.exceptions import NackError, UnroutableError
+from pika.spec import Basic, BasicProperties
+
+from hive.messaging import Channel
+from hive.messaging.confirms import ConfirmTracker
+from hive.messaging.threadsafe import PublisherCallback, PublisherChannel
+
+
+def frame(method):
+    return type("Frame", (), {"method": method})
+
+
+def expect(confirms, n, **kwargs):
+    futures = []
+    for i in range(n):
+        future = Future()
+        confirms.expect(
+            future,
+            exchange=kwargs.get("exchange", "hive.egg.nog"),
+            routing_key="",
+            body=kwargs.get("body", f"message {i}".encode()),
+        )
+        futures.append(future)
+    return futures
+
+
+def test_multiple_ack():
+    confirms = ConfirmTracker()
+    futures = expect(confirms, 4)
+    confirms.on_ack_nack(frame(Basic.Ack(delivery_tag=3, multiple=True)))
+    assert [f.done() for f in futures] == [True, True, True, False]
+    assert len(confirms) == 1
+    confirms.on_ack_nack(frame(Basic.Ack(delivery_tag=4)))
+    assert [f.result() for f in futures] == [None] * 4
+
+
+def test_nack():
+    confirms = ConfirmTracker()
+    futures = expect(confirms, 2)
+    confirms.on_ack_nack(frame(Basic.Nack(delivery_tag=1)))
+    confirms.on_ack_nack(frame(Basic.Ack(delivery_tag=2)))
+    with pytest.raises(NackError):
+        futures[0].result()
+    assert futures[1].result() is None
+
+
+def test_unroutable():
+    confirms = ConfirmTracker()
+    futures = expect(confirms, 3, body=b"same")
+    confirms.on_return(
+        None,
+        Basic.Return(exchange="hive.egg.nog", routing_key=""),
+        BasicProperties(),
+        b"same",
+    )
+    confirms.on_ack_nack(frame(Basic.Ack(delivery_tag=3, multiple=True)))
+    with pytest.raises(UnroutableError):
+        futures[0].result()
+    assert futures[1].result() is None
+    assert futures[2].result() is None
+
+
+def test_channel_closed():
+    confirms = ConfirmTracker()
+    futures = expect(confirms, 2)
+    reason = ConnectionResetError()
+    confirms.on_close(None, reason)
+    for future in futures:
+        assert future.exception() is reason
+    assert len(confirms) == 0
+
+
+class MockImpl:
+    def add_on_close_callback(self, callback):
+        pass
+
+    def add_on_return_callback(self, callback):
+        pass
+
+    def confirm_delivery(self, ack_nack_callback):
+        self.on_ack_nack = ack_nack_callback
+
+
+class MockPika:
+    def __init__(self):
+        self._impl = MockImpl()
+        self.connection = self
+        self.published = []
+
+    def exchange_declare(self, **kwargs):
+        pass
+
+    def basic_publish(self, **kwargs):
+        self.published.append(kwargs)
+
+    def _flush_output(self, *waiters):
+        delivery_tag = len(self.published)
+        self._impl.on_ack_nack(frame(Basic.Ack(delivery_tag=delivery_tag)))
+        assert any(ready() for ready in waiters)
+
+
+def test_pipelined_publish():
+    mock = MockPika()
+    channel = Channel(mock)
+    channel._pipeline_confirms()
+
+    futures = [
+        channel.publish_event_async(
+            message={"n": n},
+            routing_key="egg.nog",
+        ) for n in range(5)
+    ]
+    assert len(mock.published) == 5
+    assert not any(future.done() for future in futures)
+
+    mock._impl.on_ack_nack(frame(Basic.Ack(delivery_tag=5, multiple=True)))
+    assert [future.result() for future in futures] == [None] * 5
+
+
+def test_pipelined_publish_failure():
+    channel = Channel(MockPika())
+    channel._pipeline_confirms()
+
+    future = channel.publish_event_async(message=b"x", routing_key="egg.nog")
+    with pytest.raises(ValueError):
+        future.result()
+
+
+def test_synchronous_publish_waits_for_confirm():
+    mock = MockPika()
+    channel = Channel(mock)
+    channel._pipeline_confirms()
+
+    channel.publish_event(message={"hello": "world"}, routing_key="egg.nog")
+    assert len(mock.published) == 1
+    assert len(channel._confirms) == 0
+
+
+def test_failed_publish_is_not_expected():
+    confirms = ConfirmTracker()
+    futures = expect(confirms, 1)
+
+    def basic_publish(**kwargs):
+        raise ConnectionResetError
+
+    failed = Future()
+    with pytest.raises(ConnectionResetError):
+        confirms.publish(
+            failed,
+            basic_publish,
+            exchange="hive.egg.nog",
+            routing_key="",
+            body=b"x",
+        )
+    futures.extend(expect(confirms, 1))
+
+    confirms.on_ack_nack(frame(Basic.Ack(delivery_tag=2, multiple=True)))
+    assert [future.result() for future in futures] == [None, None]
+    assert not failed.done()
+    assert len(confirms) == 0
+
+
+class BlockingConnection:
+    """Dispatches like :class:`pika.BlockingConnection`.  Callbacks
+    added with `add_callback_threadsafe` run on the I/O thread, inside
+    `process_data_events`.  Confirms go straight to the underlying
+    channel's callback, so they never end a `process_data_events`
+    with no time limit, nested or otherwise.
+    """
+    def __init__(self):
+        self.ioloop = SimpleQueue()
+        self.is_running = True
+
+    def add_callback_threadsafe(self, callback):
+        self.ioloop.put(callback)
+
+    def _poll(self):
+        try:
+            self.ioloop.get(timeout=0.01)()
+        except Empty:
+            pass
+
+    def _flush_output(self, *waiters):
+        while not any(ready() for ready in waiters):
+            self._poll()
+
+    def process_data_events(self, time_limit=0):
+        if time_limit is None:
+            self._flush_output(lambda: False)
+        else:
+            timer = threading.Timer(time_limit, lambda: None)
+            timer.start()
+            self._flush_output(lambda: not timer.is_alive())
+
+    def run(self):
+        while self.is_running:
+            self.process_data_events(time_limit=0.05)
+
+
+class BlockingMockPika(MockPika):
+    def __init__(self, connection):
+        super().__init__()
+        self.connection = connection
+
+    def basic_publish(self, **kwargs):
+        super().basic_publish(**kwargs)
+        ack = frame(Basic.Ack(delivery_tag=len(self.published)))
+        self.connection.add_callback_threadsafe(
+            lambda: self._impl.on_ack_nack(ack),
+        )
+
+
+def test_publisher_channel_does_not_block_io_thread():
+    connection = BlockingConnection()
+
+    def invoke(func, *args, **kwargs):
+        callback = PublisherCallback(func, args, kwargs)
+        connection.add_callback_threadsafe(callback)
+        return callback.join()
+
+    mock = BlockingMockPika(connection)
+    channel = Channel(mock)
+    channel._pipeline_confirms()
+    publisher = PublisherChannel(
+        invoke,
+        channel,
+        _schedule=connection.add_callback_threadsafe,
+    )
+
+    io_thread = threading.Thread(target=connection.run, daemon=True)
+    io_thread.start()
+
+    def publish():
+        publisher.publish_event(message={"n": 1}, routing_key="egg.nog")
+        publisher.send_text("hello")  # proxied by __getattr__
+        publisher.set_user_typing(False)
+
+    caller = threading.Thread(target=publish, daemon=True)
+    caller.start()
+    caller.join(timeout=5)
+    connection.is_running = False
+    io_thread.join(timeout=5)
+
+    assert not caller.is_alive()
+    assert [kwargs["exchange"] for kwargs in mock.published] == [
+        "hive.egg.nog",
+        "hive.matrix.requests",
+        "hive.matrix.requests",
+    ]
+    assert len(channel._confirms) == 0
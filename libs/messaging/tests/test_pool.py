@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+import pytest
+
+from hive.messaging import Connection
+from hive.messaging.pool import ConnectionPool
+
+
+class MockPikaChannel:
+    is_open = True
+
+    def confirm_delivery(self):
+        pass
+
+
+class MockPikaConnection:
+    is_open = True
+
+    def __init__(self):
+        self.polls = 0
+
+    def channel(self):
+        return MockPikaChannel()
+
+    def process_data_events(self, time_limit):
+        assert time_limit == 0
+        self.polls += 1
+
+    def close(self):
+        self.is_open = False
+
+
+@pytest.fixture
+def connections():
+    return []
+
+
+@pytest.fixture
+def pool(connections):
+    def connect():
+        connections.append(MockPikaConnection())
+        return Connection(connections[-1])
+    return ConnectionPool(connect)
+
+
+def test_reuse(pool, connections):
+    with pool.channel() as channel1:
+        pass
+    with pool.channel() as channel2:
+        pass
+    assert channel1 is channel2
+    assert len(connections) == 1
+    assert connections[0].polls == 1
+    assert len(pool) == 1
+
+
+def test_concurrent_borrowers(pool, connections):
+    with pool.channel() as channel1:
+        with pool.channel() as channel2:
+            assert channel1 is not channel2
+    assert len(connections) == 2
+    assert len(pool) == 2
+
+
+def test_closed_connections_are_discarded(pool, connections):
+    with pool.channel():
+        pass
+    connections[0].is_open = False
+    with pool.channel():
+        pass
+    assert len(connections) == 2
+    assert len(pool) == 1
+
+
+def test_broken_connections_are_discarded(pool, connections):
+    with pool.channel():
+        pass
+
+    def process_data_events(time_limit):
+        raise ConnectionResetError
+    connections[0].process_data_events = process_data_events
+
+    with pool.channel():
+        pass
+    assert len(connections) == 2
+
+
+def test_closed_channels_are_not_returned(pool, connections):
+    with pool.channel() as channel:
+        channel._pika.is_open = False
+    assert len(pool) == 0
+    assert not connections[0].is_open
+
+
+def test_idle_connections_expire(pool, connections):
+    pool.max_idle = timedelta(0)
+    with pool.channel():
+        pass
+    with pool.channel():
+        pass
+    assert len(connections) == 2
+    assert not connections[0].is_open
+
+
+def test_max_size(pool, connections):
+    pool.max_size = 1
+    with pool.channel():
+        with pool.channel():
+            pass
+    assert len(pool) == 1
+    assert [conn.is_open for conn in connections] == [False, True]
+
+
+def test_clear(pool, connections):
+    with pool.channel():
+        pass
+    pool.clear()
+    assert len(pool) == 0
+    assert not connections[0].is_open
@@ -0,0 +1,79 @@
+import pytest
+
+from hive.messaging import Channel, Priority
+from hive.messaging.memory import InMemoryMessageBus
+from hive.messaging.priority import DEFAULT_MAX_PRIORITY
+
+
+def test_priority_property():
+    properties = Channel._prepare_publish(
+        routing_key="egg.nog",
+        data={},
+        priority=Priority.INTERACTIVE,
+    ).properties
+    assert properties.priority == 1
+    assert type(properties.priority) is int
+
+
+def test_no_priority_property():
+    properties = Channel._prepare_publish(
+        routing_key="egg.nog",
+        data={},
+    ).properties
+    assert properties.priority is None
+
+
+@pytest.mark.parametrize("priority", (-1, 256))
+def test_bad_priority(priority):
+    with pytest.raises(ValueError):
+        Channel._prepare_publish(
+            routing_key="egg.nog",
+            data={},
+            priority=priority,
+        )
+
+
+@pytest.mark.parametrize("max_priority", (0, 256))
+def test_bad_max_priority(max_priority):
+    with pytest.raises(ValueError):
+        Channel._priority_arguments(max_priority)
+
+
+@pytest.mark.parametrize("max_priority", (None, DEFAULT_MAX_PRIORITY))
+def test_interactive_messages_jump_the_queue(max_priority):
+    bus = InMemoryMessageBus()
+    received = []
+
+    def on_message_callback(channel, message):
+        received.append(message.event().type)
+
+    with bus.blocking_connection() as conn:
+        channel = conn.channel()
+        channel.consume_requests(
+            queue="matrix.requests",
+            on_message_callback=on_message_callback,
+            max_priority=max_priority,
+        )
+        channel._pika.basic_cancel(channel._pika.consumer_tags[0])
+
+        for _ in range(3):
+            channel.publish_request(
+                routing_key="matrix.requests",
+                type="bulk",
+                data={},
+            )
+        channel.send_text("hello")
+
+        channel.consume_requests(
+            queue="matrix.requests",
+            on_message_callback=on_message_callback,
+            max_priority=max_priority,
+        )
+        while len(received) < 4:
+            conn._pika.process_data_events()
+
+    interactive = "net.gbenson.hive.matrix_send_text_request"
+    if max_priority is None:
+        assert received == ["bulk"] * 3 + [interactive]
+    else:
+        assert received == [interactive] + ["bulk"] * 3
@@ -0,0 +1,173 @@
+from queue import SimpleQueue
+
+import pytest
+
+from pika.exceptions import NackError, UnroutableError
+from pika.spec import Basic, BasicProperties
+
+from hive.messaging import Channel, PublishBatchError
+from hive.messaging.threadsafe import PublisherChannel
+
+
+def frame(method):
+    return type("Frame", (), {"method": method})
+
+
+class MockImpl:
+    def add_on_close_callback(self, callback):
+        pass
+
+    def add_on_return_callback(self, callback):
+        self.on_return = callback
+
+    def confirm_delivery(self, ack_nack_callback):
+        self.on_ack_nack = ack_nack_callback
+
+
+class MockPika:
+    """Confirms everything published when output is flushed, except
+    that messages with body b"nack" are nacked, and messages with
+    body b"unroutable" are returned.
+    """
+    def __init__(self):
+        self._impl = MockImpl()
+        self.connection = self
+        self.published = []
+        self.confirmed = 0
+        self.flushes = 0
+
+    def exchange_declare(self, **kwargs):
+        pass
+
+    def basic_publish(self, **kwargs):
+        if kwargs["body"] == b"raise":
+            raise RuntimeError
+        self.published.append(kwargs)
+
+    def confirm(self):
+        while self.confirmed < len(self.published):
+            kwargs = self.published[self.confirmed]
+            self.confirmed += 1
+            method = Basic.Ack
+            if kwargs["body"] == b"nack":
+                method = Basic.Nack
+            elif kwargs["body"] == b"unroutable":
+                self._impl.on_return(
+                    None,
+                    Basic.Return(
+                        exchange=kwargs["exchange"],
+                        routing_key=kwargs["routing_key"],
+                    ),
+                    BasicProperties(),
+                    kwargs["body"],
+                )
+            self._impl.on_ack_nack(frame(method(delivery_tag=self.confirmed)))
+
+    def _flush_output(self, *waiters):
+        self.flushes += 1
+        self.confirm()
+        assert any(ready() for ready in waiters)
+
+
+@pytest.fixture
+def mock():
+    return MockPika()
+
+
+@pytest.fixture
+def channel(mock):
+    channel = Channel(mock)
+    channel._pipeline_confirms()
+    return channel
+
+
+def messages(*bodies):
+    return [
+        {"message": body, "content_type": "text/plain", "routing_key": "x"}
+        for body in bodies
+    ]
+
+
+def test_publish_many(mock, channel):
+    channel.publish_many([
+        {"routing_key": "egg.nog", "data": {"n": n}}
+        for n in range(100)
+    ])
+    assert len(mock.published) == 100
+    assert mock.confirmed == 100
+    assert mock.flushes == 1
+
+
+def test_publish_many_failures(mock, channel):
+    with pytest.raises(PublishBatchError) as excinfo:
+        channel.publish_many(
+            messages(b"ok", b"nack", b"raise", b"unroutable", b"ok"),
+            mandatory=True,
+        )
+    e = excinfo.value
+    assert e.size == 5
+    assert sorted(e.failures) == [1, 2, 3]
+    assert isinstance(e.failures[1], NackError)
+    assert isinstance(e.failures[2], RuntimeError)
+    assert isinstance(e.failures[3], UnroutableError)
+    assert len(mock.published) == 4
+    assert all(kwargs["mandatory"] for kwargs in mock.published)
+
+
+def test_publish_batch(mock, channel):
+    with channel.publish_batch() as batch:
+        batch.publish_event(message={}, routing_key="egg.nog")
+        batch.publish_request(message={}, routing_key="egg.nog")
+        assert len(batch) == 2
+        assert not mock.published
+    assert len(batch) == 0
+    assert [kwargs["mandatory"] for kwargs in mock.published] == [
+        False,
+        True,
+    ]
+    assert mock.flushes == 1
+
+
+def test_publish_batch_not_flushed_on_error(mock, channel):
+    with pytest.raises(KeyError):
+        with channel.publish_batch() as batch:
+            batch.publish_event(message={}, routing_key="egg.nog")
+            raise KeyError
+    assert not mock.published
+
+
+def test_bad_message_fails_early(mock, channel):
+    with pytest.raises(ValueError):
+        channel.publish_many(
+            messages(b"ok") + [{"message": b"x", "routing_key": "x"}],
+        )
+    assert not mock.published
+
+
+def test_unconfirmed_channel(mock):
+    channel = Channel(mock)
+    channel.publish_many(messages(b"ok", b"ok"))
+    assert len(mock.published) == 2
+    assert mock.flushes == 0
+
+
+def test_publisher_channel(mock, channel):
+    scheduled = SimpleQueue()
+    publisher = PublisherChannel(
+        None,
+        channel,
+        _schedule=scheduled.put,
+    )
+    batch = publisher.publish_batch()
+    batch.publish_event(message={}, routing_key="egg.nog")
+    batch.publish_event(message=b"unroutable", content_type="text/plain",
+                        routing_key="egg.nog")
+
+    futures = publisher._send_batch(batch._prepared)
+    assert not mock.published
+    scheduled.get_nowait()()  # the I/O thread runs the publish...
+    assert len(mock.published) == 2
+    assert not any(future.done() for future in futures)
+    mock.confirm()  # ...and later dispatches the confirms
+    assert futures[0].result() is None
+    assert isinstance(futures[1].exception(), UnroutableError)
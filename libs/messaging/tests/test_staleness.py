@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+import pytest
+
+from pika import BasicProperties
+
+from hive.common import utc_now
+from hive.messaging import Channel, Message, metrics
+from hive.messaging.memory import InMemoryMessageBus
+from hive.messaging.metrics import Hook
+
+
+class RecordingHook(Hook):
+    def __init__(self):
+        self.outcomes = []
+
+    def message_handled(self, queue, *, outcome, **kwargs):
+        self.outcomes.append(outcome)
+
+
+@pytest.fixture
+def hook():
+    hook = RecordingHook()
+    metrics.add_hook(hook)
+    try:
+        yield hook
+    finally:
+        metrics.remove_hook(hook)
+
+
+def message(*, time=None, consume_by=None, binary=False):
+    body, properties = Channel._prepare(
+        "egg.nog",
+        time=time,
+        data={"hello": "world"},
+        binary=binary,
+    )
+    return Message(
+        None,
+        Channel._basic_properties(**properties, consume_by=consume_by),
+        body,
+    )
+
+
+def test_deadline():
+    deadline = utc_now() + timedelta(minutes=5)
+    m = message(consume_by=deadline)
+    assert m.deadline == deadline
+    assert not m.is_expired()
+    assert m.is_expired(deadline + timedelta(seconds=1))
+
+
+def test_no_deadline():
+    m = message()
+    assert m.deadline is None
+    assert not m.is_expired()
+    assert Message(None, BasicProperties(), b"").deadline is None
+
+
+@pytest.mark.parametrize("binary", (False, True))
+def test_age(binary):
+    now = utc_now()
+    m = message(time=now - timedelta(minutes=5), binary=binary)
+    assert m.age(now) == timedelta(minutes=5)
+
+
+def test_age_of_non_event():
+    m = Message(None, BasicProperties(content_type="text/plain"), b"hi")
+    assert m.age() is None
+
+
+@pytest.mark.parametrize("concurrency", (1, 2))
+def test_stale_messages_are_discarded(hook, concurrency):
+    bus = InMemoryMessageBus()
+    now = utc_now()
+    handled = []
+
+    def on_message_callback(channel, message):
+        handled.append(message.event().data["n"])
+
+    with bus.blocking_connection() as conn:
+        channel = conn.channel()
+        channel.consume_requests(
+            queue="egg.nog",
+            on_message_callback=on_message_callback,
+            concurrency=concurrency,
+            prefetch_count=0,
+            drop_expired=True,
+            max_age=timedelta(minutes=1),
+        )
+        for n, kwargs in enumerate((
+                {},
+                {"time": now - timedelta(minutes=5)},
+                {"consume_by": now + timedelta(minutes=5)},
+                {"time": now - timedelta(seconds=5)},
+        )):
+            channel.publish_request(
+                routing_key="egg.nog",
+                data={"n": n},
+                **kwargs
+            )
+        conn._pika.process_data_events()
+        channel._drain_workers(timedelta(seconds=5))
+        conn._pika.process_data_events()
+
+    assert sorted(handled) == [0, 2, 3]
+    assert sorted(hook.outcomes) == ["ack", "ack", "ack", "stale"]
+    assert bus.broker.message_count("egg.nog") == 0
+
+
+def test_expired_messages_are_discarded(hook):
+    bus = InMemoryMessageBus()
+    handled = []
+    with bus.blocking_connection() as conn:
+        channel = conn.channel()
+        channel.consume_requests(
+            queue="egg.nog",
+            on_message_callback=lambda channel, message: handled.append(
+                message.event().data,
+            ),
+            drop_expired=True,
+        )
+        channel._pika.basic_cancel(channel._pika.consumer_tags[0])
+        channel.publish_request(
+            routing_key="egg.nog",
+            data={},
+            consume_by=utc_now() + timedelta(seconds=5),
+        )
+        # Simulate it lingering behind an unexpired message.
+        [(properties, body)] = bus.broker.queued("egg.nog")
+        assert not Message(None, properties, body).is_expired()
+        properties.headers["hive-consume-by"] = (
+            utc_now() - timedelta(seconds=1)).isoformat()
+
+        channel.consume_requests(
+            queue="egg.nog",
+            on_message_callback=lambda channel, message: handled.append(
+                message.event().data,
+            ),
+            drop_expired=True,
+        )
+        conn._pika.process_data_events()
+
+    assert handled == []
+    assert hook.outcomes == ["stale"]
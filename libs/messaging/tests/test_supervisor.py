@@ -0,0 +1,103 @@
+from datetime import timedelta
+from threading import Event, Thread
+
+import pytest
+
+from pika.exceptions import AMQPConnectionError
+
+from hive.messaging.memory import InMemoryMessageBus
+from hive.messaging.supervisor import Supervisor
+
+TIMEOUT = 10
+
+
+def test_reconnects_and_resumes_consumers():
+    bus = InMemoryMessageBus()
+    setup_calls = []
+    received = []
+    ready = Event()
+    got_first = Event()
+
+    def on_message(channel, message):
+        received.append(message.json()["n"])
+        if received[-1] == 1:
+            got_first.set()
+        elif received[-1] == 2:
+            channel._pika.stop_consuming()
+
+    def setup(channel):
+        setup_calls.append(channel)
+        channel.consume_requests(
+            queue="egg.nog",
+            on_message_callback=on_message,
+        )
+        ready.set()
+
+    supervisor = Supervisor(
+        bus.blocking_connection,
+        min_delay=timedelta(milliseconds=1),
+        max_failures=3,
+    )
+    thread = Thread(target=supervisor.run, args=(setup,), daemon=True)
+    thread.start()
+
+    assert ready.wait(TIMEOUT)
+    with bus.blocking_connection() as conn:
+        channel = conn.channel()
+        channel.publish_request(message={"n": 1}, routing_key="egg.nog")
+        assert got_first.wait(TIMEOUT)
+
+        bus.broker.restart()
+
+    with bus.blocking_connection() as conn:
+        channel = conn.channel()
+        channel.publish_request(message={"n": 2}, routing_key="egg.nog")
+
+    thread.join(TIMEOUT)
+    assert not thread.is_alive()
+    assert len(setup_calls) == 1
+    assert received[0] == 1
+    assert received[-1] == 2
+
+
+def test_max_failures():
+    attempts = []
+
+    def connect(**kwargs):
+        attempts.append(kwargs)
+        raise AMQPConnectionError("nope")
+
+    supervisor = Supervisor(
+        connect,
+        min_delay=timedelta(0),
+        max_failures=3,
+    )
+    with pytest.raises(AMQPConnectionError):
+        supervisor.run(lambda channel: None)
+    assert len(attempts) == 3
+
+
+def test_other_errors_are_not_retried():
+    attempts = []
+
+    def connect(**kwargs):
+        attempts.append(kwargs)
+        raise ValueError("nope")
+
+    with pytest.raises(ValueError):
+        Supervisor(connect).run(lambda channel: None)
+    assert len(attempts) == 1
+
+
+@pytest.mark.parametrize(
+    "failures,expect_max",
+    ((1, 0.1), (2, 0.2), (3, 0.4), (8, 10), (100, 10)),
+)
+def test_backoff(failures, expect_max):
+    supervisor = Supervisor(
+        InMemoryMessageBus().blocking_connection,
+        min_delay=timedelta(milliseconds=100),
+        max_delay=timedelta(seconds=10),
+    )
+    for _ in range(20):
+        assert 0.1 <= supervisor._backoff(failures) <= expect_max
@@ -0,0 +1,98 @@
+import pytest
+
+from hive.messaging import Channel, Connection
+from hive.messaging.topology import Topology
+
+
+class MockPika:
+    def __init__(self):
+        self.call_log = []
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+
+        def method(*args, **kwargs):
+            self.call_log.append((attr, args, kwargs))
+        return method
+
+    def calls(self, *methods):
+        return [call for call in self.call_log if call[0] in methods]
+
+
+def consume_and_publish(channel):
+    channel.consume_requests(
+        queue="arr.pirates",
+        on_message_callback=lambda channel, message: None,
+    )
+    channel.publish_event(message={}, routing_key="egg.nog")
+
+
+def test_declarations_are_shared_between_channels():
+    mock = MockPika()
+    topology = Topology()
+    for _ in range(3):
+        consume_and_publish(Channel(mock, _topology=topology))
+
+    assert [
+        (method, args, kwargs.get("exchange"))
+        for method, args, kwargs in mock.calls(
+                "exchange_declare",
+                "queue_declare",
+                "queue_bind",
+        )
+    ] == [
+        ("exchange_declare", (), "hive.arr.pirates"),
+        ("queue_declare", ("x.arr.pirates",), None),
+        ("exchange_declare", (), "hive.dead.letter"),
+        ("queue_bind", (), "hive.dead.letter"),
+        ("queue_declare", ("arr.pirates",), None),
+        ("queue_bind", (), "hive.arr.pirates"),
+        ("exchange_declare", (), "hive.egg.nog"),
+    ]
+    assert len(mock.calls("basic_consume")) == 3
+    assert len(mock.calls("basic_publish")) == 3
+
+
+def test_differing_declarations_are_sent():
+    mock = MockPika()
+    topology = Topology()
+    topology.declare(mock, "queue_declare", "q", arguments={"a": "b"})
+    topology.declare(mock, "queue_declare", "q", arguments={"a": "b"})
+    topology.declare(mock, "queue_declare", "q", arguments={"a": "c"})
+    assert len(mock.calls("queue_declare")) == 2
+    assert len(topology) == 2
+
+
+def test_failed_declarations_are_not_cached():
+    class FailingPika(MockPika):
+        failures = 1
+
+        def exchange_declare(self, **kwargs):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionResetError
+            self.call_log.append(("exchange_declare", (), kwargs))
+
+    mock = FailingPika()
+    channel = Channel(mock)
+    with pytest.raises(ConnectionResetError):
+        channel.publish_event(message={}, routing_key="egg.nog")
+    channel.publish_event(message={}, routing_key="egg.nog")
+    assert len(mock.calls("exchange_declare")) == 1
+
+
+def test_connection_close_clears_topology():
+    class MockConnection(MockPika):
+        is_open = False
+
+        def channel(self):
+            return MockPika()
+
+    conn = Connection(MockConnection())
+    with conn:
+        channel = conn.channel(confirm_delivery=False)
+        assert channel._topology is conn.topology
+        channel.publish_event(message={}, routing_key="egg.nog")
+        assert len(conn.topology) == 1
+    assert len(conn.topology) == 0
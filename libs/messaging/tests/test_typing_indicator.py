@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+import pytest
+
+from pika.exceptions import UnroutableError
+
+from hive.messaging import Channel
+from hive.messaging.typing_indicator import TypingIndicators
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("hive.messaging.typing_indicator.monotonic", clock)
+    return clock
+
+
+def test_extensions(clock):
+    indicators = TypingIndicators()
+    timeout = timedelta(seconds=30)
+    assert indicators.update("hive", timeout)
+    clock.now += 9
+    assert not indicators.update("hive", timeout)
+    clock.now += 1
+    assert indicators.update("hive", timeout)
+    assert indicators.update("bob", timeout)
+
+
+def test_min_extension(clock):
+    indicators = TypingIndicators()
+    timeout = timedelta(seconds=5)
+    assert indicators.update("hive", timeout)
+    clock.now += 1
+    assert not indicators.update("hive", timeout)
+    assert indicators.update("hive", timeout, min_extension=timedelta(0))
+
+
+def test_cancellation(clock):
+    indicators = TypingIndicators()
+    assert indicators.update("hive", False)  # unknown state
+    assert not indicators.update("hive", False)
+    assert indicators.update("hive", timedelta(seconds=5))
+    clock.now += 1
+    assert indicators.update("hive", False)
+    assert not indicators.update("hive", False)
+
+
+def test_no_cancellation_when_nearly_expired(clock):
+    indicators = TypingIndicators()
+    assert indicators.update("hive", timedelta(seconds=5))
+    clock.now += 4.75
+    assert not indicators.update("hive", False)
+
+
+def test_forget(clock):
+    indicators = TypingIndicators()
+    assert indicators.update("hive", False)
+    indicators.forget("hive")
+    assert indicators.update("hive", False)
+
+
+class MockPika:
+    def __init__(self):
+        self.published = []
+        self.fail = False
+
+    def exchange_declare(self, **kwargs):
+        pass
+
+    def basic_publish(self, **kwargs):
+        if self.fail:
+            raise UnroutableError([])
+        self.published.append(kwargs)
+
+
+def test_channel_coalesces_updates(clock):
+    mock = MockPika()
+    channel = Channel(mock)
+    channel.set_user_typing(timedelta(seconds=5))
+    channel.set_user_typing(timedelta(seconds=5))
+    channel.set_user_typing(False)
+    channel.set_user_typing(False)
+    assert len(mock.published) == 2
+
+
+def test_failed_updates_are_forgotten(clock):
+    mock = MockPika()
+    channel = Channel(mock)
+    mock.fail = True
+    channel.set_user_typing(False)
+    mock.fail = False
+    channel.set_user_typing(False)
+    assert len(mock.published) == 1
@@ -1,4 +1,13 @@
-from .service import Service as HiveService
+from typing import TYPE_CHECKING
+
+from hive.common.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .service import Service as HiveService
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "HiveService": ".service:Service",
+})
 
 __all__ = [
     "HiveService",
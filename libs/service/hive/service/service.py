@@ -1,18 +1,25 @@
 import logging
+import os
 import sys
 
 from abc import ABC, abstractmethod
 from contextlib import suppress
 from dataclasses import dataclass
+from functools import cached_property
 from importlib import import_module
-from typing import Any, Optional
+from threading import Thread
+from typing import Any, Callable, ClassVar, Optional
 
 from hive.common import ArgumentParser
+from hive.common.socketserver import serving
 from hive.messaging import (
+    DEFAULT_MESSAGE_BUS,
+    Channel,
     Connection,
-    blocking_connection,
-    publisher_connection,
+    MessageBus,
+    metrics,
 )
+from hive.messaging.supervisor import Supervisor
 from hive.messaging.typing import ConnectionFactory, OnChannelOpenCallback
 
 from .logging import maybe_enable_json_logging
@@ -22,13 +29,27 @@ logger = logging.getLogger(__name__)
 
 @dataclass
 class Service(ABC):
+    DEFAULT_METRICS_PORT: ClassVar[int] = 9464
     argument_parser: Optional[ArgumentParser] = None
+    message_bus: Optional[MessageBus] = None
     on_channel_open: Optional[OnChannelOpenCallback] = None
     unparsed_arguments: Optional[list[str]] = None
     version_info: Optional[str] = None
 
     def make_argument_parser(self) -> ArgumentParser:
         parser = ArgumentParser()
+        default_port = int(os.environ.get(
+            "HIVE_METRICS_PORT",
+            self.DEFAULT_METRICS_PORT,
+        ))
+        parser.add_argument(
+            "--metrics-port",
+            metavar="PORT",
+            type=int,
+            default=default_port,
+            help=(f"port to serve metrics on, or 0 to not serve them"
+                  f" [default: {default_port}]"),
+        )
         return parser
 
     def __post_init__(self) -> None:
@@ -75,11 +96,29 @@ class Service(ABC):
     def run(self) -> None:
         raise NotImplementedError
 
+    @property
+    def _message_bus(self) -> MessageBus:
+        return self.message_bus or DEFAULT_MESSAGE_BUS
+
     def blocking_connection(self, **kwargs: Any) -> Connection:
-        return self._connect(blocking_connection, kwargs)
+        return self._connect(self._message_bus.blocking_connection, kwargs)
 
     def publisher_connection(self, **kwargs: Any) -> Connection:
-        return self._connect(publisher_connection, kwargs)
+        return self._connect(self._message_bus.publisher_connection, kwargs)
+
+    def run_consumers(
+            self,
+            setup: Callable[[Channel], None],
+            **kwargs: Any
+    ) -> None:
+        """Open a blocking connection and channel, call `setup` to
+        start the channel's consumers, then consume until they're
+        cancelled.  If the connection fails, for example because the
+        broker restarted, reconnect and restart the same consumers.
+        Keyword arguments are passed to :meth:`Connection.channel`.
+        """
+        supervisor = Supervisor(self.blocking_connection)
+        supervisor.run(setup, **kwargs)
 
     def _connect(
             self,
@@ -87,4 +126,22 @@ class Service(ABC):
             kwargs: Any
     ) -> Connection:
         on_channel_open = kwargs.pop("on_channel_open", self.on_channel_open)
+        _ = self.metrics_server
         return connect(on_channel_open=on_channel_open, **kwargs)
+
+    @cached_property
+    def metrics_server(self) -> Optional[Thread]:
+        """Serve :mod:`hive.messaging.metrics` over HTTP on
+        ``--metrics-port`` until the service exits.  Started by the
+        first connection the service makes.
+        """
+        if not (port := getattr(self.args, "metrics_port", 0)):
+            return None
+        try:
+            server = metrics.make_server(port)
+        except OSError:
+            logger.warning("Not serving metrics on port %d", port,
+                           exc_info=True)
+            return None
+        self._metrics_serving = serving(server)
+        return self._metrics_serving.__enter__()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from typing import Optional
+
+from hive.common import read_resource
+
+DEFAULT_FILENAME = "lexicon.txt"
+
+# Unicode characters normalized to "'".
+APOSTROPHISH_CODEPOINTS = {
+    0x02b9,  # Modifier letter prime
+    0x02bc,  # Modifier letter apostrophe
+    0x02bf,  # Modifier letter left half ring
+    0x02c8,  # Modifier letter vertical line
+    0x055a,  # Armenian apostrophe
+    0x05f3,  # Hebrew punctuation geresh
+    0x1fbd,  # Greek koronis
+    0x1fbf,  # Greek psili
+    0x1ffd,  # Greek oxia
+    0x2018,  # Left single quotation mark
+    0x2019,  # Right single quotation mark
+    0x201b,  # Single high-reversed-9 quotation mark
+    0x2032,  # Prime
+    0x275c,  # Heavy single comma quotation mark ornament
+    0xff07,  # Fullwidth apostrophe
+}
+APOSTROPHE_FOLDING = str.maketrans(dict.fromkeys(APOSTROPHISH_CODEPOINTS, "'"))
+
+
+def fold(s: str) -> str:
+    """Return a version of `s` suitable for caseless comparison.
+    """
+    s = s.casefold()
+    if s.isascii():
+        return s
+    return s.translate(APOSTROPHE_FOLDING)
+
+
+@dataclass(frozen=True)
+class Normalization:
+    """What the tokenizer does with a word.
+    """
+    # The word, with any abbreviation expanded.
+    text: str
+
+    # True if the word was an abbreviation that breaks words, such as
+    # "+", in which case it and the next word each start a new word.
+    breaks_words: bool = False
+
+    # The two words a contraction expands to, and whether the split
+    # is after the first word's length, as in "aren't", or before the
+    # second's, as in "won't".
+    expansion: Optional[tuple[str, str, bool]] = None
+
+
+@dataclass(frozen=True)
+class Lexicon:
+    """The tokenizer's normalization tables.
+    """
+    abbreviations: Mapping[str, str]
+    contractions: Mapping[str, tuple[str, str]]
+
+    @classmethod
+    def load(cls, filename: str = DEFAULT_FILENAME) -> Lexicon:
+        """Load a lexicon from a file.  Relative filenames are relative
+        to this package.
+        """
+        text = read_resource(filename)
+        assert isinstance(text, str)
+        return cls.parse(text.splitlines(), filename)
+
+    @classmethod
+    def parse(
+            cls,
+            lines: Iterable[str],
+            filename: str = "<lexicon>",
+    ) -> Lexicon:
+        """Parse a lexicon, in the format of lexicon.txt.
+        """
+        abbreviations: dict[str, str] = {}
+        contractions: dict[str, tuple[str, str]] = {}
+        for lineno, line in enumerate(lines, 1):
+            if not (words := fold(line).split()):
+                continue
+            if (form := words.pop(0)).startswith("#"):
+                continue
+            if form in abbreviations or form in contractions:
+                raise ValueError(f"{filename}:{lineno}: duplicate {form!r}")
+            match words:
+                case [word]:
+                    abbreviations[form] = word
+                case [head, tail]:
+                    if not form.startswith(head) and tail not in ("not", "to"):
+                        raise ValueError(
+                            f"{filename}:{lineno}: can't split {form!r}")
+                    contractions[form] = (head, tail)
+                case _:
+                    raise ValueError(
+                        f"{filename}:{lineno}: expected one or two words")
+        return cls(
+            abbreviations=MappingProxyType(abbreviations),
+            contractions=MappingProxyType(contractions),
+        )
+
+    @cached_property
+    def direct_abbreviations(self) -> Mapping[str, str]:
+        """Abbreviations that don't break words.
+        """
+        return MappingProxyType({
+            form: word
+            for form, word in self.abbreviations.items()
+            if form.isalnum()
+        })
+
+    @cached_property
+    def word_breaking_abbreviations(self) -> Mapping[str, str]:
+        """Abbreviations that break words.
+        """
+        return MappingProxyType({
+            form: word
+            for form, word in self.abbreviations.items()
+            if not form.isalnum()
+        })
+
+    @cached_property
+    def normalizations(self) -> Mapping[str, Normalization]:
+        """Everything the tokenizer does with each word it changes,
+        so each word needs one lookup.  Abbreviations that don't break
+        words are expanded first, then those that do, then contractions.
+        """
+        result = {}
+        for form in (*self.abbreviations, *self.contractions):
+            text = self.direct_abbreviations.get(form, form)
+            word = self.word_breaking_abbreviations.get(text, text)
+            breaks_words = word != text
+            expansion = None
+            if (words := self.contractions.get(word)):
+                head, tail = words
+                expansion = (head, tail, word.startswith(head))
+            result[form] = Normalization(word, breaks_words, expansion)
+        return MappingProxyType(result)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator
+import sys
+
+from collections.abc import Iterable, Iterator, Mapping
 from dataclasses import dataclass, field
 from functools import cached_property
+from types import MappingProxyType
 from typing import Callable, ClassVar, Optional, Sequence, TypeAlias
 
 from .spellchecker import spellcheck
@@ -10,6 +13,19 @@ from .tokenizer import Token
 
 Handler: TypeAlias = Callable[[], None]
 
+# Wildcards that may match no tokens, and that must match at least one.
+ZERO_PLUS_WILDCARDS = "#^"
+ONE_PLUS_WILDCARDS = "_*"
+WILDCARDS = ZERO_PLUS_WILDCARDS + ONE_PLUS_WILDCARDS
+
+# Wildcards in the order Matcher tries them, with "-" for word matches.
+EXTENSION_ORDER = "#_-^*"
+
+# A step of a search through an automaton: the node moved to, the
+# index of the next unconsumed token, and the token consumed if the
+# step was a word match, or None if it was a wildcard match.
+Step: TypeAlias = tuple[int, int, Optional[Token]]
+
 
 @dataclass
 class Node:
@@ -17,6 +33,11 @@ class Node:
     """
     children: dict[str, Node] = field(default_factory=dict)
     _handler: Optional[Handler] = None
+    _automaton: Optional[Automaton] = field(
+        default=None,
+        compare=False,
+        repr=False,
+    )
 
     @property
     def handler(self) -> Optional[Handler]:
@@ -33,6 +54,7 @@ class Node:
         self._handler = handler
 
     def add_route(self, tokens: Sequence[str], handler: Handler) -> None:
+        self._automaton = None
         if not tokens:
             self.handler = handler
             return
@@ -44,6 +66,14 @@ class Node:
             self.children[next_token] = child
         child.add_route(tokens[1:], handler)
 
+    def compile(self) -> Automaton:
+        """Return the graph rooted at this node as an automaton.
+        The automaton is cached until a route is added.
+        """
+        if not (automaton := self._automaton):
+            automaton = self._automaton = Automaton.compile(self)
+        return automaton
+
     def __str__(self) -> str:
         result = []
         self._describe_into(result)
@@ -68,53 +98,150 @@ class Node:
             child._describe_into(result, pattern + (token,), indent)
 
 
-@dataclass
-class Candidate:
-    node: Node
-    token_index: int
-    matched_tokens: tuple[Token] = ()
-    parent: Optional[Candidate] = None
-    is_wildcard: bool = False
+@dataclass(frozen=True)
+class Automaton:
+    """A pattern graph compiled into read-only tables, for matching.
 
-    @cached_property
-    def pattern(self) -> str:
-        """Pattern substring matched by this candidate.
+    Nodes are numbered breadth-first from the root, node 0, so every
+    node's number is greater than its parent's.  Pattern elements are
+    interned, and every table is indexed by node number or label ID.
+    """
+    # Pattern elements, by label ID, and their label IDs.
+    labels: tuple[str, ...]
+    label_ids: Mapping[str, int]
+
+    # Each node's parent, and the label ID of the edge from it.
+    # Both are -1 for the root.
+    parents: tuple[int, ...]
+    edge_labels: tuple[int, ...]
+
+    # Each node's handler, as returned by Node.handler.
+    handlers: tuple[Optional[Handler], ...]
+
+    # Each node's children, by edge label ID.  Edges labelled with
+    # wildcards are included, because tokens with the same text match
+    # them as words.
+    edges: tuple[Mapping[int, int], ...]
+
+    # Each node's children by each of WILDCARDS, or -1 for none.
+    wildcards: tuple[tuple[int, ...], ...]
+
+    # The fewest input tokens any route from each node must consume,
+    # or sys.maxsize if there are no routes from the node.
+    min_tokens: tuple[int, ...]
+
+    # The highest Match.priority of the remaining spans of any route
+    # from each node, or -1 if there are no routes from the node.
+    max_priority: tuple[int, ...]
+
+    # The most any route's remaining spans add to a match's score,
+    # which is len(Match.pattern) - len(Match.groups), counting one
+    # more for the space that would separate the first span from the
+    # one before it.
+    max_score: tuple[int, ...]
+
+    @classmethod
+    def compile(cls, root: Node) -> Automaton:
+        nodes = [root]
+        label_ids: dict[str, int] = {}
+        parents = [-1]
+        edge_labels = [-1]
+        edges = []
+        for node_id, node in enumerate(nodes):
+            node_edges = {}
+            for text, child in node.children.items():
+                label_id = label_ids.setdefault(text, len(label_ids))
+                node_edges[label_id] = len(nodes)
+                nodes.append(child)
+                parents.append(node_id)
+                edge_labels.append(label_id)
+            edges.append(node_edges)
+
+        labels = tuple(label_ids)
+        wildcards = tuple(
+            tuple(
+                node_edges.get(label_ids.get(wildcard, -1), -1)
+                for wildcard in WILDCARDS
+            )
+            for node_edges in edges
+        )
+        handlers = tuple(node.handler for node in nodes)
+
+        # Children have higher numbers than their parents, so every
+        # node's children's bounds are known by the time it's reached.
+        num_nodes = len(nodes)
+        min_tokens = [sys.maxsize] * num_nodes
+        max_priority = [-1] * num_nodes
+        max_score = [-1] * num_nodes
+        for node_id in reversed(range(num_nodes)):
+            if handlers[node_id]:
+                min_tokens[node_id] = 0
+                max_priority[node_id] = Span.WORD_PRIORITY
+                max_score[node_id] = 0
+            for label_id, child_id in edges[node_id].items():
+                if max_priority[child_id] < 0:
+                    continue  # no routes
+                text = labels[label_id]
+                is_wildcard = text in WILDCARDS
+                min_tokens[node_id] = min(
+                    min_tokens[node_id],
+                    min_tokens[child_id]
+                    + int(text not in ZERO_PLUS_WILDCARDS),
+                )
+                max_priority[node_id] = max(
+                    max_priority[node_id],
+                    min(
+                        Span.priority_of(text, is_wildcard),
+                        max_priority[child_id],
+                    ),
+                )
+                max_score[node_id] = max(
+                    max_score[node_id],
+                    Span.score_of(text, is_wildcard) + max_score[child_id],
+                )
+
+        return cls(
+            labels=labels,
+            label_ids=MappingProxyType(label_ids),
+            parents=tuple(parents),
+            edge_labels=tuple(edge_labels),
+            handlers=handlers,
+            edges=tuple(MappingProxyType(e) for e in edges),
+            wildcards=wildcards,
+            min_tokens=tuple(min_tokens),
+            max_priority=tuple(max_priority),
+            max_score=tuple(max_score),
+        )
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def label(self, node_id: int) -> str:
+        """Return the pattern element of the edge to `node_id`.
         """
-        if not (parent := self.parent):
+        if (label_id := self.edge_labels[node_id]) < 0:
             return "<|root|>"
-        children = parent.node.children
-        our_node = self.node
-        results = [
-            text
-            for text, child in children.items()
-            if child is our_node
-        ]
-        assert len(results) == 1
-        return results[0]
+        return self.labels[label_id]
 
-    def __repr__(self) -> str:
-        return f"|{self.pattern}|"
+    def route(self, node_id: int) -> tuple[str, ...]:
+        """Return the pattern elements on the path to `node_id`.
+        """
+        result = []
+        while node_id > 0:
+            result.append(self.labels[self.edge_labels[node_id]])
+            node_id = self.parents[node_id]
+        return tuple(reversed(result))
 
 
 @dataclass
 class Span:
-    _c: Candidate
+    # Pattern substring this span consumed.
+    pattern: str
 
-    @property
-    def is_wildcard(self) -> bool:
-        return self._c.is_wildcard
+    # Normalized input tokens this span consumed.
+    matched_tokens: tuple[Token, ...]
 
-    @property
-    def pattern(self) -> str:
-        """Pattern substring this span consumed.
-        """
-        return self._c.pattern
-
-    @property
-    def matched_tokens(self) -> tuple[Token]:
-        """Normalized input tokens this span consumed.
-        """
-        return self._c.matched_tokens
+    is_wildcard: bool = False
 
     @property
     def match(self) -> str:
@@ -122,6 +249,8 @@ class Span:
         """
         return " ".join(t.text for t in self.matched_tokens)
 
+    WORD_PRIORITY: ClassVar[int] = 100
+
     _PRIORITIES: ClassVar[dict[str, int]] = {
         # http://www.aiml.foundation/doc.html
         #    7,  # dollar match ($word)  top priority word match
@@ -137,6 +266,23 @@ class Span:
     def match_priority(self) -> int:
         return self._PRIORITIES.get(self.pattern, 4)
 
+    @classmethod
+    def priority_of(cls, pattern: str, is_wildcard: bool) -> int:
+        """The priority a span consuming `pattern` contributes to
+        :attr:`Match.priority`.
+        """
+        if not is_wildcard:
+            return cls.WORD_PRIORITY
+        return cls._PRIORITIES.get(pattern, 4)
+
+    @classmethod
+    def score_of(cls, pattern: str, is_wildcard: bool) -> int:
+        """What a span consuming `pattern` adds to a match's score,
+        ``len(match.pattern) - len(match.groups)``, counting the space
+        that separates it from the previous span.
+        """
+        return len(pattern) + 1 - int(is_wildcard)
+
     def __repr__(self) -> str:
         p, m = p_m = self.pattern, self.match
         return repr(m if m == p else p_m)
@@ -144,12 +290,23 @@ class Span:
 
 @dataclass
 class Match:
-    tokens: tuple[Token]
-    _c: Candidate
+    tokens: tuple[Token, ...]
+    automaton: Automaton = field(repr=False)
+    steps: tuple[Step, ...]
+
+    @property
+    def node_id(self) -> int:
+        """The automaton node this match reached.
+        """
+        if not (steps := self.steps):
+            return 0
+        return steps[-1][0]
 
     @property
     def handler(self) -> Handler:
-        return self._c.node.handler
+        handler = self.automaton.handlers[self.node_id]
+        assert handler
+        return handler
 
     @property
     def match(self) -> str:
@@ -160,23 +317,34 @@ class Match:
         return " ".join(s.pattern for s in self.spans)
 
     @property
-    def groups(self) -> tuple[Span]:
+    def groups(self) -> tuple[Span, ...]:
         return tuple(s for s in self.spans if s.is_wildcard)
 
     @property
     def priority(self) -> int:
         return min(
-            s.match_priority if s.is_wildcard else 100
+            s.match_priority if s.is_wildcard else Span.WORD_PRIORITY
             for s in self.spans
         )
 
+    @property
+    def sort_key(self) -> tuple[int, int]:
+        """Matches with higher keys are better.
+        """
+        return self.priority, len(self.pattern) - len(self.groups)
+
     @cached_property
-    def spans(self) -> tuple[Span]:
+    def spans(self) -> tuple[Span, ...]:
+        label = self.automaton.label
         result = []
-        c = self._c
-        while (p := c.parent):
-            result.insert(0, Span(c))
-            c = p
+        start = 0
+        for node_id, end, token in self.steps:
+            if token is None:
+                tokens = self.tokens[start:end]
+                result.append(Span(label(node_id), tokens, True))
+            else:
+                result.append(Span(label(node_id), (token,)))
+            start = end
         return tuple(result)
 
     def __repr__(self) -> str:
@@ -184,111 +352,201 @@ class Match:
         return f"Match(pattern={self.pattern!r}, groups={groups!r})"
 
 
+# (wildcard, index in WILDCARDS or -1 for word matches, fewest tokens
+# matched) in the order Matcher tries them.
+_EXTENSIONS = tuple(
+    (wildcard, WILDCARDS.find(wildcard), int(wildcard in ONE_PLUS_WILDCARDS))
+    for wildcard in EXTENSION_ORDER
+)
+
+
 @dataclass(repr=False)
 class Matcher:
-    graph: Node
-    tokens: tuple[Token]
-    matches: list[Match] = field(default_factory=list)
+    """Find the routes in an automaton that match a sequence of tokens.
+
+    The best match is the one with the highest priority, then the
+    longest pattern, then the first found by a depth-first search
+    trying exact words and each wildcard in a fixed order, with
+    wildcards matching as many tokens as possible first.  Branches
+    that can't reach a route consuming the remaining tokens, or that
+    can't beat the best match found so far, aren't searched.  Match
+    objects are only created for full matches.
+    """
+    graph: Automaton
+    tokens: tuple[Token, ...]
+    _best_match: Optional[Match] = field(init=False, default=None)
+    _best_key: tuple[int, int] = field(init=False, default=(-1, -1))
+    _completable: dict[int, bool] = field(init=False, default_factory=dict)
+    _steps_taken: list[Step] = field(init=False, default_factory=list)
 
     @property
     def best_match(self) -> Match:
-        return max(
-            (match.priority,
-             len(match.pattern) - len(match.groups),
-             -index,
-             match)
-            for index, match in enumerate(self.matches)
-        )[-1]
+        if not (match := self._best_match):
+            raise ValueError("no match")
+        return match
+
+    @cached_property
+    def matches(self) -> list[Match]:
+        """Every full match, in the order the search finds them.
+        """
+        result: list[Match] = []
+        self._backtrack(0, 0, result)
+        if (best := self._best_match):
+            result = [
+                best if match.steps == best.steps else match
+                for match in result
+            ]
+        return result
 
     def __str__(self) -> str:
         return str(self.matches)
 
     def __post_init__(self) -> None:
-        self._backtrack(self._root())
+        label_ids = self.graph.label_ids
+        self._token_ids = tuple(
+            label_ids.get(t.text, -1) for t in self.tokens)
+        # The automaton's bounds assume wildcards in patterns only ever
+        # match as wildcards, but tokens with the same text match them
+        # as words.
+        self._prune = not any(t.text in WILDCARDS for t in self.tokens)
+        self._search(0, 0, Span.WORD_PRIORITY, 0)
 
     # https://en.wikipedia.org/wiki/Backtracking#Pseudocode
-    def _backtrack(self, c: Candidate) -> None:
-        if self._reject(c):
-            return
-        if self._accept(c):
-            self._output(c)
-        for s in self._extensions(c):
-            self._backtrack(s)
-
-    def _root(self) -> Candidate:
-        """Return the partial candidate at the root of the search tree.
+    def _backtrack(
+            self,
+            node_id: int,
+            token_index: int,
+            result: list[Match],
+    ) -> None:
+        if self._accept(node_id, token_index):
+            result.append(self._match())
+        steps_taken = self._steps_taken
+        for step in self._extensions(node_id, token_index):
+            steps_taken.append(step)
+            self._backtrack(step[0], step[1], result)
+            steps_taken.pop()
+
+    def _search(
+            self,
+            node_id: int,
+            token_index: int,
+            priority: int,
+            score: int,
+    ) -> None:
+        """Like :meth:`_backtrack`, but only keeps the best match, and
+        prunes branches that can't beat it.  `priority` and `score`
+        are the lowest span priority and the total span score of the
+        steps taken so far.
         """
-        return Candidate(self.graph, 0)
-
-    def _reject(self, c: Candidate) -> bool:
-        """Return True only if the partial candidate c is not worth completing.
+        graph = self.graph
+        if self._best_match and self._prune:
+            if (min(priority, graph.max_priority[node_id]),
+                    score + graph.max_score[node_id]) <= self._best_key:
+                return
+        if self._accept(node_id, token_index):
+            if (key := (priority, score)) > self._best_key:
+                self._best_key = key
+                self._best_match = self._match()
+        steps_taken = self._steps_taken
+        for step in self._extensions(node_id, token_index):
+            s_node_id, s_token_index, token = step
+            pattern = graph.labels[graph.edge_labels[s_node_id]]
+            is_wildcard = token is None
+            steps_taken.append(step)
+            self._search(
+                s_node_id,
+                s_token_index,
+                min(priority, Span.priority_of(pattern, is_wildcard)),
+                score + Span.score_of(pattern, is_wildcard),
+            )
+            steps_taken.pop()
+
+    def _match(self) -> Match:
+        """Return the full match reached by the steps taken so far.
         """
-        return False  # XXX this reduces the algorithm to brute force
+        return Match(self.tokens, self.graph, tuple(self._steps_taken))
 
-    def _accept(self, c: Candidate) -> bool:
-        """Return True if c is a routed full match, otherwise return False.
+    def _accept(self, node_id: int, token_index: int) -> bool:
+        """Return True if the search reached a routed full match,
+        otherwise return False.
         """
-        if c.token_index != len(self.tokens):
+        if token_index != len(self.tokens):
             return False  # the entire input wasn't consumed.
-        if not c.node.handler:
+        if not self.graph.handlers[node_id]:
             return False  # the node we reached isn't a route.
         return True
 
-    def _output(self, c: Candidate) -> None:
-        """Add the solution c of P to the set of valid matches.
+    def _extensions(self, node_id: int, token_index: int) -> Iterator[Step]:
+        """Iterate over the steps from `node_id` that could lead to a
+        full match.
         """
-        assert c.token_index == len(self.tokens)
-        assert c.node.handler
-        self.matches.append(Match(self.tokens, c))
-
-    def _extensions(self, c: Candidate) -> Iterator[Candidate]:
-        """Iterate over the extensions of candidate c.
+        for step in self._steps(node_id, token_index):
+            if self._can_complete(step[0], step[1]):
+                yield step
+
+    def _can_complete(self, node_id: int, token_index: int) -> bool:
+        """Return True if any route from `node_id` consumes exactly the
+        tokens from `token_index` onwards.  Results are memoised, so
+        each dead end is explored at most once.
         """
-        token_index = c.token_index
-        if token_index >= len(self.tokens):
+        num_tokens = len(self.tokens)
+        if token_index == num_tokens:
+            return bool(self.graph.handlers[node_id])
+        key = node_id * num_tokens + token_index
+        if (result := self._completable.get(key)) is None:
+            result = self._completable[key] = any(
+                self._can_complete(s_node_id, s_token_index)
+                for s_node_id, s_token_index, _ in self._steps(
+                        node_id, token_index)
+            )
+        return result
+
+    def _steps(self, node_id: int, token_index: int) -> Iterator[Step]:
+        """Iterate over the ways to consume tokens from `token_index`
+        onwards by moving to a child of `node_id`, except those leaving
+        fewer tokens than any route from the child needs.
+        """
+        num_tokens = len(self.tokens)
+        if token_index >= num_tokens:
             return
 
-        children = c.node.children
-        for wildcard in "#_-^*":
-            if wildcard == "-":
+        min_tokens = self.graph.min_tokens
+        wildcards = self.graph.wildcards[node_id]
+        for _, slot, min_length in _EXTENSIONS:
+            if slot < 0:
                 # Exact word match (not a wildcard)
-                if (s_token := self._get_word_match(token_index, children)):
-                    s, token = s_token
-                    yield Candidate(s, token_index + 1, [token], c, False)
+                if (s_token := self._get_word_match(token_index, node_id)):
+                    s_node_id, token = s_token
+                    if min_tokens[s_node_id] < num_tokens - token_index:
+                        yield s_node_id, token_index + 1, token
                 continue
 
-            if not (s := children.get(wildcard)):
+            if (s_node_id := wildcards[slot]) < 0:
                 continue
 
-            # match_start is the index of the first token of user input
-            # the wildcard could consume.
-            match_start = token_index
-
-            min_match_limit = match_start + int(wildcard in ("_*"))
-            max_match_limit = len(self.tokens)
-
-            match_limits = range(min_match_limit, max_match_limit + 1)
-            match_limits = reversed(match_limits)  # reversed makes it greedy
-
-            for match_limit in match_limits:
-                match_tokens = self.tokens[match_start:match_limit]
-                yield Candidate(s, match_limit, match_tokens, c, True)
+            # Wildcards consume tokens from token_index up to but not
+            # including match_limit, matching as many as they can first.
+            max_match_limit = num_tokens - min_tokens[s_node_id]
+            min_match_limit = token_index + min_length
+            for match_limit in range(max_match_limit, min_match_limit - 1, -1):
+                yield s_node_id, match_limit, None
 
     SPELL_CHECK_MIN_WORD_LENGTH: ClassVar[int] = 3
 
     def _get_word_match(
             self,
             token_index: int,
-            children: dict[str, Node],
-    ) -> Optional[tuple[Candidate, Token]]:
-        """Return the candidate and token for a word match.
+            node_id: int,
+    ) -> Optional[tuple[int, Token]]:
+        """Return the child and token for a word match.
         """
+        edges = self.graph.edges[node_id]
         token = self.tokens[token_index]
-        word = token.text
 
-        if (s := children.get(word)):
-            return s, token  # exact match
+        if (s_node_id := edges.get(self._token_ids[token_index])) is not None:
+            return s_node_id, token  # exact match
 
+        word = token.text
         if len(word) < self.SPELL_CHECK_MIN_WORD_LENGTH:
             return None
 
@@ -296,15 +554,21 @@ class Matcher:
         if not candidates:
             return None
 
-        candidates &= children.keys()
-        if len(candidates) != 1:
+        label_ids = self.graph.label_ids
+        found = [
+            (candidate, s_node_id)
+            for candidate in candidates
+            if (s_node_id := edges.get(label_ids.get(candidate, -1)))
+            is not None
+        ]
+        if len(found) != 1:
             return None
 
-        word = candidates.pop()
-        return children.get(word), token.with_text(word)
+        word, s_node_id = found[0]
+        return s_node_id, token.with_text(word)
 
 
 class PatternGraph(Node):
     def match(self, tokens: Iterable[Token]) -> Optional[Matcher]:
-        m = Matcher(self, tuple(tokens))
+        m = Matcher(self.compile(), tuple(tokens))
         return m if len(m.matches) else None
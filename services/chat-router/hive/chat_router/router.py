@@ -2,19 +2,73 @@ from __future__ import annotations
 
 import logging
 
-from collections.abc import Iterable
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
 from dataclasses import dataclass, field
 from functools import cached_property, partial
 from threading import Lock, local as ThreadLocal
-from typing import Any
+from typing import Any, Optional, TypeAlias
 
-from .pattern_graph import Handler, PatternGraph, Span
+from .pattern_graph import Handler, Match, Matcher, PatternGraph, Span
 from .request import Request
 from .tokenizer import Token, tokenize
 
 logger = logging.getLogger(__name__)
 d = logger.info
 
+# A match's steps, with the text of each word match's token in place
+# of the token, so it can be rebuilt from other tokens with that text.
+Route: TypeAlias = tuple[tuple[int, int, Optional[str]], ...]
+
+
+@dataclass
+class DispatchCache:
+    """The best matches of recently dispatched inputs, or None for
+    inputs that matched nothing, discarding the least recently used
+    when full.
+    """
+    maxsize: int = 1024
+    hits: int = 0
+    misses: int = 0
+    _routes: OrderedDict[Hashable, Optional[Route]] = field(
+        default_factory=OrderedDict,
+        repr=False,
+    )
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def get(self, key: Hashable) -> tuple[bool, Optional[Route]]:
+        """Return whether `key` is cached, and its route if it is.
+        """
+        with self._lock:
+            if key not in self._routes:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self._routes.move_to_end(key)
+            return True, self._routes[key]
+
+    def put(self, key: Hashable, route: Optional[Route]) -> None:
+        with self._lock:
+            self._routes[key] = route
+            self._routes.move_to_end(key)
+            while len(self._routes) > self.maxsize:
+                self._routes.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._routes),
+            }
+
 
 @dataclass
 class Router:
@@ -30,6 +84,7 @@ class Router:
     """
     _graph: PatternGraph = field(default_factory=PatternGraph)
     request: ThreadLocal = field(default_factory=ThreadLocal)
+    dispatch_cache: DispatchCache = field(default_factory=DispatchCache)
 
     def add_route(self, pattern: str, handler: Handler) -> None:
         """Register the handler for the given pattern.
@@ -38,6 +93,7 @@ class Router:
         if not tokens:
             raise ValueError
         self._graph.add_route(tokens, handler)
+        self.dispatch_cache.clear()
 
     def dispatch(
             self,
@@ -71,17 +127,49 @@ class Router:
         self.request.tokens = tokens
         self.request.match = None
         d("dispatch: %r", " ".join(t.text for t in tokens))
-        if not (matches := self.graph.match(tokens)):
-            raise KeyError
-        self.request.match = match = matches.best_match
+        self.request.match = match = self._match(tokens)
         match.handler()
 
+    def _match(self, tokens: tuple[Token, ...]) -> Match:
+        """Return the best match for `tokens`, from the dispatch cache
+        if possible.
+
+        :raises KeyError: if nothing matches.
+        """
+        automaton = self.graph.compile()
+        # Whether words are spell-checked affects what they match.
+        key = (
+            Matcher.SPELL_CHECK_MIN_WORD_LENGTH,
+            tuple(t.text for t in tokens),
+        )
+        is_cached, route = self.dispatch_cache.get(key)
+        if is_cached:
+            if route is None:
+                raise KeyError
+            return Match(tokens, automaton, tuple(
+                (node_id, end, None if text is None
+                 else tokens[end - 1].with_text(text))
+                for node_id, end, text in route
+            ))
+
+        try:
+            match = Matcher(automaton, tokens).best_match
+        except ValueError:
+            self.dispatch_cache.put(key, None)
+            raise KeyError from None
+        self.dispatch_cache.put(key, tuple(
+            (node_id, end, None if token is None else token.text)
+            for node_id, end, token in match.steps
+        ))
+        return match
+
     _lazy_init_lock: Lock = field(default_factory=Lock, repr=False)
 
     @cached_property
     def graph(self) -> PatternGraph:
         with self._lazy_init_lock:
             self.__lazy_init__()
+            self._graph.compile()
         return self._graph
 
     def __lazy_init__(self) -> None:
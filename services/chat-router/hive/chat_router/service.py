@@ -32,20 +32,21 @@ class Service(HiveService):
         field(default_factory=FORWARDABLE_COMMAND_ROUTES.copy)
 
     def run(self) -> None:
-        with self.blocking_connection() as conn:
-            channel = conn.channel()
-            channel.consume_events(
-                queue="matrix.events",
-                on_message_callback=self.on_matrix_event,
-            )
-            channel.start_consuming()
+        self.run_consumers(self.start_consumers)
+
+    def start_consumers(self, channel: Channel) -> None:
+        channel.consume_events(
+            queue="matrix.events",
+            on_message_callback=self.on_matrix_event,
+        )
 
     def on_matrix_event(self, channel: Channel, message: Message) -> None:
-        event = message.event()
-        if event.type != "net.gbenson.hive.matrix_event":
-            raise ValueError(event.type)
-        if event.subject != "m.room.message":
+        envelope = message.lazy_event()
+        if envelope.type != "net.gbenson.hive.matrix_event":
+            raise ValueError(envelope.type)
+        if envelope.subject != "m.room.message":
             return
+        event = envelope.event()
         try:
             self.on_room_message(channel, event)
         except NotImplementedError:
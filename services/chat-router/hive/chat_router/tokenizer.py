@@ -2,16 +2,31 @@ from __future__ import annotations
 
 import re
 
-from collections.abc import Iterable
-from dataclasses import asdict, dataclass, field
-from itertools import chain
-from typing import Sequence
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field, replace
+from typing import Optional, Sequence, TypeAlias
+
+from .lexicon import Lexicon, fold
 
 ANY_WORD_CHAR = re.compile(r"\w")
-WORD_RE = re.compile(r"(\w+)")
 
+# Words for split_words: word characters other than "_", and "'".
+WORD_RE = re.compile(r"((?:[^\W_]|')+)")
+
+LEXICON = Lexicon.load()
+ABBREVIATIONS = LEXICON.abbreviations
+DIRECT_ABBREVIATIONS = LEXICON.direct_abbreviations
+WHITESPACE_MODIFYING_ABBREVIATIONS = LEXICON.word_breaking_abbreviations
+EXPANSIONS = {
+    contraction: " ".join(words)
+    for contraction, words in LEXICON.contractions.items()
+}
+
+# A section of a token's text: its text, start, limit and starts_word.
+Section: TypeAlias = tuple[str, int, int, bool]
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Token:
     source: str = field(compare=False)
     start: int
@@ -55,17 +70,14 @@ class Token:
         """
         if text == self.text:
             return self
-        return self.with_values(text=text)
+        return replace(self, text=text)
 
     def with_values(self, **kwargs) -> Token:
         """Return a token with some attributes updated.
         """
-        old_kwargs = asdict(self)
-        new_kwargs = old_kwargs.copy()
-        new_kwargs.update(kwargs)
-        if new_kwargs == old_kwargs:
+        if all(getattr(self, k) == v for k, v in kwargs.items()):
             return self
-        return type(self)(**new_kwargs)
+        return replace(self, **kwargs)
 
     @property
     def source_text(self) -> str:
@@ -77,6 +89,8 @@ class Token:
 
 
 class SpecialToken(Token):
+    __slots__ = ()
+
     @classmethod
     def capture(
             cls,
@@ -93,48 +107,93 @@ class SpecialToken(Token):
     ) -> Token:
         if token.text not in special_tokens:
             return token
-        return cls(**asdict(token))
+        return cls(
+            token.source,
+            token.start,
+            token.limit,
+            token.text,
+            token.starts_word,
+        )
 
 
 def tokenize(
         s: str,
         special_tokens: Sequence[str] = "!,.?@",
         append_special: Sequence[str] = "",
-) -> Iterable[Token]:
+        lexicon: Lexicon = LEXICON,
+) -> Iterator[Token]:
     """Split a string into normalized tokens.
+
+    This does everything :func:`split`, :func:`casefold`,
+    :func:`split_words`, :func:`disabbreviate`, :func:`expand` and
+    :func:`drop_nonspecial_nonword` do, capturing special tokens
+    after splitting and after splitting words, but in a single pass
+    that creates each token once.  Abbreviations and contractions
+    are normalized according to `lexicon`.
     """
     if append_special:
         special_tokens = set(special_tokens)
         special_tokens.update(append_special)
 
-    tokens = split(s)
-    tokens = SpecialToken.capture(special_tokens, tokens)
-    tokens = map(casefold, tokens)
-    tokens = chain.from_iterable(split_words(t) for t in tokens)
-    tokens = SpecialToken.capture(special_tokens, tokens)
-    tokens = disabbreviate(tokens)
-    tokens = chain.from_iterable(expand(t) for t in tokens)
-    tokens = drop_nonspecial_nonword(tokens)
-    return tokens
+    normalizations = lexicon.normalizations
+    word_break = False
+    for start, limit, word in _split(s):
+        is_special = word in special_tokens
+        text = fold(word)
+        if is_special or (sections := _split_text(text, start)) is None:
+            sections = [(text, start, limit, True)]
+
+        for text, start, limit, starts_word in sections:
+            cls = Token
+            if is_special or text in special_tokens:
+                cls = SpecialToken
+
+            if not (normalization := normalizations.get(text)):
+                if word_break:
+                    starts_word = True
+                    word_break = False
+            else:
+                text = normalization.text
+                if normalization.breaks_words or word_break:
+                    starts_word = True
+                word_break = normalization.breaks_words
+
+                if (expansion := normalization.expansion):
+                    t, u, split_at_head = expansion
+                    split = start + len(t) if split_at_head else limit - len(u)
+                    yield cls(s, start, split, t, True)
+                    yield cls(s, split, limit, u, True)
+                    continue
+
+            if cls is Token and not ANY_WORD_CHAR.search(text):
+                continue
+            yield cls(s, start, limit, text, starts_word)
 
 
 def split(s: str) -> Iterable[Token]:
     """Split a string into whitespace-separated tokens.
     """
+    for start, limit, _ in _split(s):
+        yield Token.from_string(s, start, limit)
+
+
+def _split(s: str) -> Iterator[tuple[int, int, str]]:
+    """Split a string into (start, limit, text) tuples.
+    """
     start = 0
     for word in s.split():
         start = s.find(word, start)
         if start < 0:
             raise RuntimeError  # pragma: no cover
         limit = start + len(word)
-        yield Token.from_string(s, start, limit)
+        yield start, limit, word
         start = limit
 
 
 def casefold(token: Token) -> Token:
     """Return a version of the token suitable for caseless comparison.
     """
-    return token.with_text(APOSTROPHISH_RE.sub("'", token.text.casefold()))
+    return token.with_text(fold(token.text))
 
 
 def split_words(token: Token) -> Iterable[Token]:
@@ -144,37 +203,42 @@ def split_words(token: Token) -> Iterable[Token]:
         yield token
         return
 
-    s = token.text
+    if (sections := _split_text(token.text, token.start)) is None:
+        yield token
+        return
+
+    for text, start, limit, starts_word in sections:
+        yield token.with_values(
+            text=text,
+            start=start,
+            limit=limit,
+            starts_word=starts_word,
+        )
 
-    # Make it break on "_" but not on "'"
-    ss = s.replace("_", " ").replace("'", "_")
 
-    start = token.start
+def _split_text(s: str, start: int) -> Optional[list[Section]]:
+    """Split text starting at `start` into word- and non-word sections,
+    or return None if it's all one section.
+    """
+    if s.isalnum():
+        return None  # all word characters, and none of them are "_"
+
+    result = []
     starts_word = True
-    for i, tt in enumerate(WORD_RE.split(ss)):
-        is_sep = not bool(i & 1)
-        if not tt:
-            assert is_sep
+    for i, t in enumerate(WORD_RE.split(s)):
+        if not t:
             continue
 
-        # Undo the previous transformation
-        t = tt.replace("_", "'").replace(" ", "_")
-
         if t == s:
-            yield token
-            return
+            return None
 
-        ts = list(t) if is_sep else [t]
+        ts = t if i & 1 == 0 else [t]
         for t in ts:
             limit = start + len(t)
-            yield token.with_values(
-                text=t,
-                start=start,
-                limit=limit,
-                starts_word=starts_word,
-            )
+            result.append((t, start, limit, starts_word))
             start = limit
         starts_word = False
+    return result
 
 
 def disabbreviate(tokens: Iterable[Token]) -> Iterable[Token]:
@@ -205,18 +269,15 @@ def expand(token: Token) -> Iterable[Token]:
     """Expand standard contractions.
     """
     s = token.text
-    t = EXPANSIONS.get(s, s)
-    if t == s:
+    if not (words := LEXICON.contractions.get(s)):
         yield token
         return
 
-    t, u = t.split()
+    t, u = words
     if s.startswith(t):
         split = token.start + len(t)
-    elif u in ("not", "to"):
-        split = token.limit - len(u)
     else:
-        raise ValueError  # pragma: no cover
+        split = token.limit - len(u)
 
     yield token.with_values(text=t, limit=split, starts_word=True)
     yield token.with_values(text=u, start=split, starts_word=True)
@@ -231,153 +292,3 @@ def drop_nonspecial_nonword(tokens: Iterable[Token]) -> Iterable[Token]:
         if not ANY_WORD_CHAR.search(s):
             continue
         yield token
-
-
-APOSTROPHISH_CODEPOINTS = {
-    0x02b9,  # Modifier letter prime
-    0x02bc,  # Modifier letter apostrophe
-    0x02bf,  # Modifier letter left half ring
-    0x02c8,  # Modifier letter vertical line
-    0x055a,  # Armenian apostrophe
-    0x05f3,  # Hebrew punctuation geresh
-    0x1fbd,  # Greek koronis
-    0x1fbf,  # Greek psili
-    0x1ffd,  # Greek oxia
-    0x2018,  # Left single quotation mark
-    0x2019,  # Right single quotation mark
-    0x201b,  # Single high-reversed-9 quotation mark
-    0x2032,  # Prime
-    0x275c,  # Heavy single comma quotation mark ornament
-    0xff07,  # Fullwidth apostrophe
-}
-APOSTROPHISH_CHARACTERS = "".join(map(chr, sorted(APOSTROPHISH_CODEPOINTS)))
-APOSTROPHISH_RE = re.compile(rf"[{APOSTROPHISH_CHARACTERS}]")
-
-ABBREVIATIONS = dict(
-    line.split()
-    for line in """
-        &       and
-        +       and
-        /       or
-        passwd  password
-        pls     please
-        u       you
-        ur      your
-    """.strip().split("\n")
-)
-DIRECT_ABBREVIATIONS = dict(
-    (_in, out)
-    for _in, out in ABBREVIATIONS.items()
-    if _in.isalnum()
-)
-WHITESPACE_MODIFYING_ABBREVIATIONS = dict(
-    (_in, out)
-    for _in, out in ABBREVIATIONS.items()
-    if _in not in DIRECT_ABBREVIATIONS
-)
-
-# Standard (and non-standard!) English contractions
-#
-# N.B. Some of these have more than one expansion:
-#  - Many "X'd" could be "X would" or "X had",
-#    and others could be "X would" or "X did".
-#    I've mostly preferred did over would, and would over had.
-#  - Many "X's" could be "X is" or "X has",
-#    and "what's" could additionally be "what does";
-#    all are expanded to the "X is" form here.
-#
-# The list is long, and can likely be trimmed once I have
-# some patterns and can see what's useful and what isn't.
-EXPANSIONS = dict(
-    line.lower().split(maxsplit=1)
-    for line in """
-        ain't         is not
-        aren't        are not
-        can't         can not
-        cannot        can not
-        couldn't      could not
-        could've      could have
-        didn't        did not
-        don't         do not
-        gonna         going to
-        hadn't        had not
-        hasn't        has not
-        haven't       have not
-        he'd          he would
-        he'll         he will
-        here's        here is
-        he's          he is
-        how's         how is
-        I'd           I would
-        I'll          I will
-        I'm           I am
-        isn't         is not
-        it'd          it would
-        it'll         it will
-        it's          it is
-        I've          I have
-        let's         let us
-        mightn't      might not
-        might've      might have
-        mustn't       must not
-        must've       must have
-        needn't       need not
-        nobody's      nobody is
-        nothing's     nothing is
-        one's         one is
-        oughtn't      ought not
-        shan't        shall not
-        she'd         she would
-        she'll        she will
-        she's         she is
-        shouldn't     should not
-        should've     should have
-        somebody's    somebody is
-        someone's     someone is
-        something's   something is
-        that'd        that would
-        that's        that is
-        that've       that have
-        there'd       there would
-        there'll      there will
-        there's       there is
-        they'd        they would
-        they'll       they will
-        they're       they are
-        they've       they have
-        wanna         want to
-        wasn't        was not
-        we'd          we would
-        we'll         we will
-        weren't       were not
-        we're         we are
-        we've         we have
-        what'd        what did
-        what'll       what will
-        what're       what are
-        what's        what is
-        when'd        when did
-        when'll       when will
-        when's        when is
-        where'd       where did
-        where'll      where will
-        where's       where is
-        which've      which have
-        who'd         who would
-        who'll        who will
-        who're        who are
-        who'd         who did
-        who's         who is
-        who've        who have
-        why'd         why did
-        why'll        why will
-        why's         why is
-        won't         will not
-        wouldn't      would not
-        would've      would have
-        you'd         you would
-        you'll        you will
-        you're        you are
-        you've        you have
-    """.strip().split("\n")
-)
@@ -0,0 +1,64 @@
+import pytest
+
+from hive.chat_router.router import DispatchCache, Router
+
+from .util import make_test_request
+
+
+def make_router():
+    router = Router()
+    matches = []
+
+    def handler():
+        match = router.request.match
+        matches.append((
+            match.pattern,
+            [[t.source_text for t in g.matched_tokens] for g in match.groups],
+        ))
+
+    router.add_route("hello *", handler)
+    router.add_route("ping", handler)
+    return router, matches, handler
+
+
+def test_hits_rebuild_matches_from_new_tokens():
+    router, matches, _ = make_router()
+    router.dispatch(make_test_request("Hello World"), None)
+    router.dispatch(make_test_request("hello  WORLD"), None)
+    assert matches == [
+        ("hello *", [["World"]]),
+        ("hello *", [["WORLD"]]),
+    ]
+    assert router.dispatch_cache.as_dict() == {
+        "hits": 1,
+        "misses": 1,
+        "size": 1,
+    }
+
+
+def test_misses_are_cached():
+    router, _, _ = make_router()
+    for _ in range(2):
+        with pytest.raises(KeyError):
+            router.dispatch(make_test_request("goodbye"), None)
+    assert (router.dispatch_cache.hits, router.dispatch_cache.misses) == (1, 1)
+
+
+def test_add_route_invalidates():
+    router, matches, handler = make_router()
+    router.dispatch(make_test_request("hello there"), None)
+    router.add_route("hello there", handler)
+    assert len(router.dispatch_cache) == 0
+    router.dispatch(make_test_request("hello there"), None)
+    assert [pattern for pattern, _ in matches] == ["hello *", "hello there"]
+
+
+def test_least_recently_used_are_discarded():
+    cache = DispatchCache(maxsize=2)
+    cache.put("a", None)
+    cache.put("b", ((1, 1, "b"),))
+    assert cache.get("a") == (True, None)
+    cache.put("c", None)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, None)
+    assert cache.get("c") == (True, None)
@@ -0,0 +1,48 @@
+import pytest
+
+from hive.chat_router.lexicon import Lexicon, Normalization, fold
+from hive.chat_router.tokenizer import LEXICON, tokenize
+
+
+def test_fold():
+    assert fold("DON’T") == "don't"
+    assert fold("Straße") == "strasse"
+
+
+def test_default_lexicon():
+    assert LEXICON.abbreviations["pls"] == "please"
+    assert LEXICON.contractions["won't"] == ("will", "not")
+    assert LEXICON.contractions["i'm"] == ("i", "am")
+    assert LEXICON.normalizations["+"] == Normalization("and", True)
+    assert LEXICON.normalizations["u"] == Normalization("you")
+    assert LEXICON.normalizations["won't"] == Normalization(
+        "won't", expansion=("will", "not", False))
+
+
+def test_parse():
+    lexicon = Lexicon.parse("""
+        # comment
+        IDK         dunno
+        ~           approximately
+        Gotta       got to
+        dunno       do not
+    """.splitlines())
+    assert lexicon.direct_abbreviations == {"idk": "dunno"}
+    assert lexicon.word_breaking_abbreviations == {"~": "approximately"}
+    assert lexicon.normalizations["idk"] == Normalization(
+        "dunno", expansion=("do", "not", False))
+    assert [t.text for t in tokenize("IDK~gotta", lexicon=lexicon)] == [
+        "do", "not", "approximately", "got", "to",
+    ]
+
+
+@pytest.mark.parametrize(
+    "lines,expect_message",
+    ((["u you", "u your"], "<lexicon>:2: duplicate 'u'"),
+     (["gotta got to", "gimme give me"], "<lexicon>:2: can't split 'gimme'"),
+     (["idk i do not know"], "<lexicon>:1: expected one or two words"),
+     ))
+def test_parse_errors(lines, expect_message):
+    with pytest.raises(ValueError) as excinfo:
+        Lexicon.parse(lines)
+    assert str(excinfo.value) == expect_message
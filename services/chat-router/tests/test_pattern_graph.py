@@ -1,4 +1,8 @@
+from contextlib import suppress
+from random import Random
+
 from hive.chat_router.brain import router
+from hive.chat_router.pattern_graph import PatternGraph
 from hive.chat_router.tokenizer import tokenize
 
 
@@ -21,3 +25,74 @@ def test_matcher():
         "please could you generate me 14 random male names please ?",
     ]
     assert matcher.best_match is matches[1]
+
+
+def brute_force_best_match(matcher):
+    return max(
+        (match.priority,
+         len(match.pattern) - len(match.groups),
+         -index,
+         match)
+        for index, match in enumerate(matcher.matches)
+    )[-1]
+
+
+def test_best_match_is_brute_force_best_match(no_spellcheck):
+    random = Random(23)
+    vocab = "alpha beta gamma delta epsilon".split()
+    graph = PatternGraph()
+    for _ in range(200):
+        route = [random.choice(vocab + list("#_^*")) for _ in range(4)]
+        with suppress(KeyError):
+            graph.add_route(route[:random.randint(1, 4)], lambda: None)
+
+    for _ in range(200):
+        text = " ".join(random.choice(vocab + ["zeta"]) for _ in range(8))
+        if not (matcher := graph.match(tuple(tokenize(text)))):
+            continue
+        expect = brute_force_best_match(matcher)
+        assert matcher.best_match.pattern == expect.pattern
+        assert matcher.best_match.groups == expect.groups
+
+
+def test_wildcard_tokens_match_as_words(no_spellcheck):
+    graph = PatternGraph()
+    graph.add_route(("*",), lambda: None)
+    graph.add_route(("_",), lambda: None)
+    matcher = graph.match(tuple(tokenize("_")))
+    assert matcher.best_match is brute_force_best_match(matcher)
+    assert [m.pattern for m in matcher.matches] == ["_", "_", "*"]
+    assert [len(m.groups) for m in matcher.matches] == [1, 0, 1]
+    assert matcher.best_match is matcher.matches[1]
+
+
+def test_no_match():
+    graph = PatternGraph()
+    graph.add_route(("hello", "_"), lambda: None)
+    assert graph.match(tuple(tokenize("hello"))) is None
+    assert graph.compile().min_tokens[0] == 2
+
+
+def test_compile():
+    graph = PatternGraph()
+    graph.add_route(("hello", "_"), lambda: None)
+    graph.add_route(("hello", "world"), lambda: None)
+    automaton = graph.compile()
+    assert graph.compile() is automaton
+    assert len(automaton) == 4
+    assert automaton.handlers[0] is None
+    assert [automaton.route(i) for i in range(len(automaton))] == [
+        (),
+        ("hello",),
+        ("hello", "_"),
+        ("hello", "world"),
+    ]
+    assert automaton.wildcards[1] == (-1, -1, 2, -1)
+    assert automaton.edges[1] == {
+        automaton.label_ids["_"]: 2,
+        automaton.label_ids["world"]: 3,
+    }
+
+    graph.add_route(("*",), lambda: None)
+    assert graph.compile() is not automaton
+    assert len(graph.compile()) == 5
@@ -2,6 +2,8 @@ from datetime import datetime, timezone
 from typing import Any, Optional
 from unittest.mock import Mock
 
+from pika.spec import BasicProperties
+
 from hive.chat_router import Service
 from hive.messaging import Channel, Message
 
@@ -18,7 +20,7 @@ def make_test_message(
         subject=subject or matrix_event.get("type"),
         data=matrix_event,
     )
-    return Message(None, Mock(content_type=content_type), body)
+    return Message(None, BasicProperties(content_type=content_type), body)
 
 
 def test_self_message():
@@ -0,0 +1,50 @@
+from itertools import chain
+
+import pytest
+
+from hive.chat_router.tokenizer import (
+    SpecialToken,
+    casefold,
+    disabbreviate,
+    drop_nonspecial_nonword,
+    expand,
+    split,
+    split_words,
+    tokenize,
+)
+
+
+def staged_tokenize(s, special_tokens):
+    tokens = split(s)
+    tokens = SpecialToken.capture(special_tokens, tokens)
+    tokens = map(casefold, tokens)
+    tokens = chain.from_iterable(split_words(t) for t in tokens)
+    tokens = SpecialToken.capture(special_tokens, tokens)
+    tokens = disabbreviate(tokens)
+    tokens = chain.from_iterable(expand(t) for t in tokens)
+    tokens = drop_nonspecial_nonword(tokens)
+    return tokens
+
+
+@pytest.mark.parametrize(
+    "user_input",
+    ("",
+     " Hello ? ",
+     "please could you generate me 14 random male names please?",
+     "\tmake me\nan email+password \t for smol (pls!)",
+     "block @infomails.microsoft.com",
+     "Es waren größtenteils 20 bis 24 m Länge.",
+     "I'M SURE U won’t, R U?",
+     "what's ur passwd?! cannot/wanna & gonna",
+     "x+y a/b &&  +z __init__ '' ?! ...",
+     "who's_there it'd've 1,000 a.b.c ,. 🪲?",
+     "_ * # ^ foo_* #bar ^baz",
+     ))
+@pytest.mark.parametrize("append_special", ("", "#_^*"))
+def test_tokenize_matches_stages(user_input, append_special):
+    special_tokens = "!,.?@"
+    if append_special:
+        special_tokens = set(special_tokens) | set(append_special)
+    expect = tuple(staged_tokenize(user_input, special_tokens))
+    got = tuple(tokenize(user_input, append_special=append_special))
+    assert got == expect  # Token equality includes class and starts_word
@@ -3,10 +3,11 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime
 from functools import cached_property
+from typing import Any, Optional
 
 from valkey import Valkey
 
-from hive.messaging import Channel, UnroutableError
+from hive.messaging import Channel, PublishBatchError, UnroutableError
 
 from ..imap import ClientConnection as IMAPConn
 from .processor import Processor
@@ -35,6 +36,8 @@ class InboxProcessor(Processor):
             with imap.select(mailbox_name) as mailbox:
                 messagerefs = list(mailbox.messages_by_id)
                 message_ids = [r.message_id for r in messagerefs]
+                queued_ids = []
+                messages = []
 
                 for msgref, message_id, score in zip(
                         messagerefs,
@@ -49,19 +52,15 @@ class InboxProcessor(Processor):
                         mark_seen_later[message_id] = now  # XXX?
                         continue
 
-                    try:
-                        channel.publish_event(
-                            message=message_bytes,
-                            content_type="message/rfc822",
-                            routing_key=self.queue_name,
-                        )
-                        d("Message %s queued", message_id)
+                    queued_ids.append(message_id)
+                    messages.append({
+                        "message": message_bytes,
+                        "content_type": "message/rfc822",
+                        "routing_key": self.queue_name,
+                    })
 
-                    except UnroutableError:
-                        continue
-
-                    self._valkey.zadd(self.valkey_key, {message_id: now})
-                    num_processed += 1
+                num_processed += self._publish(channel, queued_ids, messages,
+                                               now)
 
         if mark_seen_later:
             self._valkey.zadd(self.valkey_key, mark_seen_later)
@@ -70,3 +69,36 @@ class InboxProcessor(Processor):
         # self._valkey.zremrangebyscore(self.valkey_key, "-inf", now - 1e-9)
 
         return num_processed
+
+    def _publish(
+            self,
+            channel: Channel,
+            message_ids: list[str],
+            messages: list[dict[str, Any]],
+            now: bytes,
+    ) -> int:
+        """Publish `messages` as one batch, and mark those delivered as
+        seen.  Unroutable messages are retried next time around.
+        """
+        failures: dict[int, BaseException] = {}
+        error: Optional[PublishBatchError] = None
+        try:
+            channel.publish_many(messages)
+        except PublishBatchError as e:
+            failures, error = e.failures, e
+
+        delivered = {
+            message_id: now
+            for index, message_id in enumerate(message_ids)
+            if index not in failures
+        }
+        for message_id in delivered:
+            d("Message %s queued", message_id)
+        if delivered:
+            self._valkey.zadd(self.valkey_key, delivered)
+
+        if error and not all(
+                isinstance(e, UnroutableError) for e in failures.values()
+        ):
+            raise error
+        return len(delivered)
@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from datetime import date
 from functools import partial
 from pathlib import Path
-from typing import ClassVar
+from typing import ClassVar, Optional
 from uuid import uuid4
 
 from hive.common import ArgumentParser
@@ -19,6 +19,10 @@ d = logger.debug
 class Service(HiveService):
     queues: list[str] = field(default_factory=list)
     topdir: Path = field(default_factory=Path.cwd)
+    DEFAULT_PREFETCH_COUNT: ClassVar[int] = 64
+    DEFAULT_ACK_BATCH_SIZE: ClassVar[int] = 32
+    prefetch_count: Optional[int] = None
+    ack_batch_size: Optional[int] = None
 
     def make_argument_parser(self) -> ArgumentParser:
         parser = super().make_argument_parser()
@@ -28,6 +32,22 @@ class Service(HiveService):
             nargs="+",
             help="queues to serialize",
         )
+        parser.add_argument(
+            "--prefetch-count",
+            metavar="N",
+            type=int,
+            default=self.DEFAULT_PREFETCH_COUNT,
+            help=(f"maximum number of unacknowledged messages"
+                  f" [default: {self.DEFAULT_PREFETCH_COUNT}]"),
+        )
+        parser.add_argument(
+            "--ack-batch-size",
+            metavar="N",
+            type=int,
+            default=self.DEFAULT_ACK_BATCH_SIZE,
+            help=(f"acknowledge messages in batches of up to this many"
+                  f" [default: {self.DEFAULT_ACK_BATCH_SIZE}]"),
+        )
         return parser
 
     def __post_init__(self) -> None:
@@ -36,17 +56,23 @@ class Service(HiveService):
             self.queues.extend(self.args.queues)
         if not self.queues:
             raise ValueError
+        if self.prefetch_count is None:
+            self.prefetch_count = self.args.prefetch_count
+        if not self.ack_batch_size:
+            self.ack_batch_size = self.args.ack_batch_size
 
     def run(self) -> None:
-        with self.blocking_connection() as conn:
-            channel = conn.channel()
-            for queue in self.queues:
-                channel.consume_events(
-                    queue=queue,
-                    on_message_callback=partial(self.on_message, queue),
-                )
-            logger.info("Consuming %s", ", ".join(self.queues))
-            channel.start_consuming()
+        self.run_consumers(self.start_consumers)
+
+    def start_consumers(self, channel: Channel) -> None:
+        for queue in self.queues:
+            channel.consume_events(
+                queue=queue,
+                on_message_callback=partial(self.on_message, queue),
+                prefetch_count=self.prefetch_count,
+                ack_batch_size=self.ack_batch_size,
+            )
+        logger.info("Consuming %s", ", ".join(self.queues))
 
     EXTENSIONS: ClassVar[dict[str, str]] = {
         "application/cloudevents+json": ".json",
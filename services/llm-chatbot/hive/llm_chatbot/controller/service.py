@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from datetime import timedelta
 from io import StringIO
 
-from hive.common import dynamic_cast, utc_now
+from hive.common import dynamic_cast
 from hive.common.units import SECOND
 from hive.messaging import Channel, Message
 from hive.service import HiveService
@@ -23,13 +23,14 @@ class Service(HiveService):
     max_request_age: timedelta = 30 * SECOND
 
     def run(self) -> None:
-        with self.blocking_connection() as conn:
-            channel = conn.channel()
-            channel.consume_events(
-                queue="llm.chatbot.ollama.commands",
-                on_message_callback=self.on_message,
-            )
-            channel.start_consuming()
+        self.run_consumers(self.start_consumers)
+
+    def start_consumers(self, channel: Channel) -> None:
+        channel.consume_events(
+            queue="llm.chatbot.ollama.commands",
+            on_message_callback=self.on_message,
+            max_age=self.max_request_age,
+        )
 
     def on_message(self, channel: Channel, message: Message) -> None:
         event = message.event()
@@ -37,11 +38,6 @@ class Service(HiveService):
 
         request = Request.from_cloudevent(event)
 
-        deadline = request.time + self.max_request_age
-        if deadline < utc_now():
-            d("%s: command deadline expired", event.id)
-            return
-
         app = ResponseManager(channel, request, out=StringIO())
         try:
             app.run()
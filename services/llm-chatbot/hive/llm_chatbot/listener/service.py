@@ -23,21 +23,21 @@ class Service(BaseService):
     """
 
     def run(self) -> None:
-        with self.blocking_connection() as conn:
-            channel = conn.channel()
-            channel.consume_events(
-                queue="llm.chatbot.requests",
-                on_message_callback=self.on_request,
-            )
-            channel.start_consuming()
+        self.run_consumers(self.start_consumers)
+
+    def start_consumers(self, channel: Channel) -> None:
+        channel.consume_events(
+            queue="llm.chatbot.requests",
+            on_message_callback=self.on_request,
+        )
 
     def on_request(self, channel: Channel, message: Message) -> None:
-        event = message.event()
+        envelope = message.lazy_event()
         d("Received: %s", message.body.decode("utf-8"))
 
         # Get the request handler.
-        if not (match := REQUEST_KIND_RE.fullmatch(event.type)):
-            raise ValueError(event.type)
+        if not (match := REQUEST_KIND_RE.fullmatch(envelope.type or "")):
+            raise ValueError(envelope.type)
         request_kind = match.group(1)
         if not (handle_request := getattr(self, f"on_{request_kind}", None)):
             raise NotImplementedError(request_kind)
@@ -54,6 +54,7 @@ class Service(BaseService):
         request_class = request_class_candidates[0]
 
         # Validate and handle the request.
+        event = envelope.event()
         handle_request(channel, request_class.from_cloudevent(event))
 
     def on_update_context(
@@ -1,14 +1,14 @@
 import logging
 
 from dataclasses import KW_ONLY, dataclass
-from datetime import datetime, timedelta
+from datetime import timedelta
 from functools import cached_property
 from typing import Any, ContextManager, Optional
 
 from typing_extensions import Self
 
-from hive.common.units import MILLISECOND, SECOND
-from hive.messaging import Channel, Connection, blocking_connection
+from hive.common.units import SECOND
+from hive.messaging import Channel, Connection, pooled_channel
 
 logger = logging.getLogger(__name__)
 d = logger.info
@@ -17,23 +17,18 @@ d = logger.info
 @dataclass
 class ResponseManager:
     _: KW_ONLY
-    _cctx: Optional[ContextManager[Connection]] = None
+    _cctx: Optional[ContextManager[Channel]] = None
     conn: Optional[Connection] = None
     channel: Optional[Channel] = None
-    _typing_deadline: Optional[datetime] = None
 
+    # The channel doesn't publish updates that would extend
+    # the timeout by less than a third of this.
     user_typing_timeout: timedelta = 30 * SECOND
 
-    # Don't extend timeouts by less than this amount.
-    min_extension: timedelta = 10 * SECOND
-
-    # Don't cancel timeouts shorter than this.
-    min_cancellation: timedelta = 500 * MILLISECOND
-
     def __enter__(self) -> Self:
         if not self.channel and not self.conn:
-            self._cctx = blocking_connection()
-            self.conn = self._cctx.__enter__()
+            self._cctx = pooled_channel()
+            self.channel = self._cctx.__enter__()
         try:
             self.on_enter()
             return self
@@ -77,29 +72,7 @@ class ResponseManager:
         self.set_user_typing()
 
     def set_user_typing(self) -> None:
-        want_timeout = self.user_typing_timeout
-        want_deadline = datetime.now() + want_timeout
-
-        have_deadline = self._typing_deadline
-        if have_deadline is not None:
-            extension = want_deadline - have_deadline
-            if extension < self.min_extension:
-                return
-
-        d("Setting %s timeout", want_timeout)
-        self._channel.set_user_typing(want_timeout)
-        self._typing_deadline = want_deadline
-        d("Typing deadline now %s", self._typing_deadline)
+        self._channel.set_user_typing(self.user_typing_timeout)
 
     def cancel_user_typing(self) -> None:
-        have_deadline = self._typing_deadline
-        if have_deadline is None:
-            return
-
-        have_timeout = have_deadline - datetime.now()
-        if have_timeout > self.min_cancellation:
-            d("Cancelling remaining %s timeout", have_timeout)
-            self._channel.set_user_typing(False)
-
-        self._typing_deadline = None
-        d("Typing deadline now %s", self._typing_deadline)
+        self._channel.set_user_typing(False)
@@ -3,6 +3,8 @@ import json
 from typing import Any
 from unittest.mock import Mock
 
+from pika.spec import BasicProperties
+
 from hive.messaging import Message as HiveMessage
 
 from hive.llm_chatbot.listener import Service
@@ -73,6 +75,6 @@ def test_generate_response() -> None:
 def _encapsulate(event: dict[str, Any]) -> HiveMessage:
     return HiveMessage(
         None,
-        Mock(content_type="application/cloudevents+json"),
+        BasicProperties(content_type="application/cloudevents+json"),
         json.dumps(event).encode("utf-8"),
     )
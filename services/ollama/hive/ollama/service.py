@@ -53,9 +53,11 @@ class Flow:
 @dataclass
 class Service(HiveService):
     DEFAULT_API_URL: ClassVar[str] = "http://ollama:11434"
+    DEFAULT_CONCURRENCY: ClassVar[int] = 4
     ollama_api_url: Optional[str] = None
     requests_queue: str = "ollama.api.requests"
     responses_queue: str = "ollama.api.responses"
+    concurrency: Optional[int] = None  # maximum in-flight requests
 
     def make_argument_parser(self) -> ArgumentParser:
         parser = super().make_argument_parser()
@@ -66,21 +68,32 @@ class Service(HiveService):
             help=(f"URL to proxy requests to"
                   f" [default: {self.DEFAULT_API_URL}]"),
         )
+        parser.add_argument(
+            "--concurrency",
+            metavar="N",
+            type=int,
+            default=self.DEFAULT_CONCURRENCY,
+            help=(f"maximum number of requests to proxy at once"
+                  f" [default: {self.DEFAULT_CONCURRENCY}]"),
+        )
         return parser
 
     def __post_init__(self):
         super().__post_init__()
         if not self.ollama_api_url:
             self.ollama_api_url = self.args.ollama_api_url
+        if not self.concurrency:
+            self.concurrency = self.args.concurrency
 
     def run(self):
-        with self.blocking_connection() as conn:
-            channel = conn.channel()
-            channel.consume_requests(  # XXX consume_flow_requests
-                queue=self.requests_queue,
-                on_message_callback=self.on_request,
-            )
-            channel.start_consuming()
+        self.run_consumers(self.start_consumers)
+
+    def start_consumers(self, channel: Channel) -> None:
+        channel.consume_requests(  # XXX consume_flow_requests
+            queue=self.requests_queue,
+            on_message_callback=self.on_request,
+            concurrency=self.concurrency,
+        )
 
     def on_request(self, channel: Channel, message: Message) -> None:
         responses_queue = self.responses_queue
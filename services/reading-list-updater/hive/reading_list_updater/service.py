@@ -134,10 +134,10 @@ class Service(HiveService):
         channel.set_user_typing(False)
 
     def run(self):
-        with self.blocking_connection() as conn:
-            channel = conn.channel()
-            channel.consume_requests(
-                queue=self.update_request_queue,
-                on_message_callback=self.on_update_request,
-            )
-            channel.start_consuming()
+        self.run_consumers(self.start_consumers)
+
+    def start_consumers(self, channel: Channel) -> None:
+        channel.consume_requests(
+            queue=self.update_request_queue,
+            on_message_callback=self.on_update_request,
+        )